@@ -1,43 +1,66 @@
 from __future__ import annotations
 
-from datetime import datetime, timezone
-from typing import Any
+import asyncio
+import json
+from datetime import date, datetime, timezone
+from typing import Any, Literal
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response
+from fastapi.responses import StreamingResponse
 from loguru import logger
 
 from app.core.config import get_settings
 from app.core.database import ForecastDatabase
-from app.models.forecast import ForecastRequest, ForecastResponse, HealthResponse, Location
+from app.core.export import EXPORT_FORMATS, aiter_export
+from app.core.http_cache import cache_control, etag_matches, forecast_etag, not_modified
+from app.core.write_behind import ForecastWriteQueue
+from app.models.forecast import (
+    BatchForecastItem,
+    BatchForecastRequest,
+    BatchForecastResponse,
+    ForecastRequest,
+    ForecastResponse,
+    HealthResponse,
+    Location,
+)
+from app.services.climatology import get_climatology
+from app.services.container import ServiceContainer
 from app.services.geocoding import Geocoder, GeocodingError
 from app.services.nasa_power import NasaPowerClient
-from app.services.ensemble_forecaster import get_ensemble_forecaster, EnsembleForecaster
-from app.services.ml_predictor import get_ml_predictor, MLPredictor
+from app.services.ensemble_forecaster import EnsembleForecaster
+from app.services.ml_predictor import MLPredictor
 
 router = APIRouter()
 settings = get_settings()
 
 
-def get_geocoder() -> Geocoder:
-    return Geocoder()
+def get_services(request: Request) -> ServiceContainer:
+    return request.app.state.services
 
 
-def get_nasa_client() -> NasaPowerClient:
-    return NasaPowerClient()
+def get_geocoder(services: ServiceContainer = Depends(get_services)) -> Geocoder:
+    return services.geocoder
 
 
-def get_ensemble() -> EnsembleForecaster:
-    return get_ensemble_forecaster()
+def get_nasa_client(services: ServiceContainer = Depends(get_services)) -> NasaPowerClient:
+    return services.nasa_client
 
 
-def get_ml() -> MLPredictor:
-    return get_ml_predictor()
+async def get_ensemble(services: ServiceContainer = Depends(get_services)) -> EnsembleForecaster:
+    await services.ml_ready()
+    return services.ensemble
 
 
-def get_database() -> ForecastDatabase | None:
-    if settings.database_enabled:
-        return ForecastDatabase(settings.database_path)
-    return None
+async def get_ml(services: ServiceContainer = Depends(get_services)) -> MLPredictor:
+    return await services.ml_ready()
+
+
+def get_database(services: ServiceContainer = Depends(get_services)) -> ForecastDatabase | None:
+    return services.database
+
+
+def get_writer(services: ServiceContainer = Depends(get_services)) -> ForecastWriteQueue | None:
+    return services.write_queue
 
 
 @router.get("/health", response_model=HealthResponse)
@@ -50,13 +73,24 @@ async def forecast(
     payload: ForecastRequest,
     geocoder: Geocoder = Depends(get_geocoder),
     nasa_client: NasaPowerClient = Depends(get_nasa_client),
-    db: ForecastDatabase | None = Depends(get_database),
-) -> ForecastResponse:
+    writer: ForecastWriteQueue | None = Depends(get_writer),
+) -> Any:
+    """
+    Forecast for one day from NASA POWER.
+    
+    Cache hits are answered with the forecast's pre-rendered JSON body,
+    skipping response model validation and encoding.
+    """
     if payload.location is None and not payload.query:
         raise HTTPException(
             status_code=400, 
             detail="Either location coordinates or query must be provided"
         )
+    if payload.is_multi_day:
+        raise HTTPException(
+            status_code=400,
+            detail="Multi-day event windows are supported by /api/forecast/ensemble"
+        )
 
     location: Location
     if payload.location:
@@ -68,21 +102,68 @@ async def forecast(
             logger.error(f"Geocoding failed for query '{payload.query}': {exc}")
             raise HTTPException(status_code=404, detail=str(exc)) from exc
 
-    forecast_result = await nasa_client.precipitation_forecast(location, payload.event_date)
+    body: bytes | None = None
+    cached = nasa_client.cached_response(location, payload.event_date)
+    if cached:
+        forecast_result, body = cached
+    else:
+        forecast_result = await nasa_client.precipitation_forecast(location, payload.event_date)
     
     # Save to database if enabled
-    if db:
+    if writer:
         try:
-            db.save_forecast(forecast_result)
+            await writer.enqueue(forecast_result)
             logger.info(
-                f"Saved forecast for {location.name} on {payload.event_date}"
+                f"Queued forecast for {location.name} on {payload.event_date}"
             )
         except Exception as exc:
             logger.error(f"Failed to save forecast to database: {exc}")
     
+    if body is not None:
+        return Response(body, media_type="application/json")
     return forecast_result
 
 
+def _data_version() -> str:
+    """Identifies the data behind forecasts: the loaded climatology build."""
+    climatology = get_climatology()
+    return climatology.version if climatology else "none"
+
+
+@router.get("/forecast", response_model=ForecastResponse)
+async def forecast_get(
+    response: Response,
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    event_date: date = Query(...),
+    name: str | None = None,
+    if_none_match: str | None = Header(None),
+    geocoder: Geocoder = Depends(get_geocoder),
+    nasa_client: NasaPowerClient = Depends(get_nasa_client),
+    writer: ForecastWriteQueue | None = Depends(get_writer),
+) -> Any:
+    """
+    Cacheable GET form of POST /forecast for a point and date.
+    
+    Responses carry an ETag and a date-dependent Cache-Control, so CDNs and
+    reverse proxies can serve repeats; If-None-Match returns 304 without
+    computing the forecast.
+    """
+    location = Location(latitude=latitude, longitude=longitude, name=name)
+    headers = {
+        "ETag": forecast_etag("forecast", location, event_date, _data_version()),
+        "Cache-Control": cache_control(event_date),
+    }
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified(headers)
+    result = await forecast(
+        ForecastRequest(location=location, event_date=event_date), geocoder, nasa_client, writer
+    )
+    # Pre-rendered cache hits come back as a Response of their own
+    (result if isinstance(result, Response) else response).headers.update(headers)
+    return result
+
+
 @router.get("/stats")
 async def get_stats(
     db: ForecastDatabase | None = Depends(get_database),
@@ -92,7 +173,7 @@ async def get_stats(
         raise HTTPException(status_code=503, detail="Database not enabled")
     
     try:
-        return db.get_statistics()
+        return await db.get_statistics_async()
     except Exception as exc:
         logger.error(f"Failed to get statistics: {exc}")
         raise HTTPException(status_code=500, detail="Failed to retrieve statistics")
@@ -103,7 +184,7 @@ async def ensemble_forecast(
     payload: ForecastRequest,
     geocoder: Geocoder = Depends(get_geocoder),
     ensemble: EnsembleForecaster = Depends(get_ensemble),
-    db: ForecastDatabase | None = Depends(get_database),
+    writer: ForecastWriteQueue | None = Depends(get_writer),
 ) -> ForecastResponse:
     """
     Get ensemble forecast combining NASA POWER, ML model, and statistical analysis.
@@ -114,6 +195,9 @@ async def ensemble_forecast(
     - Statistical trend analysis (20% weight)
     
     Expected accuracy: 70-80% for historical patterns
+    
+    Multi-day events (event_start/event_end) return aggregate risk for the
+    window plus per-day risk in event_window, from a single range fetch.
     """
     if payload.location is None and not payload.query:
         raise HTTPException(
@@ -132,14 +216,19 @@ async def ensemble_forecast(
             raise HTTPException(status_code=404, detail=str(exc)) from exc
     
     try:
-        forecast_result = await ensemble.get_ensemble_forecast(location, payload.event_date)
+        if payload.is_multi_day:
+            forecast_result = await ensemble.get_window_forecast(
+                location, payload.event_start, payload.event_end
+            )
+        else:
+            forecast_result = await ensemble.get_ensemble_forecast(location, payload.event_date)
         
         # Save to database if enabled
-        if db:
+        if writer:
             try:
-                db.save_forecast(forecast_result)
+                await writer.enqueue(forecast_result)
                 logger.info(
-                    f"Saved ensemble forecast for {location.name} on {payload.event_date}"
+                    f"Queued ensemble forecast for {location.name} on {payload.event_date}"
                 )
             except Exception as exc:
                 logger.error(f"Failed to save forecast to database: {exc}")
@@ -154,6 +243,176 @@ async def ensemble_forecast(
         )
 
 
+@router.get("/forecast/ensemble", response_model=ForecastResponse)
+async def ensemble_forecast_get(
+    response: Response,
+    latitude: float = Query(..., ge=-90, le=90),
+    longitude: float = Query(..., ge=-180, le=180),
+    event_date: date = Query(...),
+    name: str | None = None,
+    if_none_match: str | None = Header(None),
+    geocoder: Geocoder = Depends(get_geocoder),
+    ensemble: EnsembleForecaster = Depends(get_ensemble),
+    writer: ForecastWriteQueue | None = Depends(get_writer),
+) -> Any:
+    """
+    Cacheable GET form of POST /forecast/ensemble for a point and date.
+    
+    The ETag also covers the ML model files and the ensemble weights, so a
+    retrained model or new weights invalidate clients' copies.
+    """
+    location = Location(latitude=latitude, longitude=longitude, name=name)
+    headers = {
+        "ETag": forecast_etag(
+            "ensemble", location, event_date, _data_version(),
+            ensemble.ml_predictor.model_hash, ensemble.weights_key,
+        ),
+        "Cache-Control": cache_control(event_date, model_dependent=True),
+    }
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified(headers)
+    result = await ensemble_forecast(
+        ForecastRequest(location=location, event_date=event_date), geocoder, ensemble, writer
+    )
+    response.headers.update(headers)
+    return result
+
+
+@router.post("/forecast/ensemble/stream")
+async def ensemble_forecast_stream(
+    payload: ForecastRequest,
+    geocoder: Geocoder = Depends(get_geocoder),
+    ensemble: EnsembleForecaster = Depends(get_ensemble),
+    writer: ForecastWriteQueue | None = Depends(get_writer),
+) -> StreamingResponse:
+    """
+    Streaming variant of /forecast/ensemble (newline-delimited JSON).
+    
+    Emits one line per component as it completes, in completion order:
+    {"event": "nasa_baseline" | "ml_prediction" | "statistical_trend", "data": {...}}
+    followed by {"event": "forecast", "data": <ForecastResponse>}. A failure
+    after the stream has started is reported as {"event": "error", "detail": ...}.
+    """
+    if payload.location is None and not payload.query:
+        raise HTTPException(
+            status_code=400,
+            detail="Either location coordinates or query must be provided"
+        )
+    if payload.is_multi_day:
+        raise HTTPException(
+            status_code=400,
+            detail="Multi-day event windows are supported by /api/forecast/ensemble"
+        )
+    
+    location: Location
+    if payload.location:
+        location = payload.location
+    else:
+        try:
+            location = await geocoder.geocode(payload.query or "")
+        except GeocodingError as exc:
+            logger.error(f"Geocoding failed for query '{payload.query}': {exc}")
+            raise HTTPException(status_code=404, detail=str(exc)) from exc
+    
+    async def events():
+        try:
+            async for event, data in ensemble.stream_ensemble_forecast(
+                location, payload.event_date
+            ):
+                if isinstance(data, ForecastResponse):
+                    if writer:
+                        try:
+                            await writer.enqueue(data)
+                        except Exception as exc:
+                            logger.error(f"Failed to save forecast to database: {exc}")
+                    data = data.model_dump(mode="json")
+                yield json.dumps({"event": event, "data": data}) + "\n"
+        except Exception as exc:
+            logger.error(f"Streaming ensemble forecast failed: {exc}", exc_info=True)
+            yield json.dumps({
+                "event": "error",
+                "detail": "Failed to generate ensemble forecast",
+            }) + "\n"
+    
+    return StreamingResponse(events(), media_type="application/x-ndjson")
+
+
+@router.post("/forecast/ensemble/batch", response_model=BatchForecastResponse)
+async def ensemble_forecast_batch(
+    payload: BatchForecastRequest,
+    geocoder: Geocoder = Depends(get_geocoder),
+    ensemble: EnsembleForecaster = Depends(get_ensemble),
+    writer: ForecastWriteQueue | None = Depends(get_writer),
+) -> BatchForecastResponse:
+    """
+    Get ensemble forecasts for many (location, date) pairs in one call.
+    
+    Items sharing a NASA POWER grid cell share one upstream fetch, and the
+    ML model and trend regressions run once over the whole batch. Results
+    come back in input order; failed items carry an error instead of
+    failing the batch.
+    """
+    errors: dict[int, str] = {}
+    
+    # Geocode each distinct query once
+    queries = {
+        item.query for item in payload.items
+        if item.location is None and item.query
+    }
+    geocoded = dict(zip(
+        queries,
+        await asyncio.gather(
+            *(geocoder.geocode(query) for query in queries), return_exceptions=True
+        ),
+    ))
+    
+    pending: list[tuple[int, Location, date]] = []
+    for index, item in enumerate(payload.items):
+        if item.is_multi_day:
+            errors[index] = "Event windows are not supported in batch requests"
+        elif item.location is not None:
+            pending.append((index, item.location, item.event_date))
+        elif not item.query:
+            errors[index] = "Either location coordinates or query must be provided"
+        elif isinstance(geocoded[item.query], Exception):
+            errors[index] = f"Geocoding failed: {geocoded[item.query]}"
+        else:
+            pending.append((index, geocoded[item.query], item.event_date))
+    
+    try:
+        forecasts = await ensemble.get_batch_ensemble_forecast(
+            [(location, event_date) for _, location, event_date in pending]
+        )
+    except Exception as exc:
+        logger.error(f"Batch ensemble forecast failed: {exc}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail="Failed to generate batch ensemble forecast"
+        )
+    
+    results = [BatchForecastItem(index=i, error=errors.get(i)) for i in range(len(payload.items))]
+    for (index, _, _), forecast in zip(pending, forecasts):
+        if isinstance(forecast, Exception):
+            results[index].error = str(forecast) or type(forecast).__name__
+            continue
+        results[index].forecast = forecast
+        if writer:
+            try:
+                await writer.enqueue(forecast)
+            except Exception as exc:
+                logger.error(f"Failed to save forecast to database: {exc}")
+    
+    return BatchForecastResponse(results=results)
+
+
+@router.get("/cache/stats")
+async def get_cache_stats(
+    ensemble: EnsembleForecaster = Depends(get_ensemble),
+) -> dict[str, Any]:
+    """Hit/miss statistics of the ensemble result cache."""
+    return {"ensemble": ensemble.result_cache.stats()}
+
+
 @router.get("/model/info")
 async def get_model_info(
     ml: MLPredictor = Depends(get_ml),
@@ -170,19 +429,94 @@ async def get_model_info(
     return ml.get_model_info()
 
 
+def _parse_bbox(bbox: str | None) -> tuple[float, float, float, float] | None:
+    """Parse a min_lat,min_lon,max_lat,max_lon query parameter."""
+    if bbox is None:
+        return None
+    try:
+        box = tuple(float(v) for v in bbox.split(","))
+    except ValueError:
+        box = ()
+    if len(box) != 4 or not (-90 <= box[0] <= box[2] <= 90):
+        raise HTTPException(
+            status_code=400,
+            detail="bbox must be min_lat,min_lon,max_lat,max_lon",
+        )
+    return box  # type: ignore[return-value]
+
+
+@router.get("/export")
+async def export_forecasts(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    start_date: date | None = None,
+    end_date: date | None = None,
+    bbox: str | None = Query(None, description="min_lat,min_lon,max_lat,max_lon"),
+    db: ForecastDatabase | None = Depends(get_database),
+) -> StreamingResponse:
+    """
+    Stream stored forecasts as NDJSON or CSV.
+    
+    Filters by event date range and bounding box. Rows are read in
+    id-ordered pages, so memory use is constant however large the export.
+    Months compacted into the archive are not included; X-Archived-Through
+    names the last of them.
+    """
+    if not db:
+        raise HTTPException(status_code=503, detail="Database not enabled")
+    box = _parse_bbox(bbox)
+    headers = {"Content-Disposition": f'attachment; filename="forecasts.{format}"'}
+    archived_through = await db.archived_through_async()
+    if archived_through:
+        headers["X-Archived-Through"] = archived_through
+    
+    chunks = aiter_export(
+        db,
+        format,
+        start_date=start_date.isoformat() if start_date else None,
+        end_date=end_date.isoformat() if end_date else None,
+        bbox=box,
+    )
+    return StreamingResponse(
+        chunks,
+        media_type=EXPORT_FORMATS[format],
+        headers=headers,
+    )
+
+
 @router.get("/history")
 async def get_history(
-    latitude: float,
-    longitude: float,
-    limit: int = 10,
+    response: Response,
+    latitude: float | None = None,
+    longitude: float | None = None,
+    limit: int = Query(10, ge=1, le=1000),
+    radius_km: float | None = Query(None, gt=0, le=20000),
+    bbox: str | None = Query(None, description="min_lat,min_lon,max_lat,max_lon"),
+    order: Literal["time", "distance"] = "time",
     db: ForecastDatabase | None = Depends(get_database),
 ) -> list[dict[str, Any]]:
-    """Get forecast history for a location."""
+    """
+    Get forecast history for a location or an area.
+    
+    With only latitude/longitude, returns forecasts for that exact point.
+    radius_km returns forecasts within that distance of the point; bbox
+    returns forecasts inside a box. Area results can be ordered by time
+    (newest first) or distance from latitude/longitude. Months compacted
+    into the archive are not searched; X-Archived-Through names the last
+    of them.
+    """
     if not db:
         raise HTTPException(status_code=503, detail="Database not enabled")
     
     try:
-        return db.get_forecast_history(latitude, longitude, limit)
+        history = await db.get_forecast_history_async(
+            latitude, longitude, limit, radius_km=radius_km, bbox=_parse_bbox(bbox), order=order
+        )
+        archived_through = await db.archived_through_async()
+        if archived_through:
+            response.headers["X-Archived-Through"] = archived_through
+        return history
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc)) from exc
     except Exception as exc:
         logger.error(f"Failed to get forecast history: {exc}")
         raise HTTPException(status_code=500, detail="Failed to retrieve history")
@@ -0,0 +1,312 @@
+"""
+Offline Load Test
+
+Starts the upstream stand-ins (app.benchmarks.standins) and the API under
+uvicorn in subprocesses, pointed at each other and at a throwaway database,
+then drives each scenario at a target concurrency:
+
+- forecast: POST /api/forecast, one in five requests by place name
+- ensemble: POST /api/forecast/ensemble
+- history:  GET /api/history, exact-point and 50 km radius queries
+
+Locations and dates are drawn with a fixed seed from a pool of
+``--locations`` points, so the cache hit ratio is controlled by the pool
+size. The report (per scenario p50/p95/p99 latency, requests/sec, status
+codes and upstream calls by endpoint) is printed and written as JSON.
+Nothing leaves the machine.
+
+Usage:
+    python -m app.benchmarks.loadtest
+    python -m app.benchmarks.loadtest --requests 2000 --concurrency 64 \\
+        --upstream-latency-ms 120 --error-rate 0.02 --output loadtest.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Iterator
+
+import httpx
+
+from app.benchmarks.standins import POWER_PATH
+
+SCENARIOS = ("forecast", "ensemble", "history")
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+FIRST_DAY = date(2023, 1, 1)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start(args: list[str], env: dict[str, str], log_path: Path) -> subprocess.Popen:
+    log = open(log_path, "wb")
+    return subprocess.Popen(
+        [sys.executable, *args], cwd=BACKEND_DIR, env=env, stdout=log, stderr=subprocess.STDOUT
+    )
+
+
+def _wait_ready(url: str, process: subprocess.Popen, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"{process.args} exited with {process.returncode}")
+        try:
+            if httpx.get(url, timeout=1).status_code < 500:
+                return
+        except httpx.TransportError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} not ready after {timeout}s")
+
+
+def _stop(process: subprocess.Popen) -> None:
+    process.terminate()
+    try:
+        process.wait(timeout=15)
+    except subprocess.TimeoutExpired:
+        process.kill()
+
+
+def make_locations(count: int, seed: int) -> list[dict[str, float]]:
+    rng = random.Random(seed)
+    return [
+        {"latitude": round(rng.uniform(-60, 70), 4), "longitude": round(rng.uniform(-180, 180), 4)}
+        for _ in range(count)
+    ]
+
+
+def build_request(
+    scenario: str, rng: random.Random, locations: list[dict[str, float]]
+) -> tuple[str, str, dict[str, Any]]:
+    """Method, path and httpx keyword arguments for one request of a scenario."""
+    location = rng.choice(locations)
+    event_date = (FIRST_DAY + timedelta(days=rng.randrange(365))).isoformat()
+    if scenario == "forecast":
+        if rng.random() < 0.2:
+            body: dict[str, Any] = {"query": f"Town {locations.index(location)}"}
+        else:
+            body = {"location": location}
+        return "POST", "/api/forecast", {"json": {**body, "event_date": event_date}}
+    if scenario == "ensemble":
+        return "POST", "/api/forecast/ensemble", {"json": {"location": location, "event_date": event_date}}
+    if scenario == "history":
+        params: dict[str, Any] = {**location, "limit": 20}
+        if rng.random() < 0.25:
+            params["radius_km"] = 50
+        return "GET", "/api/history", {"params": params}
+    raise ValueError(f"Unknown scenario: {scenario}")
+
+
+def percentile(values: list[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(q / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+async def run_scenario(
+    base_url: str,
+    scenario: str,
+    n_requests: int,
+    concurrency: int,
+    locations: list[dict[str, float]],
+    seed: int,
+) -> dict[str, Any]:
+    """Send n_requests of one scenario from `concurrency` concurrent clients."""
+    rng = random.Random(seed)
+    plan = [build_request(scenario, rng, locations) for _ in range(n_requests)]
+    latencies: list[float] = []
+    statuses: Counter[str] = Counter()
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=base_url, timeout=60, limits=limits) as client:
+
+        async def worker() -> None:
+            while plan:
+                method, path, kwargs = plan.pop()
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, **kwargs)
+                    statuses[str(response.status_code)] += 1
+                except httpx.HTTPError as exc:
+                    statuses[type(exc).__name__] += 1
+                latencies.append(time.perf_counter() - start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "scenario": scenario,
+        "requests": n_requests,
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "requests_per_sec": round(n_requests / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "status_codes": dict(statuses),
+    }
+
+
+@contextmanager
+def running_stack(
+    upstream_latency_ms: float = 50.0,
+    upstream_jitter_ms: float = 10.0,
+    error_rate: float = 0.0,
+    workers: int = 1,
+    seed: int = 42,
+) -> Iterator[tuple[str, str]]:
+    """
+    Run the stand-ins and the API against a throwaway database.
+
+    Yields:
+        (api_url, standin_url)
+    """
+    standin_port, api_port = _free_port(), _free_port()
+    standin_url = f"http://127.0.0.1:{standin_port}"
+    api_url = f"http://127.0.0.1:{api_port}"
+
+    with tempfile.TemporaryDirectory(prefix="isitrain-loadtest-") as workdir:
+        work = Path(workdir)
+        env = {
+            **os.environ,
+            "NASA_POWER_URL": standin_url + POWER_PATH,
+            "NOMINATIM_URL": standin_url,
+            "DATABASE_PATH": str(work / "forecasts.db"),
+            "ARCHIVE_PATH": str(work / "archive"),
+            # No climatology table: every forecast goes to the (stand-in) upstream
+            "CLIMATOLOGY_PATH": str(work / "climatology"),
+            "RATE_LIMIT_PER_MINUTE": str(10**9),
+            "RATE_LIMIT_PER_HOUR": str(10**9),
+            "RATE_LIMIT_BACKEND": "sqlite" if workers > 1 else "memory",
+            "RATE_LIMIT_PATH": str(work / "rate_limits.db"),
+        }
+        standins = _start(
+            [
+                "-m", "app.benchmarks.standins",
+                "--port", str(standin_port),
+                "--latency-ms", str(upstream_latency_ms),
+                "--jitter-ms", str(upstream_jitter_ms),
+                "--error-rate", str(error_rate),
+                "--seed", str(seed),
+            ],
+            env,
+            work / "standins.log",
+        )
+        api = _start(
+            [
+                "-m", "uvicorn", "app.main:app",
+                "--port", str(api_port),
+                "--workers", str(workers),
+                "--log-level", "warning",
+            ],
+            env,
+            work / "api.log",
+        )
+        try:
+            _wait_ready(standin_url + "/_stats", standins)
+            _wait_ready(api_url + "/health", api)
+            yield api_url, standin_url
+        finally:
+            _stop(api)
+            _stop(standins)
+
+
+def run_loadtest(
+    scenarios: tuple[str, ...] = SCENARIOS,
+    n_requests: int = 500,
+    concurrency: int = 32,
+    n_locations: int = 200,
+    upstream_latency_ms: float = 50.0,
+    upstream_jitter_ms: float = 10.0,
+    error_rate: float = 0.0,
+    workers: int = 1,
+    seed: int = 42,
+) -> dict[str, Any]:
+    locations = make_locations(n_locations, seed)
+    results = []
+    with running_stack(upstream_latency_ms, upstream_jitter_ms, error_rate, workers, seed) as (
+        api_url,
+        standin_url,
+    ):
+        for index, scenario in enumerate(scenarios):
+            httpx.post(standin_url + "/_reset")
+            result = asyncio.run(
+                run_scenario(api_url, scenario, n_requests, concurrency, locations, seed + index)
+            )
+            result["upstream_calls"] = httpx.get(standin_url + "/_stats").json()
+            results.append(result)
+
+    return {
+        "config": {
+            "requests": n_requests,
+            "concurrency": concurrency,
+            "locations": n_locations,
+            "upstream_latency_ms": upstream_latency_ms,
+            "upstream_jitter_ms": upstream_jitter_ms,
+            "error_rate": error_rate,
+            "workers": workers,
+            "seed": seed,
+        },
+        "results": results,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Offline load test against local upstream stand-ins")
+    parser.add_argument("--scenarios", type=str, default=",".join(SCENARIOS), help="Comma-separated scenarios")
+    parser.add_argument("--requests", type=int, default=500, help="Requests per scenario (default: 500)")
+    parser.add_argument("--concurrency", type=int, default=32, help="Concurrent clients (default: 32)")
+    parser.add_argument("--locations", type=int, default=200, help="Distinct locations (default: 200)")
+    parser.add_argument("--upstream-latency-ms", type=float, default=50.0)
+    parser.add_argument("--upstream-jitter-ms", type=float, default=10.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of upstream calls that fail")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes (default: 1)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", type=str, default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    report = run_loadtest(
+        tuple(args.scenarios.split(",")),
+        args.requests,
+        args.concurrency,
+        args.locations,
+        args.upstream_latency_ms,
+        args.upstream_jitter_ms,
+        args.error_rate,
+        args.workers,
+        args.seed,
+    )
+    columns = ["scenario", "requests_per_sec", "p50_ms", "p95_ms", "p99_ms"]
+    print(" | ".join(f"{c:>16}" for c in columns) + " | upstream calls")
+    for result in report["results"]:
+        print(
+            " | ".join(f"{result[c]!s:>16}" for c in columns)
+            + f" | {result['upstream_calls']} {result['status_codes']}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
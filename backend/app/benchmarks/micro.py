@@ -0,0 +1,261 @@
+"""
+Hot-Path Micro-Benchmarks
+
+Times the CPU-bound pieces of a request with fixed inputs and compares them
+against a stored baseline:
+
+- MLPredictor.extract_features and predict (model from data/ml_models)
+- EnsembleForecaster._calculate_confidence_interval, _adjust_weights and
+  _calculate_statistical_estimate (NASA client stubbed with fixed values)
+- cache_key plus TTLCache set/get
+- SlidingWindowLimiter.hit and evict_idle with 100k tracked clients
+- ForecastDatabase.save_forecast on a temporary database
+
+Each benchmark is a context manager that sets up its fixture, yields the
+callable to time and tears the fixture down (temporary database, event
+loop) when it is done. Each is auto-ranged to ~0.1 s per repeat and the fastest repeat
+is kept, as ``timeit`` does. A benchmark regresses when it is slower than
+its baseline by more than ``--tolerance`` (default 25%); any regression
+makes the run exit with status 1. Baselines are machine-specific: refresh
+them with ``--save-baseline`` on the machine that gates releases.
+
+Usage:
+    python -m app.benchmarks.micro
+    python -m app.benchmarks.micro --tolerance 0.5 --only cache,rate_limit
+    python -m app.benchmarks.micro --save-baseline
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import shutil
+import sys
+import tempfile
+import timeit
+from contextlib import AbstractContextManager, contextmanager
+from datetime import date, datetime, timezone
+from pathlib import Path
+from typing import Any, Callable, Iterator
+
+from cachetools import TTLCache
+from loguru import logger
+
+from app.core.cache import ResultCache, cache_key
+from app.core.database import ForecastDatabase
+from app.core.rate_limit import SlidingWindowLimiter
+from app.models.forecast import ForecastResponse, Location
+from app.services.ensemble_forecaster import EnsembleForecaster
+from app.services.ml_predictor import MLPredictor
+
+BASELINE_PATH = Path(__file__).with_name("micro_baseline.json")
+DEFAULT_TOLERANCE = 0.25
+
+LOCATION = Location(latitude=40.7128, longitude=-74.006, name="New York")
+EVENT_DATE = date(2024, 7, 4)
+HIGH_OCCUPANCY = 100_000
+
+
+def _forecast(mm: float = 2.5) -> ForecastResponse:
+    return ForecastResponse(
+        location=LOCATION,
+        event_date=EVENT_DATE,
+        precipitation_probability=0.6,
+        precipitation_intensity_mm=mm,
+        summary="Moderate rain likely",
+        nasa_dataset="NASA POWER",
+        issued_at=datetime(2024, 7, 1, tzinfo=timezone.utc),
+    )
+
+
+class _FixedNasaClient:
+    """Stand-in for NasaPowerClient returning fixed values per year."""
+
+    async def precipitation_forecast(self, location: Location, event_date: date) -> ForecastResponse:
+        return _forecast(float(event_date.year % 7))
+
+
+@contextmanager
+def bench_extract_features() -> Iterator[Callable[[], Any]]:
+    predictor = MLPredictor()
+    yield lambda: predictor.extract_features(LOCATION, EVENT_DATE)
+
+
+@contextmanager
+def bench_predict() -> Iterator[Callable[[], Any]]:
+    predictor = MLPredictor()
+    yield lambda: predictor.predict(LOCATION, EVENT_DATE, 2.0)
+
+
+def _ensemble() -> EnsembleForecaster:
+    return EnsembleForecaster(
+        result_cache=ResultCache(maxsize=1, ttl=1),
+        nasa_client=_FixedNasaClient(),  # type: ignore[arg-type]
+    )
+
+
+@contextmanager
+def bench_confidence_interval() -> Iterator[Callable[[], Any]]:
+    forecaster = _ensemble()
+    yield lambda: forecaster._calculate_confidence_interval([2.5, 3.1, 1.8], [0.5, 0.3, 0.2])
+
+
+@contextmanager
+def bench_adjust_weights() -> Iterator[Callable[[], Any]]:
+    forecaster = _ensemble()
+    yield lambda: forecaster._adjust_weights(0.42, 0.37)
+
+
+@contextmanager
+def bench_statistical_estimate() -> Iterator[Callable[[], Any]]:
+    forecaster = _ensemble()
+    loop = asyncio.new_event_loop()
+    try:
+        yield lambda: loop.run_until_complete(
+            forecaster._calculate_statistical_estimate(LOCATION, EVENT_DATE, 2.0)
+        )
+    finally:
+        loop.close()
+
+
+@contextmanager
+def bench_cache() -> Iterator[Callable[[], Any]]:
+    cache: TTLCache = TTLCache(maxsize=256, ttl=900)
+    value = _forecast()
+
+    def run() -> Any:
+        key = cache_key("nasa", str(LOCATION.latitude), str(LOCATION.longitude), EVENT_DATE.isoformat())
+        cache[key] = value
+        return cache.get(key)
+
+    yield run
+
+
+def _full_limiter() -> SlidingWindowLimiter:
+    limiter = SlidingWindowLimiter(evict_interval=float("inf"))
+    for i in range(HIGH_OCCUPANCY):
+        limiter.hit(f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}", now=1_000_000.0)
+    return limiter
+
+
+@contextmanager
+def bench_rate_limit_hit() -> Iterator[Callable[[], Any]]:
+    limiter = _full_limiter()
+    yield lambda: limiter.hit("10.0.128.7", now=1_000_030.0)
+
+
+@contextmanager
+def bench_rate_limit_evict() -> Iterator[Callable[[], Any]]:
+    limiter = _full_limiter()
+    # Nothing is idle yet: measures the scan over every tracked client
+    yield lambda: limiter.evict_idle(now=1_000_030.0)
+
+
+@contextmanager
+def bench_save_forecast() -> Iterator[Callable[[], Any]]:
+    workdir = tempfile.mkdtemp(prefix="isitrain-micro-")
+    db = ForecastDatabase(str(Path(workdir) / "forecasts.db"))
+    forecast = _forecast()
+    try:
+        yield lambda: db.save_forecast(forecast)
+    finally:
+        db.close()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+BENCHMARKS: dict[str, Callable[[], AbstractContextManager[Callable[[], Any]]]] = {
+    "ml.extract_features": bench_extract_features,
+    "ml.predict": bench_predict,
+    "ensemble.confidence_interval": bench_confidence_interval,
+    "ensemble.adjust_weights": bench_adjust_weights,
+    "ensemble.statistical_estimate": bench_statistical_estimate,
+    "cache.key_set_get": bench_cache,
+    "rate_limit.hit_100k_clients": bench_rate_limit_hit,
+    "rate_limit.evict_scan_100k_clients": bench_rate_limit_evict,
+    "database.save_forecast": bench_save_forecast,
+}
+
+
+def time_call(function: Callable[[], Any], repeat: int = 5, min_time: float = 0.1) -> float:
+    """Fastest per-call time in seconds over `repeat` auto-ranged runs."""
+    timer = timeit.Timer(function)
+    number = 1
+    while timer.timeit(number) < min_time:
+        number *= 2 if number < 1000 else 10
+    return min(timer.repeat(repeat, number)) / number
+
+
+def run_benchmarks(only: list[str] | None = None, repeat: int = 5) -> dict[str, float]:
+    """Per-call nanoseconds for each selected benchmark."""
+    results = {}
+    for name, setup in BENCHMARKS.items():
+        if only and not any(name.startswith(prefix) for prefix in only):
+            continue
+        with setup() as function:
+            results[name] = round(time_call(function, repeat) * 1e9, 1)
+    return results
+
+
+def compare(
+    results: dict[str, float], baseline: dict[str, float], tolerance: float = DEFAULT_TOLERANCE
+) -> list[dict[str, Any]]:
+    """Rows of (benchmark, ns, baseline ns, ratio, regressed) for every result."""
+    rows = []
+    for name, ns in results.items():
+        base = baseline.get(name)
+        ratio = ns / base if base else None
+        rows.append(
+            {
+                "benchmark": name,
+                "ns": ns,
+                "baseline_ns": base,
+                "ratio": round(ratio, 2) if ratio else None,
+                "regressed": ratio is not None and ratio > 1 + tolerance,
+            }
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Hot-path micro-benchmarks with regression thresholds")
+    parser.add_argument("--only", type=str, default=None, help="Comma-separated benchmark name prefixes")
+    parser.add_argument("--repeat", type=int, default=5, help="Repeats per benchmark (default: 5)")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="Allowed slowdown (default: 0.25)")
+    parser.add_argument("--baseline", type=str, default=str(BASELINE_PATH), help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument("--output", type=str, default=None, help="Write results as JSON")
+    args = parser.parse_args()
+
+    logger.remove()
+    results = run_benchmarks(args.only.split(",") if args.only else None, args.repeat)
+    baseline_path = Path(args.baseline)
+
+    if args.save_baseline:
+        baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+        baseline.update(results)
+        baseline_path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+        print(f"Saved {len(results)} baselines to {baseline_path}")
+
+    baseline = json.loads(baseline_path.read_text()) if baseline_path.exists() else {}
+    rows = compare(results, baseline, args.tolerance)
+    print(f"{'benchmark':<38} | {'ns/call':>12} | {'baseline':>12} | {'ratio':>6}")
+    for row in rows:
+        flag = "  REGRESSION" if row["regressed"] else ""
+        print(
+            f"{row['benchmark']:<38} | {row['ns']:>12} | {row['baseline_ns']!s:>12} | "
+            f"{row['ratio']!s:>6}{flag}"
+        )
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(rows, handle, indent=2)
+
+    regressions = [row["benchmark"] for row in rows if row["regressed"]]
+    if regressions:
+        print(f"{len(regressions)} benchmark(s) slower than baseline by more than {args.tolerance:.0%}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
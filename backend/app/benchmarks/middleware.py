@@ -0,0 +1,179 @@
+"""
+Middleware Throughput Benchmark
+
+Compares requests/sec on cached /api/forecast hits through the middleware
+stack as it is now (raw ASGI rate limiting and metrics) and as it was with
+BaseHTTPMiddleware subclasses. Both stacks run the same limiter, the same
+metrics and CORS, in-process over httpx's ASGI transport, so the difference
+is the middleware machinery alone. Persistence is switched off and the
+NASA response is pre-cached and logging is off: no network or disk I/O
+is involved.
+
+Usage:
+    python -m app.benchmarks.middleware
+    python -m app.benchmarks.middleware --requests 5000 --concurrency 16 --output results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from datetime import date, datetime, timezone
+from typing import Any, Callable
+
+import httpx
+from fastapi import FastAPI, Request, Response
+from fastapi.middleware.cors import CORSMiddleware
+from loguru import logger
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.api.routes import router
+from app.core.cache import cache_key, get_cache
+from app.core.config import get_settings
+from app.core.metrics import HTTP_REQUEST_SECONDS
+from app.core.metrics_middleware import MetricsMiddleware
+from app.core.rate_limit import RateLimitMiddleware, SlidingWindowLimiter
+from app.models.forecast import ForecastResponse, Location
+from app.services.container import ServiceContainer
+
+LOCATION = Location(latitude=40.7128, longitude=-74.006, name="New York")
+EVENT_DATE = date(2025, 7, 4)
+# High enough that no request is rejected
+UNLIMITED = 10**9
+
+
+class LegacyRateLimitMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware rate limiter, on the current limiter."""
+
+    def __init__(self, app: Any) -> None:
+        super().__init__(app)
+        self.limiter = SlidingWindowLimiter(UNLIMITED, UNLIMITED)
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        decision = self.limiter.hit(request.client.host if request.client else "unknown")
+        response = await call_next(request)
+        response.headers["X-RateLimit-Minute-Limit"] = str(UNLIMITED)
+        response.headers["X-RateLimit-Minute-Remaining"] = str(decision.minute_remaining)
+        response.headers["X-RateLimit-Hour-Limit"] = str(UNLIMITED)
+        response.headers["X-RateLimit-Hour-Remaining"] = str(decision.hour_remaining)
+        return response
+
+
+class LegacyMetricsMiddleware(BaseHTTPMiddleware):
+    """The BaseHTTPMiddleware latency recorder."""
+
+    async def dispatch(self, request: Request, call_next: Callable) -> Response:
+        start = time.perf_counter()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            route = request.scope.get("route")
+            HTTP_REQUEST_SECONDS.observe(
+                time.perf_counter() - start,
+                method=request.method,
+                route=getattr(route, "path", "unmatched"),
+                status=status,
+            )
+
+
+def build_app(stack: str) -> FastAPI:
+    """The API router behind the "asgi" (current) or "base_http" (legacy) middleware stack."""
+    app = FastAPI()
+    app.include_router(router, prefix="/api")
+    app.state.services = ServiceContainer(
+        get_settings().model_copy(update={"database_enabled": False})
+    )
+    if stack == "asgi":
+        app.add_middleware(
+            RateLimitMiddleware, requests_per_minute=UNLIMITED, requests_per_hour=UNLIMITED
+        )
+        app.add_middleware(MetricsMiddleware)
+    else:
+        app.add_middleware(LegacyRateLimitMiddleware)
+        app.add_middleware(LegacyMetricsMiddleware)
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=["http://localhost:5173"],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    return app
+
+
+def seed_cache() -> None:
+    """Put the benchmark location's forecast in the NASA cache."""
+    key = cache_key("nasa", str(LOCATION.latitude), str(LOCATION.longitude), EVENT_DATE.isoformat())
+    get_cache()[key] = ForecastResponse(
+        location=LOCATION,
+        event_date=EVENT_DATE,
+        precipitation_probability=0.35,
+        precipitation_intensity_mm=1.2,
+        summary="Light rain possible",
+        nasa_dataset="NASA POWER",
+        issued_at=datetime.now(timezone.utc),
+    )
+
+
+async def measure(app: FastAPI, n_requests: int, concurrency: int) -> float:
+    """Requests/sec for n_requests cached forecast hits from `concurrency` clients."""
+    payload = {"location": LOCATION.model_dump(), "event_date": EVENT_DATE.isoformat()}
+    headers = {"Origin": "http://localhost:5173"}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+
+        async def worker(count: int) -> None:
+            for _ in range(count):
+                response = await client.post("/api/forecast", json=payload, headers=headers)
+                response.raise_for_status()
+
+        await worker(50)  # warm-up
+        start = time.perf_counter()
+        per_worker = n_requests // concurrency
+        await asyncio.gather(*(worker(per_worker) for _ in range(concurrency)))
+        return per_worker * concurrency / (time.perf_counter() - start)
+
+
+def run_benchmark(
+    n_requests: int = 3000, concurrency: int = 8, rounds: int = 3
+) -> list[dict[str, Any]]:
+    seed_cache()
+    # Per-request log lines would otherwise dominate both stacks
+    logger.remove()
+    results = []
+    for stack in ("base_http", "asgi"):
+        app = build_app(stack)
+        best = max(asyncio.run(measure(app, n_requests, concurrency)) for _ in range(rounds))
+        results.append({"stack": stack, "requests": n_requests, "requests_per_sec": round(best)})
+    baseline = results[0]["requests_per_sec"]
+    for result in results:
+        result["speedup"] = round(result["requests_per_sec"] / baseline, 2)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark middleware throughput on cached forecasts")
+    parser.add_argument("--requests", type=int, default=3000, help="Requests per round (default: 3000)")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent clients (default: 8)")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per stack, best is kept (default: 3)")
+    parser.add_argument("--output", type=str, default=None, help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.requests, args.concurrency, args.rounds)
+    columns = ["stack", "requests", "requests_per_sec", "speedup"]
+    print(" | ".join(f"{c:>16}" for c in columns))
+    for result in results:
+        print(" | ".join(f"{result[c]!s:>16}" for c in columns))
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
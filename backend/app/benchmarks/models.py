@@ -0,0 +1,164 @@
+"""
+Model Backend Benchmark
+
+Trains every backend in app.services.model_backends on the same dataset and
+compares what matters for serving: model size on disk, load time, single-row
+and batch inference latency (including the uncertainty estimate, exactly as
+MLPredictor.predict computes it) and accuracy on a held-out split.
+
+Usage:
+    python -m app.benchmarks.models --dataset data/training.npz
+    python -m app.benchmarks.models --synthetic 20000 --output results.json
+
+A dataset can be produced with
+``python -m app.scripts.train_model --save-dataset data/training.npz``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Any, Callable
+
+import joblib
+import numpy as np
+from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
+from sklearn.model_selection import train_test_split
+from sklearn.preprocessing import StandardScaler
+
+from app.services.ml_predictor import MLPredictor
+from app.services.model_backends import MODEL_BACKENDS, build_model, predict_with_spread
+
+
+def synthetic_dataset(n_rows: int, seed: int = 42) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Deterministic stand-in for collected NASA data.
+
+    Rain depends on latitude band, season and a longitude wave, with
+    gamma-distributed noise and ~60% dry days like real daily series.
+    """
+    rng = np.random.default_rng(seed)
+    latitudes = rng.uniform(-60, 70, n_rows)
+    longitudes = rng.uniform(-180, 180, n_rows)
+    start = date(2020, 1, 1)
+    days = [start + timedelta(days=int(d)) for d in rng.integers(0, 365 * 4, n_rows)]
+    day_of_year = np.array([d.timetuple().tm_yday for d in days])
+    month = np.array([d.month for d in days])
+
+    X = MLPredictor.extract_features_batch(latitudes, longitudes, day_of_year, month)
+    seasonal = 1 + np.sign(latitudes) * np.sin(2 * np.pi * (day_of_year - 80) / 365.25)
+    climate = 8 * np.exp(-(latitudes / 15) ** 2) + 3 * (1 + np.sin(np.radians(longitudes) * 2))
+    mean = climate * seasonal / 2
+    wet = rng.random(n_rows) < np.clip(0.2 + mean / 15, 0, 0.9)
+    y = np.where(wet, rng.gamma(1.5, mean + 0.5), 0.0)
+    return X, y
+
+
+def _median_seconds(fn: Callable[[], Any], repeats: int) -> float:
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings)
+
+
+def benchmark_backend(
+    backend: str,
+    X_train: np.ndarray,
+    y_train: np.ndarray,
+    X_test: np.ndarray,
+    y_test: np.ndarray,
+    n_estimators: int,
+    max_depth: int,
+    single_repeats: int = 200,
+    batch_size: int = 1000,
+) -> dict[str, Any]:
+    """Train one backend and measure size, latency and accuracy."""
+    model = build_model(backend, n_estimators=n_estimators, max_depth=max_depth)
+
+    start = time.perf_counter()
+    model.fit(X_train, y_train)
+    fit_seconds = time.perf_counter() - start
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "model.joblib"
+        joblib.dump(model, path)
+        size_mb = path.stat().st_size / (1024 * 1024)
+        load_seconds = _median_seconds(lambda: joblib.load(path), repeats=3)
+
+    row = X_test[:1]
+    batch = X_test[:batch_size]
+    predict_with_spread(model, row)  # warm-up
+    single_seconds = _median_seconds(lambda: predict_with_spread(model, row), single_repeats)
+    batch_seconds = _median_seconds(lambda: predict_with_spread(model, batch), repeats=5)
+
+    y_pred = np.maximum(model.predict(X_test), 0.0)
+    return {
+        "backend": backend,
+        "fit_seconds": round(fit_seconds, 3),
+        "model_size_mb": round(size_mb, 3),
+        "load_ms": round(load_seconds * 1000, 2),
+        "single_row_ms": round(single_seconds * 1000, 3),
+        "batch_ms": round(batch_seconds * 1000, 2),
+        "batch_rows": len(batch),
+        "batch_us_per_row": round(batch_seconds * 1e6 / len(batch), 2),
+        "mae": round(float(mean_absolute_error(y_test, y_pred)), 3),
+        "rmse": round(float(np.sqrt(mean_squared_error(y_test, y_pred))), 3),
+        "r2_score": round(float(r2_score(y_test, y_pred)), 3),
+        "accuracy_2mm": round(float(np.mean(np.abs(y_pred - y_test) <= 2.0)), 3),
+    }
+
+
+def run_benchmark(
+    X: np.ndarray,
+    y: np.ndarray,
+    backends: tuple[str, ...] = MODEL_BACKENDS,
+    n_estimators: int = 100,
+    max_depth: int = 15,
+) -> list[dict[str, Any]]:
+    """Benchmark all backends on the same scaled train/test split."""
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.2, random_state=42)
+    scaler = StandardScaler()
+    X_train = scaler.fit_transform(X_train)
+    X_test = scaler.transform(X_test)
+    return [
+        benchmark_backend(backend, X_train, y_train, X_test, y_test, n_estimators, max_depth)
+        for backend in backends
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare ML model backends")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--dataset", type=Path, help="Dataset .npz with X and y arrays")
+    source.add_argument("--synthetic", type=int, default=20000, help="Rows of synthetic data (default: 20000)")
+    parser.add_argument("--estimators", type=int, default=100, help="Trees / 2x boosting iterations (default: 100)")
+    parser.add_argument("--max-depth", type=int, default=15, help="Maximum tree depth (default: 15)")
+    parser.add_argument("--output", type=Path, default=None, help="Write results as JSON")
+    args = parser.parse_args()
+
+    if args.dataset:
+        data = np.load(args.dataset)
+        X, y = data["X"], data["y"]
+    else:
+        X, y = synthetic_dataset(args.synthetic)
+
+    results = run_benchmark(X, y, n_estimators=args.estimators, max_depth=args.max_depth)
+
+    columns = ["backend", "model_size_mb", "load_ms", "single_row_ms", "batch_us_per_row", "mae", "r2_score"]
+    print(" | ".join(f"{c:>22}" for c in columns))
+    for result in results:
+        print(" | ".join(f"{result[c]!s:>22}" for c in columns))
+
+    if args.output:
+        args.output.write_text(json.dumps({"rows": len(y), "results": results}, indent=2))
+
+
+if __name__ == "__main__":
+    main()
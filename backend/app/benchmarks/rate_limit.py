@@ -0,0 +1,114 @@
+"""
+Rate Limiter Benchmark
+
+Measures per-request cost and retained memory of the per-client rate-limit
+state with many distinct clients, for the sliding-window limiter used by
+RateLimitMiddleware and for the timestamp-list approach it replaced.
+
+Usage:
+    python -m app.benchmarks.rate_limit
+    python -m app.benchmarks.rate_limit --clients 100000 --requests 20 --output results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+from typing import Any, Callable
+
+from app.core.rate_limit import SlidingWindowLimiter
+
+
+class TimestampListLimiter:
+    """The previous implementation: a list of timestamps per client and window."""
+
+    def __init__(self, requests_per_minute: int = 60, requests_per_hour: int = 1000) -> None:
+        self.requests_per_minute = requests_per_minute
+        self.requests_per_hour = requests_per_hour
+        self.minute_requests: dict[str, list[float]] = defaultdict(list)
+        self.hour_requests: dict[str, list[float]] = defaultdict(list)
+
+    def hit(self, client: str, now: float) -> bool:
+        self.minute_requests[client] = [t for t in self.minute_requests[client] if t > now - 60]
+        self.hour_requests[client] = [t for t in self.hour_requests[client] if t > now - 3600]
+        if len(self.minute_requests[client]) >= self.requests_per_minute:
+            return False
+        if len(self.hour_requests[client]) >= self.requests_per_hour:
+            return False
+        self.minute_requests[client].append(now)
+        self.hour_requests[client].append(now)
+        return True
+
+
+def _workload(n_clients: int, requests_per_client: int, seed: int) -> list[tuple[str, float]]:
+    """Requests from n_clients distinct IPs spread over ten minutes, in time order."""
+    rng = random.Random(seed)
+    clients = [f"10.{i >> 16 & 255}.{i >> 8 & 255}.{i & 255}" for i in range(n_clients)]
+    requests = [
+        (client, rng.uniform(0, 600)) for client in clients for _ in range(requests_per_client)
+    ]
+    requests.sort(key=lambda r: r[1])
+    return requests
+
+
+def benchmark_limiter(
+    name: str, hit: Callable[[str, float], Any], requests: list[tuple[str, float]]
+) -> dict[str, Any]:
+    tracemalloc.start()
+    start = time.perf_counter()
+    for client, now in requests:
+        hit(client, now)
+    elapsed = time.perf_counter() - start
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "limiter": name,
+        "requests": len(requests),
+        "ns_per_request": round(elapsed / len(requests) * 1e9),
+        "retained_mb": round(retained / 1024 / 1024, 1),
+    }
+
+
+def run_benchmark(
+    n_clients: int = 100_000, requests_per_client: int = 10, seed: int = 42
+) -> list[dict[str, Any]]:
+    requests = _workload(n_clients, requests_per_client, seed)
+    # tracemalloc slows both equally; timings are for comparison, not absolute
+    sliding = SlidingWindowLimiter()
+    legacy = TimestampListLimiter()
+    results = [
+        benchmark_limiter("sliding_window", sliding.hit, requests),
+        benchmark_limiter("timestamp_lists", legacy.hit, requests),
+    ]
+    evict_start = time.perf_counter()
+    evicted = sliding.evict_idle(now=600 + 2 * 3600)
+    results[0]["evicted_clients"] = evicted
+    results[0]["evict_ms"] = round((time.perf_counter() - evict_start) * 1000, 1)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark rate-limit state at many clients")
+    parser.add_argument("--clients", type=int, default=100_000, help="Distinct clients (default: 100000)")
+    parser.add_argument("--requests", type=int, default=10, help="Requests per client (default: 10)")
+    parser.add_argument("--output", type=str, default=None, help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.clients, args.requests)
+    columns = ["limiter", "requests", "ns_per_request", "retained_mb"]
+    print(" | ".join(f"{c:>16}" for c in columns))
+    for result in results:
+        print(" | ".join(f"{result[c]!s:>16}" for c in columns))
+    print(f"Evicted {results[0]['evicted_clients']} idle clients in {results[0]['evict_ms']} ms")
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump({"clients": args.clients, "results": results}, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
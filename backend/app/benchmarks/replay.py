@@ -0,0 +1,216 @@
+"""
+Traffic Replay
+
+Re-issues the requests recorded in the forecasts table against a local
+instance backed by the upstream stand-ins (see app.benchmarks.loadtest),
+preserving their timing: each row is sent at its ``created_at`` offset
+from the first row, divided by ``--speed``. Rows written by the ensemble
+endpoint are replayed against /api/forecast/ensemble, the rest against
+/api/forecast. Sending is open-loop, so a slow server shows up as latency
+and schedule lag rather than as a lower request rate.
+
+The report covers latency percentiles, achieved requests/sec, the worst
+schedule lag, status codes, NASA and ensemble cache hit ratios over the
+replay (from /metrics) and upstream calls by endpoint.
+
+Usage:
+    python -m app.benchmarks.replay --start 2025-10-01 --end 2025-10-08
+    python -m app.benchmarks.replay --db data/forecasts.db --speed 60 --output replay.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import sqlite3
+import time
+from collections import Counter
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+
+from app.benchmarks.loadtest import percentile, running_stack
+from app.core.config import get_settings
+from app.services.ensemble_forecaster import NASA_DATASET as ENSEMBLE_DATASET
+
+CACHE_METRIC = "isitrain_cache_requests_total"
+
+
+def load_requests(
+    db_path: str, start: str | None = None, end: str | None = None, limit: int | None = None
+) -> list[dict[str, Any]]:
+    """Recorded requests created in [start, end), oldest first (the file is opened read-only)."""
+    conn = sqlite3.connect(f"{Path(db_path).resolve().as_uri()}?mode=ro", uri=True)
+    conn.row_factory = sqlite3.Row
+    try:
+        rows = conn.execute(
+            """
+            SELECT latitude, longitude, location_name, event_date, nasa_dataset, created_at
+            FROM forecasts
+            WHERE created_at >= COALESCE(?, created_at) AND created_at < COALESCE(?, '9999')
+            ORDER BY created_at, id
+            LIMIT COALESCE(?, -1)
+        """,
+            (start, end, limit),
+        ).fetchall()
+    finally:
+        conn.close()
+    return [dict(row) for row in rows]
+
+
+def schedule(rows: list[dict[str, Any]], speed: float) -> list[tuple[float, str, dict[str, Any]]]:
+    """(send offset in seconds, path, JSON body) per recorded row."""
+    if not rows:
+        return []
+    first = datetime.fromisoformat(rows[0]["created_at"])
+    plan = []
+    for row in rows:
+        offset = (datetime.fromisoformat(row["created_at"]) - first).total_seconds() / speed
+        path = (
+            "/api/forecast/ensemble" if row["nasa_dataset"] == ENSEMBLE_DATASET else "/api/forecast"
+        )
+        location = {"latitude": row["latitude"], "longitude": row["longitude"]}
+        if row["location_name"]:
+            location["name"] = row["location_name"]
+        plan.append((offset, path, {"location": location, "event_date": row["event_date"]}))
+    return plan
+
+
+def cache_counts(metrics_text: str) -> Counter[tuple[str, str]]:
+    """(cache, result) -> lookups, from the Prometheus text at /metrics."""
+    counts: Counter[tuple[str, str]] = Counter()
+    for line in metrics_text.splitlines():
+        if not line.startswith(CACHE_METRIC + "{"):
+            continue
+        labels, value = line[len(CACHE_METRIC) + 1:].rsplit("} ", 1)
+        pairs = dict(pair.split("=", 1) for pair in labels.split(","))
+        counts[(pairs["cache"].strip('"'), pairs["result"].strip('"'))] += float(value)
+    return counts
+
+
+def hit_ratios(before: Counter[tuple[str, str]], after: Counter[tuple[str, str]]) -> dict[str, float]:
+    delta = after.copy()
+    delta.subtract(before)
+    ratios = {}
+    for cache in sorted({cache for cache, _ in delta}):
+        lookups = delta[(cache, "hit")] + delta[(cache, "miss")]
+        if lookups:
+            ratios[cache] = round(delta[(cache, "hit")] / lookups, 3)
+    return ratios
+
+
+async def replay(
+    api_url: str, plan: list[tuple[float, str, dict[str, Any]]], max_in_flight: int
+) -> dict[str, Any]:
+    latencies: list[float] = []
+    lags: list[float] = []
+    statuses: Counter[str] = Counter()
+    endpoints: Counter[str] = Counter()
+    in_flight = asyncio.Semaphore(max_in_flight)
+    limits = httpx.Limits(max_connections=max_in_flight)
+
+    async with httpx.AsyncClient(base_url=api_url, timeout=120, limits=limits) as client:
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        async def send(offset: float, path: str, body: dict[str, Any]) -> None:
+            await asyncio.sleep(max(0.0, started + offset - loop.time()))
+            async with in_flight:
+                lags.append(loop.time() - started - offset)
+                request_start = time.perf_counter()
+                try:
+                    response = await client.post(path, json=body)
+                    statuses[str(response.status_code)] += 1
+                except httpx.HTTPError as exc:
+                    statuses[type(exc).__name__] += 1
+                latencies.append(time.perf_counter() - request_start)
+                endpoints[path] += 1
+
+        await asyncio.gather(*(send(*item) for item in plan))
+        elapsed = loop.time() - started
+
+    return {
+        "requests": len(plan),
+        "duration_s": round(elapsed, 3),
+        "requests_per_sec": round(len(plan) / elapsed, 1) if elapsed else None,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2),
+        "max_schedule_lag_ms": round(max(lags, default=0.0) * 1000, 2),
+        "endpoints": dict(endpoints),
+        "status_codes": dict(statuses),
+    }
+
+
+def run_replay(
+    db_path: str,
+    start: str | None = None,
+    end: str | None = None,
+    limit: int | None = None,
+    speed: float = 1.0,
+    max_in_flight: int = 256,
+    upstream_latency_ms: float = 50.0,
+    error_rate: float = 0.0,
+    workers: int = 1,
+) -> dict[str, Any]:
+    rows = load_requests(db_path, start, end, limit)
+    plan = schedule(rows, speed)
+    if not plan:
+        raise SystemExit("No recorded requests in that range")
+
+    with running_stack(upstream_latency_ms, error_rate=error_rate, workers=workers) as (
+        api_url,
+        standin_url,
+    ):
+        before = cache_counts(httpx.get(api_url + "/metrics").text)
+        result = asyncio.run(replay(api_url, plan, max_in_flight))
+        after = cache_counts(httpx.get(api_url + "/metrics").text)
+        result["cache_hit_ratio"] = hit_ratios(before, after)
+        result["upstream_calls"] = httpx.get(standin_url + "/_stats").json()
+
+    result["source"] = {
+        "db": db_path,
+        "first": rows[0]["created_at"],
+        "last": rows[-1]["created_at"],
+        "speed": speed,
+    }
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Replay recorded forecast traffic against stand-ins")
+    parser.add_argument("--db", type=str, default=get_settings().database_path, help="Source database")
+    parser.add_argument("--start", type=str, default=None, help="First created_at to replay (inclusive)")
+    parser.add_argument("--end", type=str, default=None, help="Last created_at to replay (exclusive)")
+    parser.add_argument("--limit", type=int, default=None, help="Replay at most this many requests")
+    parser.add_argument("--speed", type=float, default=1.0, help="Replay rate multiplier (default: 1x)")
+    parser.add_argument("--max-in-flight", type=int, default=256, help="Concurrent request cap (default: 256)")
+    parser.add_argument("--upstream-latency-ms", type=float, default=50.0)
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of upstream calls that fail")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn worker processes (default: 1)")
+    parser.add_argument("--output", type=str, default=None, help="Write the report as JSON")
+    args = parser.parse_args()
+
+    report = run_replay(
+        args.db,
+        args.start,
+        args.end,
+        args.limit,
+        args.speed,
+        args.max_in_flight,
+        args.upstream_latency_ms,
+        args.error_rate,
+        args.workers,
+    )
+    print(json.dumps(report, indent=2))
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(report, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
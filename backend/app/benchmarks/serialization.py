@@ -0,0 +1,96 @@
+"""
+Cached Forecast Serialization Benchmark
+
+Measures the CPU cost per cached /api/forecast hit with and without the
+pre-rendered JSON body: "model" bypasses the body cache, so FastAPI
+validates the ForecastResponse against response_model and encodes it;
+"rendered" serves the body rendered on the first hit as a raw Response. Requests go through the full middleware stack in-process
+(see app.benchmarks.middleware), with logging and persistence off.
+
+Usage:
+    python -m app.benchmarks.serialization
+    python -m app.benchmarks.serialization --requests 5000 --output results.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import time
+from contextlib import nullcontext
+from datetime import datetime, timezone
+from typing import Any
+from unittest.mock import patch
+
+import httpx
+from fastapi import FastAPI
+from loguru import logger
+
+from app.benchmarks.middleware import EVENT_DATE, LOCATION, build_app
+from app.models.forecast import ForecastResponse
+from app.services.nasa_power import NasaPowerClient
+
+
+def seed() -> None:
+    """Cache the benchmark forecast, dropping any JSON body rendered for it."""
+    forecast = ForecastResponse(
+        location=LOCATION,
+        event_date=EVENT_DATE,
+        precipitation_probability=0.35,
+        precipitation_intensity_mm=1.2,
+        summary="Light rain possible (Based on 2024 historical data)",
+        nasa_dataset="NASA POWER (GPM IMERG derived)",
+        issued_at=datetime.now(timezone.utc),
+    )
+    NasaPowerClient._store(NasaPowerClient._forecast_key(LOCATION, EVENT_DATE), forecast)
+
+
+async def cpu_per_request(app: FastAPI, n_requests: int) -> float:
+    """Process CPU seconds per sequential cached hit (httpx client included, same for both)."""
+    payload = {"location": LOCATION.model_dump(), "event_date": EVENT_DATE.isoformat()}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for _ in range(50):  # warm-up
+            (await client.post("/api/forecast", json=payload)).raise_for_status()
+        start = time.process_time()
+        for _ in range(n_requests):
+            (await client.post("/api/forecast", json=payload)).raise_for_status()
+        return (time.process_time() - start) / n_requests
+
+
+def run_benchmark(n_requests: int = 3000, rounds: int = 3) -> list[dict[str, Any]]:
+    logger.remove()
+    app = build_app("asgi")
+    results = []
+    for mode in ("model", "rendered"):
+        seed()
+        # Without cached bodies the route falls through to the forecast cache
+        bypass = patch.object(NasaPowerClient, "cached_response", lambda *args: None)
+        with bypass if mode == "model" else nullcontext():
+            best = min(asyncio.run(cpu_per_request(app, n_requests)) for _ in range(rounds))
+        results.append({"mode": mode, "requests": n_requests, "cpu_us_per_hit": round(best * 1e6, 1)})
+    saving = results[0]["cpu_us_per_hit"] - results[1]["cpu_us_per_hit"]
+    results[1]["saving_us_per_hit"] = round(saving, 1)
+    results[1]["saving_pct"] = round(100 * saving / results[0]["cpu_us_per_hit"], 1)
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark CPU per cached forecast hit")
+    parser.add_argument("--requests", type=int, default=3000, help="Requests per round (default: 3000)")
+    parser.add_argument("--rounds", type=int, default=3, help="Rounds per mode, best is kept (default: 3)")
+    parser.add_argument("--output", type=str, default=None, help="Write results as JSON")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.requests, args.rounds)
+    for result in results:
+        print(json.dumps(result))
+
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(results, handle, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,150 @@
+"""
+Upstream Stand-in Servers
+
+Local replacements for the two upstream APIs the backend calls, so load
+tests run offline and reproducibly:
+
+- NASA POWER daily point API at ``/api/temporal/daily/point``
+- Nominatim ``/search`` and ``/reverse``
+
+Responses have the upstream shape and deterministic values (precipitation
+derived from a checksum of the coordinates and day). Every request waits
+``latency_ms`` (plus up to ``jitter_ms``) and fails with a 503 at
+``error_rate``. ``GET /_stats`` returns call counts per upstream endpoint
+and ``POST /_reset`` zeroes them.
+
+Usage:
+    python -m app.benchmarks.standins --port 8901 --latency-ms 80 --error-rate 0.01
+
+then start the API with
+``NASA_POWER_URL=http://127.0.0.1:8901/api/temporal/daily/point`` and
+``NOMINATIM_URL=http://127.0.0.1:8901``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import random
+import zlib
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+POWER_PATH = "/api/temporal/daily/point"
+
+
+@dataclass
+class StandinConfig:
+    latency_ms: float = 50.0
+    jitter_ms: float = 10.0
+    error_rate: float = 0.0
+    seed: int = 42
+
+
+def _daily_precipitation(latitude: float, longitude: float, day: str) -> float:
+    """Deterministic mm/day: dry ~60% of days, otherwise up to ~25 mm."""
+    checksum = zlib.crc32(f"{latitude:.4f},{longitude:.4f},{day}".encode())
+    fraction = (checksum % 10_000) / 10_000
+    return 0.0 if fraction < 0.6 else round((fraction - 0.6) * 62.5, 2)
+
+
+def create_standin_app(config: StandinConfig) -> Starlette:
+    """ASGI app serving the POWER and Nominatim stand-ins."""
+    rng = random.Random(config.seed)
+    calls: Counter[str] = Counter()
+
+    async def upstream_call(name: str) -> JSONResponse | None:
+        """Count the call, wait out the simulated latency and maybe fail."""
+        calls[name] += 1
+        delay = config.latency_ms + rng.uniform(0, config.jitter_ms)
+        await asyncio.sleep(delay / 1000)
+        if rng.random() < config.error_rate:
+            calls[f"{name}_errors"] += 1
+            return JSONResponse({"detail": "stand-in injected failure"}, status_code=503)
+        return None
+
+    async def power_daily(request: Request) -> JSONResponse:
+        failure = await upstream_call("power")
+        if failure:
+            return failure
+        params = request.query_params
+        latitude = float(params["latitude"])
+        longitude = float(params["longitude"])
+        start = datetime.strptime(params["start"], "%Y%m%d").date()
+        end = datetime.strptime(params["end"], "%Y%m%d").date()
+        days = [start + timedelta(days=offset) for offset in range((end - start).days + 1)]
+        values = {
+            day.strftime("%Y%m%d"): _daily_precipitation(latitude, longitude, day.isoformat())
+            for day in days
+        }
+        return JSONResponse(
+            {
+                "type": "Feature",
+                "geometry": {"type": "Point", "coordinates": [longitude, latitude]},
+                "properties": {"parameter": {"PRECTOTCORR": values}},
+            }
+        )
+
+    async def nominatim_search(request: Request) -> JSONResponse:
+        failure = await upstream_call("nominatim_search")
+        if failure:
+            return failure
+        query = request.query_params.get("q", "")
+        checksum = zlib.crc32(query.encode())
+        latitude = round((checksum % 12_000) / 100 - 60, 4)
+        longitude = round((checksum // 12_000 % 36_000) / 100 - 180, 4)
+        return JSONResponse(
+            [{"lat": str(latitude), "lon": str(longitude), "display_name": f"{query} (stand-in)"}]
+        )
+
+    async def nominatim_reverse(request: Request) -> JSONResponse:
+        failure = await upstream_call("nominatim_reverse")
+        if failure:
+            return failure
+        params = request.query_params
+        return JSONResponse(
+            {"display_name": f"Stand-in place {float(params['lat']):.3f}, {float(params['lon']):.3f}"}
+        )
+
+    async def stats(request: Request) -> JSONResponse:
+        return JSONResponse(dict(calls))
+
+    async def reset(request: Request) -> JSONResponse:
+        calls.clear()
+        return JSONResponse({})
+
+    return Starlette(
+        routes=[
+            Route(POWER_PATH, power_daily),
+            Route("/search", nominatim_search),
+            Route("/reverse", nominatim_reverse),
+            Route("/_stats", stats),
+            Route("/_reset", reset, methods=["POST"]),
+        ]
+    )
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Serve NASA POWER and Nominatim stand-ins")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8901)
+    parser.add_argument("--latency-ms", type=float, default=50.0, help="Base latency per call (default: 50)")
+    parser.add_argument("--jitter-ms", type=float, default=10.0, help="Extra uniform latency (default: 10)")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Share of calls answered with 503")
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    config = StandinConfig(args.latency_ms, args.jitter_ms, args.error_rate, args.seed)
+    uvicorn.run(create_standin_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Startup Import Profile
+
+Imports a module (``app.main`` by default) in a fresh interpreter under
+``python -X importtime`` and reports the modules with the largest
+cumulative import time. This is what every uvicorn worker pays before
+/health can answer. sklearn, scipy and joblib must not appear: they are
+loaded with the ML model, after startup (see MLPredictor.ensure_loaded),
+and the run exits with status 1 if any of them is imported.
+
+Usage:
+    python -m app.benchmarks.startup
+    python -m app.benchmarks.startup --module app.services.ensemble_forecaster --top 30
+"""
+
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+from typing import Any
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+HEAVY_MODULES = ("sklearn", "scipy", "joblib")
+
+
+def import_profile(module: str = "app.main") -> list[dict[str, Any]]:
+    """One row (module, self_us, cumulative_us, depth) per module imported by `module`."""
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=BACKEND_DIR,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    rows = []
+    for line in completed.stderr.splitlines():
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        rows.append(
+            {
+                "module": name.strip(),
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+                "depth": (len(name) - len(name.lstrip())) // 2,
+            }
+        )
+    return rows
+
+
+def heavy_imports(rows: list[dict[str, Any]]) -> list[str]:
+    """Imported modules belonging to one of HEAVY_MODULES."""
+    return [row["module"] for row in rows if row["module"].split(".")[0] in HEAVY_MODULES]
+
+
+def report(rows: list[dict[str, Any]], top: int = 15) -> str:
+    slowest = sorted(rows, key=lambda row: row["cumulative_us"], reverse=True)[:top]
+    total_ms = max((row["cumulative_us"] for row in rows), default=0) / 1000
+    lines = [f"{len(rows)} modules, {total_ms:.0f} ms", f"{'cumulative ms':>14} | {'self ms':>8} | module"]
+    for row in slowest:
+        lines.append(
+            f"{row['cumulative_us'] / 1000:>14.1f} | {row['self_us'] / 1000:>8.1f} | "
+            f"{'  ' * row['depth']}{row['module']}"
+        )
+    return "\n".join(lines)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Import-time profile of API startup")
+    parser.add_argument("--module", type=str, default="app.main", help="Module to import (default: app.main)")
+    parser.add_argument("--top", type=int, default=20, help="Modules to list (default: 20)")
+    args = parser.parse_args()
+
+    rows = import_profile(args.module)
+    print(report(rows, args.top))
+
+    heavy = heavy_imports(rows)
+    if heavy:
+        print(f"{len(heavy)} heavy module(s) imported at startup: {', '.join(heavy[:10])}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+"""
+Archival compaction of cold forecast months.
+
+The forecasts table is the hot partition: the API only writes and reads
+there. Whole months that fall outside the retention window are moved out
+into compressed columnar files (np.savez_compressed, one array per column)
+and recorded in the forecast_archives catalog, which keeps the table and
+its indexes small. A month is compacted in pages of PAGE_ROWS rows, each
+page written to its own part file, so memory stays bounded and earlier
+parts are never rewritten.
+
+Archived rows leave the API: /api/history and /api/export only read the
+forecasts table and report the last archived month in an
+``X-Archived-Through`` header. Archived months stay readable for analytics
+via :func:`load_month` and :func:`iter_archives`.
+"""
+
+from __future__ import annotations
+
+import os
+from datetime import date, datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Iterator
+
+import numpy as np
+from loguru import logger
+
+from app.core.database import ForecastDatabase
+
+# Rows moved (and held in memory) per archive part file
+PAGE_ROWS = 50_000
+
+# Column name -> dtype used in archive files (strings as fixed-width unicode)
+COLUMNS: dict[str, str] = {
+    "id": "int64",
+    "latitude": "float64",
+    "longitude": "float64",
+    "location_name": "U",
+    "event_date": "U",
+    "precipitation_probability": "float64",
+    "precipitation_intensity_mm": "float64",
+    "summary": "U",
+    "nasa_dataset": "U",
+    "issued_at": "U",
+    "created_at": "U",
+}
+
+
+def archive_cutoff(retention_days: int, now: datetime | None = None) -> date:
+    """First day of the oldest month that must stay hot."""
+    now = now or datetime.now(timezone.utc)
+    oldest_hot = (now - timedelta(days=retention_days)).date()
+    return oldest_hot.replace(day=1)
+
+
+def _next_month(month: str) -> str:
+    year, mon = int(month[:4]), int(month[5:7])
+    return f"{year + mon // 12:04d}-{mon % 12 + 1:02d}"
+
+
+def _to_columns(rows: list[Any]) -> dict[str, np.ndarray]:
+    columns = {}
+    for index, (name, dtype) in enumerate(COLUMNS.items()):
+        values = [row[index] for row in rows]
+        if dtype == "U":
+            columns[name] = np.array(["" if v is None else str(v) for v in values], dtype=str)
+        else:
+            columns[name] = np.array(values, dtype=dtype)
+    return columns
+
+
+def part_path(path: Path | str, part: int) -> Path:
+    """File of part ``part`` of a month whose first part is ``path``."""
+    path = Path(path)
+    return path if part == 0 else path.with_name(f"{path.stem}.{part}{path.suffix}")
+
+
+def load_archive(path: Path | str) -> dict[str, np.ndarray]:
+    """Columns of one archive part file."""
+    with np.load(path, allow_pickle=False) as data:
+        return {name: data[name] for name in data.files}
+
+
+def load_month(path: Path | str, parts: int) -> dict[str, np.ndarray]:
+    """Columns of an archived month, its part files concatenated in id order."""
+    loaded = [load_archive(part_path(path, part)) for part in range(parts)]
+    return {name: np.concatenate([columns[name] for columns in loaded]) for name in loaded[0]}
+
+
+def _write_archive(path: Path, columns: dict[str, np.ndarray]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + ".tmp")
+    with open(tmp, "wb") as handle:
+        np.savez_compressed(handle, **columns)
+        handle.flush()
+        os.fsync(handle.fileno())
+    os.replace(tmp, path)
+
+
+def compact_month(
+    db: ForecastDatabase, month: str, archive_dir: Path, page_rows: int = PAGE_ROWS
+) -> dict[str, Any]:
+    """
+    Move every forecast created in ``month`` (YYYY-MM) into archive files.
+
+    Rows are moved ``page_rows`` at a time in id order, one new part file
+    per page. Each file is written and synced before its rows are deleted,
+    and the catalog update and delete share one transaction, so a crash
+    leaves every row either hot or archived; an orphaned part file is
+    overwritten by the next run. Re-running for a month that already has
+    an archive adds parts to it.
+    """
+    start, end = f"{month}-01", f"{_next_month(month)}-01"
+    first_path = archive_dir / f"forecasts-{month}.npz"
+    moved = 0
+    while True:
+        with db.connection() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT {", ".join(COLUMNS)} FROM forecasts
+                WHERE created_at >= ? AND created_at < ?
+                ORDER BY id
+                LIMIT ?
+            """,
+                (start, end, page_rows),
+            ).fetchall()
+            catalog = conn.execute(
+                "SELECT path, parts FROM forecast_archives WHERE month = ?", (month,)
+            ).fetchone()
+        if not rows:
+            break
+
+        path, parts = (catalog[0], catalog[1]) if catalog is not None else (str(first_path), 0)
+        _write_archive(part_path(path, parts), _to_columns(rows))
+
+        ids = [row[0] for row in rows]
+        with db.connection() as conn, conn:
+            conn.execute(
+                """
+                INSERT INTO forecast_archives (
+                    month, path, parts, row_count, sum_probability, sum_precipitation_mm,
+                    min_id, max_id
+                ) VALUES (?, ?, 1, ?, ?, ?, ?, ?)
+                ON CONFLICT (month) DO UPDATE SET
+                    parts = parts + 1,
+                    row_count = row_count + excluded.row_count,
+                    sum_probability = sum_probability + excluded.sum_probability,
+                    sum_precipitation_mm = sum_precipitation_mm + excluded.sum_precipitation_mm,
+                    min_id = MIN(min_id, excluded.min_id),
+                    max_id = MAX(max_id, excluded.max_id),
+                    compacted_at = CURRENT_TIMESTAMP
+            """,
+                (
+                    month,
+                    path,
+                    len(rows),
+                    float(sum(row[5] for row in rows)),
+                    float(sum(row[6] for row in rows)),
+                    ids[0],
+                    ids[-1],
+                ),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO forecast_archive_locations (latitude, longitude) VALUES (?, ?)",
+                {(row[1], row[2]) for row in rows},
+            )
+            # The page is the month's lowest ids, so this deletes exactly it
+            conn.execute(
+                "DELETE FROM forecasts WHERE created_at >= ? AND created_at < ? AND id <= ?",
+                (start, end, ids[-1]),
+            )
+        moved += len(rows)
+        logger.info(f"📦 Archived {len(rows)} forecasts from {month} to {part_path(path, parts)}")
+
+    if not moved:
+        return {"month": month, "rows": 0}
+    return {"month": month, "rows": moved, "path": path}
+
+
+def compact_forecasts(
+    db: ForecastDatabase,
+    archive_dir: Path | str,
+    retention_days: int,
+    now: datetime | None = None,
+    page_rows: int = PAGE_ROWS,
+) -> list[dict[str, Any]]:
+    """Archive every whole month older than the retention window."""
+    cutoff = archive_cutoff(retention_days, now).isoformat()
+    with db.connection() as conn:
+        months = [
+            row[0]
+            for row in conn.execute(
+                """
+                SELECT DISTINCT substr(created_at, 1, 7) FROM forecasts
+                WHERE created_at < ?
+                ORDER BY 1
+            """,
+                (cutoff,),
+            )
+        ]
+    return [compact_month(db, month, Path(archive_dir), page_rows) for month in months]
+
+
+def iter_archives(
+    db: ForecastDatabase, start_month: str | None = None, end_month: str | None = None
+) -> Iterator[tuple[str, dict[str, np.ndarray]]]:
+    """Yield (month, columns) for archived months in [start_month, end_month], one at a time."""
+    with db.connection() as conn:
+        catalog = conn.execute(
+            """
+            SELECT month, path, parts FROM forecast_archives
+            WHERE month >= COALESCE(?, month) AND month <= COALESCE(?, month)
+            ORDER BY month
+        """,
+            (start_month, end_month),
+        ).fetchall()
+    for month, path, parts in catalog:
+        yield month, load_month(path, parts)
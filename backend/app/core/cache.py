@@ -1,10 +1,17 @@
+from typing import Any, Hashable
+
 from cachetools import TTLCache
 
 from .config import get_settings
+from .metrics import CACHE_ENTRIES, CACHE_HIT_RATIO, cache_hit_ratio, record_cache_lookup
 
 
 _settings = get_settings()
 _cache = TTLCache(maxsize=256, ttl=_settings.cache_ttl)
+# JSON bodies of the forecasts in _cache, same keys, served without re-encoding
+_rendered_cache = TTLCache(maxsize=256, ttl=_settings.cache_ttl)
+# NasaPowerClient.daily_series arrays; separate so cell sweeps don't evict forecasts
+_series_cache = TTLCache(maxsize=_settings.series_cache_size, ttl=_settings.cache_ttl)
 
 
 def cache_key(*parts: str) -> str:
@@ -17,3 +24,68 @@ def cache_key(*parts: str) -> str:
 
 def get_cache() -> TTLCache:
     return _cache
+
+
+def get_rendered_cache() -> TTLCache:
+    return _rendered_cache
+
+
+def get_series_cache() -> TTLCache:
+    return _series_cache
+
+
+class ResultCache:
+    """TTL cache with hit/miss accounting and explicit invalidation."""
+
+    def __init__(self, maxsize: int, ttl: float, name: str | None = None) -> None:
+        self._cache: TTLCache = TTLCache(maxsize=maxsize, ttl=ttl)
+        self.name = name
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable) -> Any | None:
+        value = self._cache.get(key)
+        if self.name:
+            record_cache_lookup(self.name, value is not None)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        self._cache[key] = value
+
+    def invalidate(self) -> None:
+        """Drop every entry, e.g. after a model reload or weight change."""
+        self._cache.clear()
+        self.invalidations += 1
+
+    def stats(self) -> dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 3) if lookups else 0.0,
+            "size": len(self._cache),
+            "maxsize": self._cache.maxsize,
+            "invalidations": self.invalidations,
+        }
+
+
+_ensemble_cache = ResultCache(
+    maxsize=_settings.ensemble_cache_size, ttl=_settings.cache_ttl, name="ensemble"
+)
+
+for _name, _instance in (
+    ("nasa", _cache),
+    ("nasa_series", _series_cache),
+    ("ensemble", _ensemble_cache._cache),
+):
+    CACHE_HIT_RATIO.set_function(lambda name=_name: cache_hit_ratio(name), cache=_name)
+    CACHE_ENTRIES.set_function(_instance.__len__, cache=_name)
+
+
+def get_ensemble_cache() -> ResultCache:
+    return _ensemble_cache
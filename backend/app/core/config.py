@@ -16,8 +16,14 @@ class Settings(BaseSettings):
     # NASA API settings
     nasa_timeout: int = 15
     
+    # Upstream endpoints (point these at app.benchmarks.standins for offline load tests)
+    nasa_power_url: str = "https://power.larc.nasa.gov/api/temporal/daily/point"
+    nominatim_url: str = "https://nominatim.openstreetmap.org"
+    
     # Cache settings
     cache_ttl: int = 900  # 15 minutes
+    ensemble_cache_size: int = 1024
+    series_cache_size: int = 256  # multi-day NASA series, kept apart from forecasts
     
     # Proxy settings
     http_proxy: str | None = None
@@ -26,10 +32,27 @@ class Settings(BaseSettings):
     # Rate limiting
     rate_limit_per_minute: int = 60
     rate_limit_per_hour: int = 1000
+    # "memory" (per process) or "sqlite" (shared by all workers on the node)
+    rate_limit_backend: str = "memory"
+    rate_limit_path: str = "data/rate_limits.db"
     
     # Database
     database_enabled: bool = True
     database_path: str = "data/forecasts.db"
+    # Write-behind batching of forecast inserts
+    write_queue_max_pending: int = 10000
+    write_batch_size: int = 500
+    write_flush_interval: float = 1.0  # seconds
+    write_enqueue_timeout: float = 0.05  # seconds to wait for queue space before dropping
+    # Months older than this are compacted into archive files (app.scripts.compact_forecasts)
+    database_retention_days: int = 90
+    archive_path: str = "data/archive"
+    
+    # Precomputed day-of-year climatology (built by app.scripts.build_climatology)
+    climatology_path: str = "data/climatology"
+    
+    # ML model backend: "random_forest" or "hist_gradient_boosting"
+    ml_backend: str = "random_forest"
     
     # Logging
     log_level: str = "INFO"
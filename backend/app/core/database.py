@@ -2,26 +2,257 @@
 
 from __future__ import annotations
 
+import asyncio
 import json
+import math
+import queue
 import sqlite3
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Any
+from typing import Any, Callable, Iterator, TypeVar
 
+from loguru import logger
+
+from app.core.config import get_settings
+from app.core.metrics import DB_OPERATION_SECONDS
 from app.models.forecast import ForecastResponse
 
+T = TypeVar("T")
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+HISTORY_ORDERS = ("time", "distance")
+# Connections (and executor threads) per database
+DEFAULT_POOL_SIZE = 4
+# Prepared statements kept per connection
+STATEMENT_CACHE_SIZE = 64
+
+
+# Running aggregates behind /api/stats, kept current by an insert trigger so
+# reading them is O(1) regardless of table size. forecast_locations holds
+# one row per distinct coordinate pair; the trigger checks it before
+# inserting to count new locations.
+_STATS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS forecast_stats (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    total_forecasts INTEGER NOT NULL DEFAULT 0,
+    sum_probability REAL NOT NULL DEFAULT 0,
+    sum_precipitation_mm REAL NOT NULL DEFAULT 0,
+    unique_locations INTEGER NOT NULL DEFAULT 0
+);
+INSERT OR IGNORE INTO forecast_stats (id) VALUES (1);
+
+CREATE TABLE IF NOT EXISTS forecast_locations (
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    PRIMARY KEY (latitude, longitude)
+) WITHOUT ROWID;
+
+CREATE TRIGGER IF NOT EXISTS forecasts_stats_insert AFTER INSERT ON forecasts
+BEGIN
+    UPDATE forecast_stats SET
+        total_forecasts = total_forecasts + 1,
+        sum_probability = sum_probability + NEW.precipitation_probability,
+        sum_precipitation_mm = sum_precipitation_mm + NEW.precipitation_intensity_mm,
+        unique_locations = unique_locations + NOT EXISTS (
+            SELECT 1 FROM forecast_locations
+            WHERE latitude = NEW.latitude AND longitude = NEW.longitude
+        )
+    WHERE id = 1;
+    INSERT OR IGNORE INTO forecast_locations (latitude, longitude)
+    VALUES (NEW.latitude, NEW.longitude);
+END;
+"""
+
+
+# Spatial index over forecast coordinates. Points are stored as degenerate
+# boxes keyed by forecasts.id; triggers keep it in step with the table.
+_SPATIAL_SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS forecast_rtree USING rtree(
+    id, min_lat, max_lat, min_lon, max_lon
+);
+
+CREATE TRIGGER IF NOT EXISTS forecasts_rtree_insert AFTER INSERT ON forecasts
+BEGIN
+    INSERT INTO forecast_rtree (id, min_lat, max_lat, min_lon, max_lon)
+    VALUES (NEW.id, NEW.latitude, NEW.latitude, NEW.longitude, NEW.longitude);
+END;
+
+CREATE TRIGGER IF NOT EXISTS forecasts_rtree_delete AFTER DELETE ON forecasts
+BEGIN
+    DELETE FROM forecast_rtree WHERE id = OLD.id;
+END;
+"""
+
+
+# Catalog of cold months compacted out of the forecasts table by
+# app.core.archive. Archived rows stay counted in forecast_stats; their
+# sums and coordinates are kept here so rebuild_statistics can include them.
+# A month's rows are in ``parts`` files: ``path`` and then one file per
+# later compaction page (see app.core.archive.part_path).
+_ARCHIVE_SCHEMA = """
+CREATE TABLE IF NOT EXISTS forecast_archives (
+    month TEXT PRIMARY KEY,
+    path TEXT NOT NULL,
+    parts INTEGER NOT NULL DEFAULT 1,
+    row_count INTEGER NOT NULL,
+    sum_probability REAL NOT NULL,
+    sum_precipitation_mm REAL NOT NULL,
+    min_id INTEGER NOT NULL,
+    max_id INTEGER NOT NULL,
+    compacted_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE TABLE IF NOT EXISTS forecast_archive_locations (
+    latitude REAL NOT NULL,
+    longitude REAL NOT NULL,
+    PRIMARY KEY (latitude, longitude)
+) WITHOUT ROWID;
+"""
+
+
+def _haversine_km(lat1: float, lon1: float, lat2: float, lon2: float) -> float:
+    """Great-circle distance in kilometres (registered as an SQL function)."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def _radius_bbox(
+    latitude: float, longitude: float, radius_km: float
+) -> tuple[float, float, float, float]:
+    """(min_lat, min_lon, max_lat, max_lon) enclosing a circle; may extend past ±180° longitude."""
+    d_lat = radius_km / KM_PER_DEGREE_LAT
+    min_lat, max_lat = max(latitude - d_lat, -90.0), min(latitude + d_lat, 90.0)
+    cos_lat = min(math.cos(math.radians(min_lat)), math.cos(math.radians(max_lat)))
+    if cos_lat <= 1e-9 or radius_km / (KM_PER_DEGREE_LAT * cos_lat) >= 180.0:
+        return min_lat, -180.0, max_lat, 180.0
+    d_lon = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+    return min_lat, longitude - d_lon, max_lat, longitude + d_lon
+
+
+def _longitude_ranges(min_lon: float, max_lon: float) -> list[tuple[float, float]]:
+    """Split a longitude span that crosses the antimeridian into in-range pieces."""
+    if min_lon < -180.0:
+        return [(min_lon + 360.0, 180.0), (-180.0, max_lon)]
+    if max_lon > 180.0:
+        return [(min_lon, 180.0), (-180.0, max_lon - 360.0)]
+    if min_lon > max_lon:
+        # Box given west-to-east across the antimeridian, e.g. 170 to -170
+        return [(min_lon, 180.0), (-180.0, max_lon)]
+    return [(min_lon, max_lon)]
+
 
 class ForecastDatabase:
-    """SQLite database for storing forecast history."""
+    """
+    SQLite database for storing forecast history.
+
+    Meant to live for the whole application: connections are pooled and
+    kept open, so each one reuses its prepared statements, and the schema
+    is created once in the constructor. Connections run in WAL mode with
+    synchronous=NORMAL, letting readers proceed during writes and syncing
+    only at checkpoints. The *_async methods run on a dedicated thread pool
+    sized to the connection pool, so they never block the event loop or
+    wait for a connection.
+
+    With ``read_only`` an existing file is opened with ``mode=ro`` and the
+    schema is left as it is: no tables, migrations or statistics rebuilds,
+    so tools reading a copy of the database never modify it.
+    """
 
-    def __init__(self, db_path: str = "data/forecasts.db") -> None:
+    def __init__(
+        self,
+        db_path: str = "data/forecasts.db",
+        pool_size: int = DEFAULT_POOL_SIZE,
+        read_only: bool = False,
+    ) -> None:
         self.db_path = Path(db_path)
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
-        self._init_db()
+        self.read_only = read_only
+        if read_only:
+            if not self.db_path.is_file():
+                raise FileNotFoundError(f"No forecasts database at {self.db_path}")
+        else:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.pool_size = pool_size
+        self._pool: queue.LifoQueue[sqlite3.Connection] = queue.LifoQueue()
+        self._opened = 0
+        self._pool_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=pool_size, thread_name_prefix="forecast-db"
+        )
+        if not read_only:
+            self._init_db()
 
+    def _connect(self) -> sqlite3.Connection:
+        if self.read_only:
+            conn = sqlite3.connect(
+                f"{self.db_path.resolve().as_uri()}?mode=ro",
+                uri=True,
+                check_same_thread=False,
+                cached_statements=STATEMENT_CACHE_SIZE,
+            )
+        else:
+            conn = sqlite3.connect(
+                self.db_path,
+                check_same_thread=False,
+                cached_statements=STATEMENT_CACHE_SIZE,
+            )
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute("PRAGMA busy_timeout=5000")
+        conn.row_factory = sqlite3.Row
+        conn.create_function("haversine_km", 4, _haversine_km, deterministic=True)
+        return conn
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled connection, opening one if the pool is not full yet."""
+        try:
+            conn = self._pool.get_nowait()
+        except queue.Empty:
+            with self._pool_lock:
+                can_open = self._opened < self.pool_size
+                if can_open:
+                    self._opened += 1
+            if can_open:
+                try:
+                    conn = self._connect()
+                except Exception:
+                    with self._pool_lock:
+                        self._opened -= 1
+                    raise
+            else:
+                conn = self._pool.get()
+        try:
+            yield conn
+        finally:
+            self._pool.put(conn)
+
+    def close(self) -> None:
+        """Wait for queued work and close every pooled connection."""
+        self._executor.shutdown(wait=True)
+        while True:
+            try:
+                self._pool.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._pool_lock:
+            self._opened = 0
+
+    async def _run(self, function: Callable[..., T], *args: Any) -> T:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, partial(function, *args))
+
+    @DB_OPERATION_SECONDS.time(operation="init_db")
     def _init_db(self) -> None:
         """Initialize the database schema."""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.connection() as conn, conn:
             conn.execute(
                 """
                 CREATE TABLE IF NOT EXISTS forecasts (
@@ -41,78 +272,342 @@ class ForecastDatabase:
             )
             conn.execute(
                 """
-                CREATE INDEX IF NOT EXISTS idx_event_date 
+                CREATE INDEX IF NOT EXISTS idx_event_date
                 ON forecasts(event_date)
             """
             )
+            # Lets compaction find cold months without scanning the hot ones
             conn.execute(
                 """
-                CREATE INDEX IF NOT EXISTS idx_location 
-                ON forecasts(latitude, longitude)
+                CREATE INDEX IF NOT EXISTS idx_created_at
+                ON forecasts(created_at)
             """
             )
-            conn.commit()
+            # Serves exact-point history already ordered by time (and
+            # supersedes the old two-column location index)
+            conn.execute(
+                """
+                CREATE INDEX IF NOT EXISTS idx_location_created
+                ON forecasts(latitude, longitude, created_at)
+            """
+            )
+            conn.execute("DROP INDEX IF EXISTS idx_location")
+            spatial_created = not self._table_exists(conn, "forecast_rtree")
+            conn.executescript(_SPATIAL_SCHEMA)
+            if spatial_created:
+                conn.execute(
+                    """
+                    INSERT INTO forecast_rtree (id, min_lat, max_lat, min_lon, max_lon)
+                    SELECT id, latitude, latitude, longitude, longitude FROM forecasts
+                """
+                )
+            conn.executescript(_ARCHIVE_SCHEMA)
+            archive_columns = {
+                row[1] for row in conn.execute("PRAGMA table_info(forecast_archives)")
+            }
+            if "parts" not in archive_columns:
+                conn.execute(
+                    "ALTER TABLE forecast_archives ADD COLUMN parts INTEGER NOT NULL DEFAULT 1"
+                )
+            stats_created = not self._table_exists(conn, "forecast_stats")
+            conn.executescript(_STATS_SCHEMA)
+        if stats_created:
+            # Existing database: seed the aggregates from the rows already stored
+            self.rebuild_statistics()
+
+    @staticmethod
+    def _table_exists(conn: sqlite3.Connection, name: str) -> bool:
+        return conn.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (name,)
+        ).fetchone() is not None
+
+    _INSERT_FORECAST = """
+        INSERT INTO forecasts (
+            latitude, longitude, location_name, event_date,
+            precipitation_probability, precipitation_intensity_mm,
+            summary, nasa_dataset, issued_at
+        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """
+
+    @staticmethod
+    def _forecast_row(forecast: ForecastResponse) -> tuple[Any, ...]:
+        return (
+            forecast.location.latitude,
+            forecast.location.longitude,
+            forecast.location.name,
+            forecast.event_date.isoformat(),
+            forecast.precipitation_probability,
+            forecast.precipitation_intensity_mm,
+            forecast.summary,
+            forecast.nasa_dataset,
+            forecast.issued_at.isoformat(),
+        )
 
+    @DB_OPERATION_SECONDS.time(operation="save_forecast")
     def save_forecast(self, forecast: ForecastResponse) -> int:
         """Save a forecast to the database."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                """
-                INSERT INTO forecasts (
-                    latitude, longitude, location_name, event_date,
-                    precipitation_probability, precipitation_intensity_mm,
-                    summary, nasa_dataset, issued_at
-                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """,
-                (
-                    forecast.location.latitude,
-                    forecast.location.longitude,
-                    forecast.location.name,
-                    forecast.event_date.isoformat(),
-                    forecast.precipitation_probability,
-                    forecast.precipitation_intensity_mm,
-                    forecast.summary,
-                    forecast.nasa_dataset,
-                    forecast.issued_at.isoformat(),
-                ),
-            )
-            conn.commit()
+        with self.connection() as conn, conn:
+            cursor = conn.execute(self._INSERT_FORECAST, self._forecast_row(forecast))
             return cursor.lastrowid or 0
 
+    @DB_OPERATION_SECONDS.time(operation="save_forecasts")
+    def save_forecasts(self, forecasts: list[ForecastResponse]) -> int:
+        """Save many forecasts in one transaction; returns the number of rows."""
+        with self.connection() as conn, conn:
+            conn.executemany(
+                self._INSERT_FORECAST, [self._forecast_row(f) for f in forecasts]
+            )
+        return len(forecasts)
+
+    @DB_OPERATION_SECONDS.time(operation="get_forecast_history")
     def get_forecast_history(
-        self, latitude: float, longitude: float, limit: int = 10
+        self,
+        latitude: float | None = None,
+        longitude: float | None = None,
+        limit: int = 10,
+        radius_km: float | None = None,
+        bbox: tuple[float, float, float, float] | None = None,
+        order: str = "time",
     ) -> list[dict[str, Any]]:
-        """Get forecast history for a location."""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.row_factory = sqlite3.Row
+        """
+        Get forecast history for a location or an area.
+
+        Without radius_km or bbox this is an exact-point lookup served by the
+        (latitude, longitude, created_at) index. Area queries go through the
+        R*Tree: radius_km selects points within that great-circle distance of
+        (latitude, longitude), bbox = (min_lat, min_lon, max_lat, max_lon)
+        selects a box (min_lon > max_lon crosses the antimeridian). Area
+        results carry distance_km when a centre is given.
+
+        Args:
+            order: "time" (newest first) or "distance" (nearest first,
+                needs latitude/longitude)
+
+        Raises:
+            ValueError: For inconsistent parameters
+        """
+        if order not in HISTORY_ORDERS:
+            raise ValueError(f"order must be one of {HISTORY_ORDERS}")
+        if radius_km is not None and bbox is not None:
+            raise ValueError("Use either radius_km or bbox, not both")
+        has_centre = latitude is not None and longitude is not None
+        if (radius_km is not None or order == "distance" or bbox is None) and not has_centre:
+            raise ValueError("latitude and longitude are required for this query")
+
+        if radius_km is None and bbox is None:
+            with self.connection() as conn:
+                cursor = conn.execute(
+                    """
+                    SELECT * FROM forecasts
+                    WHERE latitude = ? AND longitude = ?
+                    ORDER BY created_at DESC
+                    LIMIT ?
+                """,
+                    (latitude, longitude, limit),
+                )
+                return [dict(row) for row in cursor.fetchall()]
+
+        if radius_km is not None:
+            min_lat, min_lon, max_lat, max_lon = _radius_bbox(latitude, longitude, radius_km)
+        else:
+            min_lat, min_lon, max_lat, max_lon = bbox
+        lon_ranges = _longitude_ranges(min_lon, max_lon)
+
+        # R*Tree overlap test first; its 32-bit boxes are rounded outwards,
+        # so recheck the exact coordinates afterwards
+        where = [
+            "r.max_lat >= ? AND r.min_lat <= ?",
+            "(" + " OR ".join("(r.max_lon >= ? AND r.min_lon <= ?)" for _ in lon_ranges) + ")",
+            "f.latitude BETWEEN ? AND ?",
+            "(" + " OR ".join("f.longitude BETWEEN ? AND ?" for _ in lon_ranges) + ")",
+        ]
+        lon_params = [value for pair in lon_ranges for value in pair]
+        params: list[Any] = [min_lat, max_lat, *lon_params, min_lat, max_lat, *lon_params]
+
+        select = "f.*"
+        if has_centre:
+            select += ", haversine_km(?, ?, f.latitude, f.longitude) AS distance_km"
+            params = [latitude, longitude, *params]
+        if radius_km is not None:
+            where.append("haversine_km(?, ?, f.latitude, f.longitude) <= ?")
+            params.extend((latitude, longitude, radius_km))
+        order_by = "distance_km ASC" if order == "distance" else "f.created_at DESC"
+        params.append(limit)
+
+        with self.connection() as conn:
             cursor = conn.execute(
-                """
-                SELECT * FROM forecasts 
-                WHERE latitude = ? AND longitude = ?
-                ORDER BY created_at DESC
+                f"""
+                SELECT {select}
+                FROM forecast_rtree AS r
+                JOIN forecasts AS f ON f.id = r.id
+                WHERE {" AND ".join(where)}
+                ORDER BY {order_by}
                 LIMIT ?
             """,
-                (latitude, longitude, limit),
+                params,
             )
             return [dict(row) for row in cursor.fetchall()]
 
+    @DB_OPERATION_SECONDS.time(operation="export_page")
+    def export_page(
+        self,
+        after_id: int = 0,
+        page_size: int = 1000,
+        start_date: str | None = None,
+        end_date: str | None = None,
+        bbox: tuple[float, float, float, float] | None = None,
+    ) -> list[sqlite3.Row]:
+        """
+        One page of forecasts with id > after_id, in id order.
+
+        Keyset pagination: pass the last id of a page to get the next one,
+        so every page is a primary-key range scan regardless of depth.
+
+        Args:
+            start_date / end_date: Inclusive event_date bounds (YYYY-MM-DD)
+            bbox: (min_lat, min_lon, max_lat, max_lon); min_lon > max_lon
+                crosses the antimeridian
+        """
+        where = ["id > ?"]
+        params: list[Any] = [after_id]
+        if start_date is not None:
+            where.append("event_date >= ?")
+            params.append(start_date)
+        if end_date is not None:
+            where.append("event_date <= ?")
+            params.append(end_date)
+        if bbox is not None:
+            min_lat, min_lon, max_lat, max_lon = bbox
+            lon_ranges = _longitude_ranges(min_lon, max_lon)
+            where.append("latitude BETWEEN ? AND ?")
+            params.extend((min_lat, max_lat))
+            where.append(
+                "(" + " OR ".join("longitude BETWEEN ? AND ?" for _ in lon_ranges) + ")"
+            )
+            params.extend(value for pair in lon_ranges for value in pair)
+        params.append(page_size)
+        with self.connection() as conn:
+            return conn.execute(
+                f"""
+                SELECT * FROM forecasts
+                WHERE {" AND ".join(where)}
+                ORDER BY id
+                LIMIT ?
+            """,
+                params,
+            ).fetchall()
+
+    @DB_OPERATION_SECONDS.time(operation="get_statistics")
     def get_statistics(self) -> dict[str, Any]:
-        """Get database statistics."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
+        """Get database statistics (one-row read of the trigger-maintained aggregates)."""
+        with self.connection() as conn:
+            row = conn.execute(
                 """
-                SELECT 
-                    COUNT(*) as total_forecasts,
-                    AVG(precipitation_probability) as avg_rain_probability,
-                    AVG(precipitation_intensity_mm) as avg_precipitation_mm,
-                    COUNT(DISTINCT latitude || ',' || longitude) as unique_locations
-                FROM forecasts
+                SELECT total_forecasts, sum_probability, sum_precipitation_mm, unique_locations
+                FROM forecast_stats WHERE id = 1
             """
-            )
-            row = cursor.fetchone()
+            ).fetchone()
+            total = row[0]
             return {
-                "total_forecasts": row[0],
-                "avg_rain_probability": round(row[1] or 0, 3),
-                "avg_precipitation_mm": round(row[2] or 0, 2),
+                "total_forecasts": total,
+                "avg_rain_probability": round(row[1] / total, 3) if total else 0,
+                "avg_precipitation_mm": round(row[2] / total, 2) if total else 0,
                 "unique_locations": row[3],
             }
+
+    @DB_OPERATION_SECONDS.time(operation="rebuild_statistics")
+    def rebuild_statistics(self) -> dict[str, Any]:
+        """
+        Recompute the aggregates from the forecasts table and the archive catalog.
+
+        Repairs drift after manual edits or bulk loads that bypassed the
+        triggers. Runs as one transaction, so readers see either the old or
+        the rebuilt values.
+        """
+        with self.connection() as conn, conn:
+            conn.execute("DELETE FROM forecast_locations")
+            conn.execute(
+                """
+                INSERT OR IGNORE INTO forecast_locations (latitude, longitude)
+                SELECT latitude, longitude FROM forecasts
+                UNION
+                SELECT latitude, longitude FROM forecast_archive_locations
+            """
+            )
+            conn.execute(
+                """
+                UPDATE forecast_stats SET
+                    total_forecasts = hot.total + cold.total,
+                    sum_probability = hot.sum_probability + cold.sum_probability,
+                    sum_precipitation_mm = hot.sum_precipitation_mm + cold.sum_precipitation_mm,
+                    unique_locations = (SELECT COUNT(*) FROM forecast_locations)
+                FROM (
+                    SELECT
+                        COUNT(*) AS total,
+                        COALESCE(SUM(precipitation_probability), 0) AS sum_probability,
+                        COALESCE(SUM(precipitation_intensity_mm), 0) AS sum_precipitation_mm
+                    FROM forecasts
+                ) AS hot, (
+                    SELECT
+                        COALESCE(SUM(row_count), 0) AS total,
+                        COALESCE(SUM(sum_probability), 0) AS sum_probability,
+                        COALESCE(SUM(sum_precipitation_mm), 0) AS sum_precipitation_mm
+                    FROM forecast_archives
+                ) AS cold
+                WHERE id = 1
+            """
+            )
+        return self.get_statistics()
+
+    def archived_through(self) -> str | None:
+        """
+        Latest month (YYYY-MM) compacted into archive files, if any.
+
+        History and export queries only read the forecasts table, so they
+        miss rows created in archived months.
+        """
+        with self.connection() as conn:
+            return conn.execute("SELECT MAX(month) FROM forecast_archives").fetchone()[0]
+
+    async def save_forecast_async(self, forecast: ForecastResponse) -> int:
+        return await self._run(self.save_forecast, forecast)
+
+    async def save_forecasts_async(self, forecasts: list[ForecastResponse]) -> int:
+        return await self._run(self.save_forecasts, forecasts)
+
+    async def get_forecast_history_async(self, *args: Any, **kwargs: Any) -> list[dict[str, Any]]:
+        return await self._run(partial(self.get_forecast_history, *args, **kwargs))
+
+    async def export_page_async(self, *args: Any, **kwargs: Any) -> list[sqlite3.Row]:
+        return await self._run(partial(self.export_page, *args, **kwargs))
+
+    async def get_statistics_async(self) -> dict[str, Any]:
+        return await self._run(self.get_statistics)
+
+    async def archived_through_async(self) -> str | None:
+        return await self._run(self.archived_through)
+
+
+# Application-lifetime instance
+_database: ForecastDatabase | None = None
+_database_lock = threading.Lock()
+
+
+def get_forecast_database() -> ForecastDatabase:
+    """Get or create the shared database (schema is created on first use)."""
+    global _database
+    if _database is None:
+        with _database_lock:
+            if _database is None:
+                _database = ForecastDatabase(get_settings().database_path)
+                logger.info(f"Forecast database ready at {_database.db_path}")
+    return _database
+
+
+def close_forecast_database() -> None:
+    """Close the shared database, if it was opened."""
+    global _database
+    with _database_lock:
+        if _database is not None:
+            _database.close()
+            _database = None
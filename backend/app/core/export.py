@@ -0,0 +1,65 @@
+"""
+Bulk export of the forecasts table as NDJSON or CSV.
+
+Rows are read in keyset-paginated pages (see ForecastDatabase.export_page)
+and encoded page by page, so memory stays at one page however many rows
+are exported.
+"""
+
+from __future__ import annotations
+
+import csv
+import io
+import json
+from typing import Any, AsyncIterator, Iterator, Sequence
+
+from app.core.database import ForecastDatabase
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+EXPORT_PAGE_SIZE = 1000
+
+
+def encode_page(rows: Sequence[Any], fmt: str, header: bool = False) -> str:
+    """Encode one page of sqlite3.Row objects."""
+    if fmt == "ndjson":
+        return "".join(json.dumps(dict(row)) + "\n" for row in rows)
+    if fmt == "csv":
+        buffer = io.StringIO()
+        writer = csv.writer(buffer, lineterminator="\n")
+        if header and rows:
+            writer.writerow(rows[0].keys())
+        writer.writerows(tuple(row) for row in rows)
+        return buffer.getvalue()
+    raise ValueError(f"Unknown export format {fmt!r}; expected one of {tuple(EXPORT_FORMATS)}")
+
+
+def iter_export(
+    db: ForecastDatabase,
+    fmt: str = "ndjson",
+    page_size: int = EXPORT_PAGE_SIZE,
+    **filters: Any,
+) -> Iterator[str]:
+    """Encoded chunks of every matching forecast, one chunk per page."""
+    after_id, first = 0, True
+    while True:
+        page = db.export_page(after_id, page_size, **filters)
+        if not page:
+            return
+        yield encode_page(page, fmt, header=first)
+        after_id, first = page[-1]["id"], False
+
+
+async def aiter_export(
+    db: ForecastDatabase,
+    fmt: str = "ndjson",
+    page_size: int = EXPORT_PAGE_SIZE,
+    **filters: Any,
+) -> AsyncIterator[str]:
+    """Async variant of :func:`iter_export`; pages are read on the database thread pool."""
+    after_id, first = 0, True
+    while True:
+        page = await db.export_page_async(after_id, page_size, **filters)
+        if not page:
+            return
+        yield encode_page(page, fmt, header=first)
+        after_id, first = page[-1]["id"], False
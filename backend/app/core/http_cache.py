@@ -0,0 +1,83 @@
+"""
+HTTP caching for forecast responses.
+
+A forecast is determined by its NASA POWER grid cell, event date, the data
+behind it (climatology build) and, for ensembles, the ML model (a hash of
+its files, so it survives restarts) and the blending weights, so
+the ETag is derived from those alone and can be checked before anything is
+computed. ETags are weak: responses for points in one cell differ only in
+the echoed location and issued_at, which are semantically irrelevant.
+
+Freshness follows the date:
+
+- observed past dates (older than the POWER publication lag) never change:
+  immutable for forecasts, a day for ensembles, whose ML component changes
+  with the model
+- recent past dates may still be back-filled upstream: an hour
+- today and future dates are climatology or last-year proxies: CACHE_TTL
+"""
+
+from __future__ import annotations
+
+import hashlib
+from datetime import date, datetime, timedelta
+
+from starlette.responses import Response
+
+from app.core.config import get_settings
+from app.models.forecast import Location
+from app.services.grid import snap_to_grid
+
+# POWER publishes daily values with a lag of a few days
+POWER_PUBLICATION_LAG_DAYS = 7
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+MODEL_DEPENDENT_MAX_AGE = 24 * 3600
+RECENT_MAX_AGE = 3600
+
+
+def forecast_etag(
+    kind: str,
+    location: Location,
+    event_date: date,
+    data_version: str,
+    model_version: str | None = None,
+    weights: str | None = None,
+) -> str:
+    """Weak ETag for a ``kind`` ("forecast" or "ensemble") response."""
+    cell = snap_to_grid(location.latitude, location.longitude)
+    parts = [
+        kind, cell.key, event_date.isoformat(), data_version, str(model_version), str(weights)
+    ]
+    digest = hashlib.sha256("|".join(parts).encode()).hexdigest()[:32]
+    return f'W/"{digest}"'
+
+
+def cache_control(
+    event_date: date, today: date | None = None, model_dependent: bool = False
+) -> str:
+    """Cache-Control value for a forecast of ``event_date``."""
+    today = today or datetime.now().date()
+    if event_date < today - timedelta(days=POWER_PUBLICATION_LAG_DAYS):
+        if model_dependent:
+            return f"public, max-age={MODEL_DEPENDENT_MAX_AGE}"
+        return f"public, max-age={IMMUTABLE_MAX_AGE}, immutable"
+    if event_date < today:
+        return f"public, max-age={RECENT_MAX_AGE}"
+    return f"public, max-age={get_settings().cache_ttl}"
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Weak comparison of an If-None-Match header against ``etag``."""
+    if not if_none_match:
+        return False
+    opaque = etag.removeprefix("W/")
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == opaque:
+            return True
+    return False
+
+
+def not_modified(headers: dict[str, str]) -> Response:
+    """304 carrying the validators and freshness the full response would have had."""
+    return Response(status_code=304, headers=headers)
@@ -0,0 +1,287 @@
+"""
+In-process metrics registry with Prometheus text exposition.
+
+Counters, gauges and histograms are plain Python objects guarded by a lock;
+recording a value is a dict lookup plus an addition, so instrumentation can
+stay on hot paths. The registry renders the text format (version 0.0.4)
+served at /metrics.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator
+
+# Latency buckets in seconds, from cache hits to slow upstream calls
+DEFAULT_BUCKETS = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0,
+)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_text(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        self.name = name
+        self.help = help
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: dict[str, Any]) -> tuple[str, ...]:
+        if len(labels) != len(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> list[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        return self._values.get(self._key(labels), 0.0)
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = list(self._values.items())
+        return [
+            f"{self.name}{_label_text(self.labelnames, key)} {_format(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, set directly or read from a callback at scrape time."""
+
+    kind = "gauge"
+
+    def __init__(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> None:
+        super().__init__(name, help, labelnames)
+        self._values: dict[tuple[str, ...], float | Callable[[], float]] = {}
+
+    def set(self, value: float, **labels: Any) -> None:
+        self._values[self._key(labels)] = value
+
+    def set_function(self, function: Callable[[], float], **labels: Any) -> None:
+        self._values[self._key(labels)] = function
+
+    def _samples(self) -> list[str]:
+        samples = []
+        for key, value in list(self._values.items()):
+            if callable(value):
+                value = value()
+            samples.append(f"{self.name}{_label_text(self.labelnames, key)} {_format(value)}")
+        return samples
+
+
+class Histogram(_Metric):
+    """Distribution of observed values in cumulative buckets."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, help, labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # Per label set: [count per bucket..., count above last bucket], sum
+        self._series: dict[tuple[str, ...], tuple[list[int], list[float]]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = ([0] * (len(self.buckets) + 1), [0.0])
+            series[0][index] += 1
+            series[1][0] += value
+
+    @contextmanager
+    def time(self, **labels: Any) -> Iterator[None]:
+        """Observe the wall time of a block (also usable as a decorator)."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def count(self, **labels: Any) -> int:
+        series = self._series.get(self._key(labels))
+        return sum(series[0]) if series else 0
+
+    def _samples(self) -> list[str]:
+        with self._lock:
+            items = [(key, list(counts), total[0]) for key, (counts, total) in self._series.items()]
+        samples = []
+        for key, counts, total in items:
+            cumulative = 0
+            for bound, count in zip((*self.buckets, float("inf")), counts):
+                cumulative += count
+                labels = _label_text(self.labelnames, key, f'le="{_format(bound)}"')
+                samples.append(f"{self.name}_bucket{labels} {cumulative}")
+            labels = _label_text(self.labelnames, key)
+            samples.append(f"{self.name}_sum{labels} {_format(total)}")
+            samples.append(f"{self.name}_count{labels} {cumulative}")
+        return samples
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together."""
+
+    def __init__(self) -> None:
+        self._metrics: dict[str, _Metric] = {}
+
+    def register(self, metric: _Metric) -> _Metric:
+        if metric.name in self._metrics:
+            raise ValueError(f"Metric {metric.name} already registered")
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Counter:
+        return self.register(Counter(name, help, labelnames))  # type: ignore[return-value]
+
+    def gauge(self, name: str, help: str, labelnames: tuple[str, ...] = ()) -> Gauge:
+        return self.register(Gauge(name, help, labelnames))  # type: ignore[return-value]
+
+    def histogram(
+        self,
+        name: str,
+        help: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self.register(Histogram(name, help, labelnames, buckets))  # type: ignore[return-value]
+
+    def render(self) -> str:
+        lines: list[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "isitrain_http_request_duration_seconds",
+    "API request latency by route template and status code.",
+    ("method", "route", "status"),
+)
+ENSEMBLE_STAGE_SECONDS = REGISTRY.histogram(
+    "isitrain_ensemble_stage_duration_seconds",
+    "Time spent in each stage of an ensemble forecast.",
+    ("stage",),
+)
+UPSTREAM_REQUEST_SECONDS = REGISTRY.histogram(
+    "isitrain_upstream_request_duration_seconds",
+    "Outgoing HTTP request latency by host and status code.",
+    ("host", "status"),
+)
+DB_OPERATION_SECONDS = REGISTRY.histogram(
+    "isitrain_db_operation_duration_seconds",
+    "ForecastDatabase operation latency.",
+    ("operation",),
+)
+CACHE_REQUESTS = REGISTRY.counter(
+    "isitrain_cache_requests_total",
+    "Cache lookups by cache and result (hit or miss).",
+    ("cache", "result"),
+)
+CACHE_HIT_RATIO = REGISTRY.gauge(
+    "isitrain_cache_hit_ratio",
+    "Share of cache lookups that were hits since startup.",
+    ("cache",),
+)
+CACHE_ENTRIES = REGISTRY.gauge(
+    "isitrain_cache_entries",
+    "Entries currently held by each cache.",
+    ("cache",),
+)
+WRITE_QUEUE_DEPTH = REGISTRY.gauge(
+    "isitrain_write_queue_depth",
+    "Forecasts waiting in the write-behind queue.",
+)
+WRITE_DELAY_SECONDS = REGISTRY.histogram(
+    "isitrain_write_delay_seconds",
+    "Time from enqueueing a forecast to its batch being committed.",
+)
+WRITE_BATCH_ROWS = REGISTRY.histogram(
+    "isitrain_write_batch_rows",
+    "Rows per write-behind flush.",
+    buckets=(1, 10, 50, 100, 250, 500, 1000, 2500),
+)
+WRITES_DROPPED = REGISTRY.counter(
+    "isitrain_writes_dropped_total",
+    "Forecasts not persisted, by reason (queue_full or flush_error).",
+    ("reason",),
+)
+
+
+def record_cache_lookup(cache: str, hit: bool) -> None:
+    CACHE_REQUESTS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+def cache_hit_ratio(cache: str) -> float:
+    hits = CACHE_REQUESTS.value(cache=cache, result="hit")
+    lookups = hits + CACHE_REQUESTS.value(cache=cache, result="miss")
+    return hits / lookups if lookups else 0.0
+
+
+async def _start_upstream_timer(request: Any) -> None:
+    request.extensions["metrics_start"] = time.perf_counter()
+
+
+async def _observe_upstream(response: Any) -> None:
+    request = response.request
+    start = request.extensions.get("metrics_start")
+    if start is not None:
+        UPSTREAM_REQUEST_SECONDS.observe(
+            time.perf_counter() - start, host=request.url.host, status=response.status_code
+        )
+
+
+def upstream_event_hooks() -> dict[str, list[Callable[[Any], Any]]]:
+    """httpx.AsyncClient event hooks that time every outgoing request per host."""
+    return {"request": [_start_upstream_timer], "response": [_observe_upstream]}
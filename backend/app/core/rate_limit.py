@@ -2,84 +2,444 @@
 
 from __future__ import annotations
 
+import asyncio
+import math
+import sqlite3
+import threading
 import time
-from collections import defaultdict
-from typing import Callable
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import NamedTuple
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
+from loguru import logger
 from starlette.responses import JSONResponse
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
+MINUTE = 60.0
+HOUR = 3600.0
+# After two idle hours neither window can still count a client's requests
+DEFAULT_IDLE_TTL = 2 * HOUR
+DEFAULT_EVICT_INTERVAL = 60.0
 
-class RateLimitMiddleware(BaseHTTPMiddleware):
-    """Simple in-memory rate limiting middleware."""
+API_PREFIX = "/api/"
+EXEMPT_PATHS = frozenset({"/health", "/api/health", "/metrics"})
+
+
+class RateLimitDecision(NamedTuple):
+    """Outcome of one rate-limit check."""
+
+    allowed: bool
+    minute_remaining: int
+    hour_remaining: int
+    retry_after: int
+    exceeded: str | None = None
+
+
+class _ClientWindows:
+    """Sliding-window counters for one client: fixed size, whatever the request rate."""
+
+    __slots__ = (
+        "minute_start", "minute_count", "minute_previous",
+        "hour_start", "hour_count", "hour_previous",
+        "last_seen",
+    )
+
+    def __init__(self, now: float) -> None:
+        self.minute_start = now - now % MINUTE
+        self.minute_count = 0
+        self.minute_previous = 0
+        self.hour_start = now - now % HOUR
+        self.hour_count = 0
+        self.hour_previous = 0
+        self.last_seen = now
+
+
+def _estimate(previous: int, current: int, window_start: float, window: float, now: float) -> float:
+    """Sliding-window estimate: the previous window's count, weighted by its overlap, plus the current one."""
+    overlap = 1.0 - (now - window_start) / window
+    return previous * overlap + current
+
+
+class _WindowLimiter:
+    """Sliding-window decision logic shared by the in-memory and SQLite limiters."""
 
     def __init__(
         self,
-        app,
         requests_per_minute: int = 60,
         requests_per_hour: int = 1000,
+        idle_ttl: float = DEFAULT_IDLE_TTL,
+        evict_interval: float = DEFAULT_EVICT_INTERVAL,
     ) -> None:
-        super().__init__(app)
         self.requests_per_minute = requests_per_minute
         self.requests_per_hour = requests_per_hour
-        self.minute_requests: dict[str, list[float]] = defaultdict(list)
-        self.hour_requests: dict[str, list[float]] = defaultdict(list)
+        self.idle_ttl = idle_ttl
+        self.evict_interval = evict_interval
+        self._next_eviction = 0.0
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Check rate limits before processing request."""
-        client_ip = request.client.host if request.client else "unknown"
-        current_time = time.time()
+    def _roll(self, state: _ClientWindows, now: float) -> None:
+        """Advance both windows to the ones containing ``now``."""
+        minute_start = now - now % MINUTE
+        if minute_start != state.minute_start:
+            state.minute_previous = (
+                state.minute_count if minute_start - state.minute_start == MINUTE else 0
+            )
+            state.minute_count = 0
+            state.minute_start = minute_start
+        hour_start = now - now % HOUR
+        if hour_start != state.hour_start:
+            state.hour_previous = (
+                state.hour_count if hour_start - state.hour_start == HOUR else 0
+            )
+            state.hour_count = 0
+            state.hour_start = hour_start
 
-        # Clean old entries
-        self._clean_old_entries(client_ip, current_time)
+    def _check(self, state: _ClientWindows, now: float) -> RateLimitDecision:
+        """Roll ``state`` forward to ``now`` and count the request in it if allowed."""
+        self._roll(state, now)
+        state.last_seen = now
 
-        # Check minute limit
-        if len(self.minute_requests[client_ip]) >= self.requests_per_minute:
-            return JSONResponse(
-                status_code=429,
-                content={
-                    "detail": f"Rate limit exceeded: {self.requests_per_minute} requests per minute"
-                },
-                headers={"Retry-After": "60"},
+        minute_used = _estimate(
+            state.minute_previous, state.minute_count, state.minute_start, MINUTE, now
+        )
+        hour_used = _estimate(
+            state.hour_previous, state.hour_count, state.hour_start, HOUR, now
+        )
+        if minute_used + 1 > self.requests_per_minute:
+            return self._decision(False, minute_used, hour_used, "minute", state, now)
+        if hour_used + 1 > self.requests_per_hour:
+            return self._decision(False, minute_used, hour_used, "hour", state, now)
+
+        state.minute_count += 1
+        state.hour_count += 1
+        return self._decision(True, minute_used + 1, hour_used + 1, None, state, now)
+
+    def _decision(
+        self,
+        allowed: bool,
+        minute_used: float,
+        hour_used: float,
+        exceeded: str | None,
+        state: _ClientWindows,
+        now: float,
+    ) -> RateLimitDecision:
+        retry_after = 0
+        if exceeded == "minute":
+            retry_after = math.ceil(state.minute_start + MINUTE - now)
+        elif exceeded == "hour":
+            retry_after = math.ceil(state.hour_start + HOUR - now)
+        return RateLimitDecision(
+            allowed,
+            max(0, math.floor(self.requests_per_minute - minute_used)),
+            max(0, math.floor(self.requests_per_hour - hour_used)),
+            max(1, retry_after) if exceeded else 0,
+            exceeded,
+        )
+
+
+class SlidingWindowLimiter(_WindowLimiter):
+    """
+    Per-client minute and hour limits with sliding-window counters.
+
+    Each client costs two (previous, current) counter pairs instead of a
+    list of timestamps, so memory and time per request are O(1). The
+    estimate assumes requests in the previous window were spread evenly,
+    the usual sliding-window-counter trade-off. Clients idle longer than
+    ``idle_ttl`` are evicted every ``evict_interval`` seconds, checked on
+    incoming requests.
+
+    State is private to the process: with N workers a client gets up to N
+    times the limit. Use :class:`SQLiteRateLimiter` to share it.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 60,
+        requests_per_hour: int = 1000,
+        idle_ttl: float = DEFAULT_IDLE_TTL,
+        evict_interval: float = DEFAULT_EVICT_INTERVAL,
+    ) -> None:
+        super().__init__(requests_per_minute, requests_per_hour, idle_ttl, evict_interval)
+        self.clients: dict[str, _ClientWindows] = {}
+
+    def hit(self, client: str, now: float | None = None) -> RateLimitDecision:
+        """Check the limits for one request and count it if allowed."""
+        now = time.time() if now is None else now
+        if now >= self._next_eviction:
+            self.evict_idle(now)
+
+        state = self.clients.get(client)
+        if state is None:
+            state = self.clients[client] = _ClientWindows(now)
+        return self._check(state, now)
+
+    async def ahit(self, client: str) -> RateLimitDecision:
+        """:meth:`hit` for the event loop; never blocks, so runs inline."""
+        return self.hit(client)
+
+    def evict_idle(self, now: float | None = None) -> int:
+        """Drop clients idle for longer than idle_ttl; returns how many were removed."""
+        now = time.time() if now is None else now
+        cutoff = now - self.idle_ttl
+        idle = [client for client, state in self.clients.items() if state.last_seen < cutoff]
+        for client in idle:
+            del self.clients[client]
+        self._next_eviction = now + self.evict_interval
+        return len(idle)
+
+
+_RATE_LIMIT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limits (
+    client TEXT PRIMARY KEY,
+    minute_start REAL NOT NULL,
+    minute_count INTEGER NOT NULL,
+    minute_previous INTEGER NOT NULL,
+    hour_start REAL NOT NULL,
+    hour_count INTEGER NOT NULL,
+    hour_previous INTEGER NOT NULL,
+    last_seen REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_rate_limits_last_seen ON rate_limits(last_seen);
+"""
+
+_UPSERT_CLIENT = """
+INSERT INTO rate_limits (
+    client, minute_start, minute_count, minute_previous,
+    hour_start, hour_count, hour_previous, last_seen
+) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT (client) DO UPDATE SET
+    minute_start = excluded.minute_start,
+    minute_count = excluded.minute_count,
+    minute_previous = excluded.minute_previous,
+    hour_start = excluded.hour_start,
+    hour_count = excluded.hour_count,
+    hour_previous = excluded.hour_previous,
+    last_seen = excluded.last_seen
+"""
+
+
+class SQLiteRateLimiter(_WindowLimiter):
+    """
+    Sliding-window limiter whose counters live in a SQLite file shared by
+    every worker process on the node.
+
+    Each check is one BEGIN IMMEDIATE transaction (read, roll, write back),
+    so concurrent workers serialise on the file's write lock and a client's
+    limit holds across all of them. The file only holds counters, so it
+    runs with synchronous=OFF. The middleware calls :meth:`ahit`, which
+    runs the transaction on a dedicated thread so waiting for the lock
+    never stalls the event loop.
+
+    Waiting for another worker's lock (SQLITE_BUSY) is normal contention:
+    the check is retried ``busy_retries`` times, each after up to
+    ``busy_timeout_ms``. Only other errors, or a lock held through every
+    retry, make the limiter log once and fall back to a process-local
+    :class:`SlidingWindowLimiter` until the next successful check.
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        requests_per_minute: int = 60,
+        requests_per_hour: int = 1000,
+        idle_ttl: float = DEFAULT_IDLE_TTL,
+        evict_interval: float = DEFAULT_EVICT_INTERVAL,
+        busy_timeout_ms: int = 1000,
+        busy_retries: int = 3,
+    ) -> None:
+        super().__init__(requests_per_minute, requests_per_hour, idle_ttl, evict_interval)
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.fallback = SlidingWindowLimiter(
+            requests_per_minute, requests_per_hour, idle_ttl, evict_interval
+        )
+        self.busy_retries = busy_retries
+        self._degraded = False
+        self._lock = threading.Lock()
+        # One thread: checks in this process serialise on _lock anyway, and
+        # a private executor keeps them off the pool used for sync endpoints
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="rate-limit")
+        # Autocommit mode: transactions are opened explicitly with BEGIN IMMEDIATE
+        self._conn = sqlite3.connect(
+            self.path, isolation_level=None, check_same_thread=False
+        )
+        self._conn.execute(f"PRAGMA busy_timeout={int(busy_timeout_ms)}")
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=OFF")
+        self._conn.executescript(_RATE_LIMIT_SCHEMA)
+
+    def hit(self, client: str, now: float | None = None) -> RateLimitDecision:
+        """Check the limits for one request and count it if allowed."""
+        now = time.time() if now is None else now
+        try:
+            decision = self._hit_with_retries(client, now)
+        except sqlite3.Error as exc:
+            if not self._degraded:
+                logger.warning(f"Shared rate limit store unavailable, using in-memory limits: {exc}")
+                self._degraded = True
+            return self.fallback.hit(client, now)
+        if self._degraded:
+            logger.info("Shared rate limit store recovered")
+            self._degraded = False
+        return decision
+
+    async def ahit(self, client: str) -> RateLimitDecision:
+        """:meth:`hit` on the limiter's own thread, for the event loop."""
+        return await asyncio.get_running_loop().run_in_executor(self._executor, self.hit, client)
+
+    def _hit_with_retries(self, client: str, now: float) -> RateLimitDecision:
+        attempt = 0
+        while True:
+            try:
+                with self._lock:
+                    if now >= self._next_eviction:
+                        self._evict(now)
+                    return self._hit(client, now)
+            except sqlite3.OperationalError as exc:
+                # Primary result code: extended codes such as SQLITE_BUSY_SNAPSHOT count too
+                busy = (exc.sqlite_errorcode & 0xFF) == sqlite3.SQLITE_BUSY
+                if not busy or attempt >= self.busy_retries:
+                    raise
+                attempt += 1
+                logger.debug(f"Rate limit store busy, retry {attempt}/{self.busy_retries}")
+
+    def _hit(self, client: str, now: float) -> RateLimitDecision:
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            row = conn.execute(
+                """
+                SELECT minute_start, minute_count, minute_previous,
+                       hour_start, hour_count, hour_previous, last_seen
+                FROM rate_limits WHERE client = ?
+            """,
+                (client,),
+            ).fetchone()
+            state = _ClientWindows(now)
+            if row is not None:
+                (
+                    state.minute_start, state.minute_count, state.minute_previous,
+                    state.hour_start, state.hour_count, state.hour_previous,
+                    state.last_seen,
+                ) = row
+            decision = self._check(state, now)
+            conn.execute(
+                _UPSERT_CLIENT,
+                (
+                    client,
+                    state.minute_start, state.minute_count, state.minute_previous,
+                    state.hour_start, state.hour_count, state.hour_previous,
+                    state.last_seen,
+                ),
             )
+            conn.execute("COMMIT")
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        return decision
+
+    def _evict(self, now: float) -> int:
+        cursor = self._conn.execute(
+            "DELETE FROM rate_limits WHERE last_seen < ?", (now - self.idle_ttl,)
+        )
+        self._next_eviction = now + self.evict_interval
+        return cursor.rowcount
+
+    def evict_idle(self, now: float | None = None) -> int:
+        """Drop clients idle for longer than idle_ttl; returns how many were removed."""
+        now = time.time() if now is None else now
+        with self._lock:
+            return self._evict(now) + self.fallback.evict_idle(now)
+
+    def close(self) -> None:
+        self._executor.shutdown()
+        self._conn.close()
+
+
+def create_rate_limiter(
+    requests_per_minute: int = 60,
+    requests_per_hour: int = 1000,
+    backend: str = "memory",
+    path: str | Path | None = None,
+) -> SlidingWindowLimiter | SQLiteRateLimiter:
+    """
+    Build the limiter for ``backend`` ("memory" or "sqlite").
+
+    Falls back to the in-memory limiter if the SQLite file cannot be opened.
+    """
+    if backend == "sqlite":
+        if path is None:
+            raise ValueError("The sqlite rate limit backend needs a path")
+        try:
+            return SQLiteRateLimiter(path, requests_per_minute, requests_per_hour)
+        except (sqlite3.Error, OSError) as exc:
+            logger.warning(f"Cannot open rate limit store {path}, using in-memory limits: {exc}")
+    elif backend != "memory":
+        raise ValueError(f"Unknown rate limit backend: {backend}")
+    return SlidingWindowLimiter(requests_per_minute, requests_per_hour)
+
+
+def is_exempt(path: str) -> bool:
+    """Health checks, the metrics scrape and static frontend files skip rate limiting."""
+    return path in EXEMPT_PATHS or not path.startswith(API_PREFIX)
+
 
-        # Check hour limit
-        if len(self.hour_requests[client_ip]) >= self.requests_per_hour:
-            return JSONResponse(
+class RateLimitMiddleware:
+    """
+    Per-IP rate limiting middleware, in-memory or shared through SQLite.
+
+    Raw ASGI rather than BaseHTTPMiddleware: allowed requests go straight to
+    the app, with the limit headers added to the response start message.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        requests_per_minute: int = 60,
+        requests_per_hour: int = 1000,
+        backend: str = "memory",
+        path: str | None = None,
+    ) -> None:
+        self.app = app
+        self.requests_per_minute = requests_per_minute
+        self.requests_per_hour = requests_per_hour
+        self.limiter = create_rate_limiter(requests_per_minute, requests_per_hour, backend, path)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Check rate limits before processing request."""
+        if scope["type"] != "http" or is_exempt(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        client = scope.get("client")
+        decision = await self.limiter.ahit(client[0] if client else "unknown")
+
+        if not decision.allowed:
+            limit = (
+                self.requests_per_minute if decision.exceeded == "minute"
+                else self.requests_per_hour
+            )
+            response = JSONResponse(
                 status_code=429,
                 content={
-                    "detail": f"Rate limit exceeded: {self.requests_per_hour} requests per hour"
+                    "detail": f"Rate limit exceeded: {limit} requests per {decision.exceeded}"
                 },
-                headers={"Retry-After": "3600"},
+                headers={"Retry-After": str(decision.retry_after)},
             )
+            await response(scope, receive, send)
+            return
 
-        # Add current request
-        self.minute_requests[client_ip].append(current_time)
-        self.hour_requests[client_ip].append(current_time)
-
-        response = await call_next(request)
-        
         # Add rate limit headers
-        response.headers["X-RateLimit-Minute-Limit"] = str(self.requests_per_minute)
-        response.headers["X-RateLimit-Minute-Remaining"] = str(
-            self.requests_per_minute - len(self.minute_requests[client_ip])
-        )
-        response.headers["X-RateLimit-Hour-Limit"] = str(self.requests_per_hour)
-        response.headers["X-RateLimit-Hour-Remaining"] = str(
-            self.requests_per_hour - len(self.hour_requests[client_ip])
-        )
-
-        return response
+        limit_headers = [
+            (b"x-ratelimit-minute-limit", str(self.requests_per_minute).encode()),
+            (b"x-ratelimit-minute-remaining", str(decision.minute_remaining).encode()),
+            (b"x-ratelimit-hour-limit", str(self.requests_per_hour).encode()),
+            (b"x-ratelimit-hour-remaining", str(decision.hour_remaining).encode()),
+        ]
 
-    def _clean_old_entries(self, client_ip: str, current_time: float) -> None:
-        """Remove entries older than the time windows."""
-        minute_ago = current_time - 60
-        hour_ago = current_time - 3600
+        async def send_with_headers(message: Message) -> None:
+            if message["type"] == "http.response.start":
+                message["headers"] = [*message.get("headers", ()), *limit_headers]
+            await send(message)
 
-        self.minute_requests[client_ip] = [
-            t for t in self.minute_requests[client_ip] if t > minute_ago
-        ]
-        self.hour_requests[client_ip] = [
-            t for t in self.hour_requests[client_ip] if t > hour_ago
-        ]
+        await self.app(scope, receive, send_with_headers)
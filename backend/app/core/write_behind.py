@@ -0,0 +1,167 @@
+"""Write-behind batching of forecast inserts."""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from typing import Any
+
+from loguru import logger
+
+from app.core.config import get_settings
+from app.core.database import ForecastDatabase, get_forecast_database
+from app.core.metrics import (
+    WRITE_BATCH_ROWS,
+    WRITE_DELAY_SECONDS,
+    WRITE_QUEUE_DEPTH,
+    WRITES_DROPPED,
+)
+from app.models.forecast import ForecastResponse
+
+_STOP = object()
+
+
+class ForecastWriteQueue:
+    """
+    Buffers forecasts and persists them in batched transactions.
+
+    A background task flushes up to ``batch_size`` rows in one executemany
+    transaction, or whatever has arrived ``flush_interval`` seconds after
+    the first row of a batch. The queue holds at most ``max_pending`` rows:
+    a full queue makes enqueue wait up to ``enqueue_timeout`` and then drop
+    the row (counted in isitrain_writes_dropped_total) rather than stall
+    the response. Before start() and after stop(), enqueue writes directly.
+    """
+
+    def __init__(
+        self,
+        db: ForecastDatabase,
+        max_pending: int = 10000,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        enqueue_timeout: float = 0.05,
+    ) -> None:
+        self.db = db
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.enqueue_timeout = enqueue_timeout
+        self._queue: asyncio.Queue[Any] = asyncio.Queue(maxsize=max_pending)
+        self._task: asyncio.Task[None] | None = None
+        # Set when a full batch is waiting, to cut the flush interval short
+        self._batch_ready = asyncio.Event()
+        self._collected = 0
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    @property
+    def pending(self) -> int:
+        return self._queue.qsize()
+
+    def start(self) -> None:
+        if not self.running:
+            self._task = asyncio.create_task(self._run(), name="forecast-write-behind")
+
+    async def stop(self) -> None:
+        """Flush everything queued so far and stop the background task."""
+        if not self.running:
+            return
+        await self._queue.put(_STOP)
+        self._batch_ready.set()
+        await self._task
+        self._task = None
+
+    async def enqueue(self, forecast: ForecastResponse) -> bool:
+        """
+        Queue a forecast for persistence.
+
+        Returns:
+            False if the row was dropped because the queue stayed full
+        """
+        if not self.running:
+            await self.db.save_forecast_async(forecast)
+            return True
+        try:
+            await asyncio.wait_for(
+                self._queue.put((forecast, time.perf_counter())), self.enqueue_timeout
+            )
+        except asyncio.TimeoutError:
+            WRITES_DROPPED.inc(reason="queue_full")
+            logger.warning("Write-behind queue full, dropping forecast")
+            return False
+        if self._collected + self._queue.qsize() >= self.batch_size:
+            self._batch_ready.set()
+        return True
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        stopping = False
+        while not stopping:
+            item = await self._queue.get()
+            if item is _STOP:
+                break
+            batch = [item]
+            deadline = loop.time() + self.flush_interval
+            while len(batch) < self.batch_size and not stopping:
+                # Take what is already queued
+                while len(batch) < self.batch_size and not self._queue.empty():
+                    item = self._queue.get_nowait()
+                    if item is _STOP:
+                        stopping = True
+                        break
+                    batch.append(item)
+                remaining = deadline - loop.time()
+                if len(batch) >= self.batch_size or stopping or remaining <= 0:
+                    break
+                # Wait for a full batch or the deadline, whichever comes first
+                self._batch_ready.clear()
+                self._collected = len(batch)
+                if not self._queue.empty():
+                    continue
+                try:
+                    await asyncio.wait_for(self._batch_ready.wait(), remaining)
+                except asyncio.TimeoutError:
+                    pass
+            self._collected = 0
+            await self._flush(batch)
+
+    async def _flush(self, batch: list[tuple[ForecastResponse, float]]) -> None:
+        try:
+            await self.db.save_forecasts_async([forecast for forecast, _ in batch])
+        except Exception as exc:
+            WRITES_DROPPED.inc(len(batch), reason="flush_error")
+            logger.error(f"Failed to flush {len(batch)} forecasts: {exc}")
+            return
+        committed = time.perf_counter()
+        WRITE_BATCH_ROWS.observe(len(batch))
+        for _, enqueued in batch:
+            WRITE_DELAY_SECONDS.observe(committed - enqueued)
+
+
+# Application-lifetime instance
+_write_queue: ForecastWriteQueue | None = None
+
+
+def get_write_queue() -> ForecastWriteQueue:
+    """Get or create the shared write-behind queue."""
+    global _write_queue
+    if _write_queue is None:
+        settings = get_settings()
+        _write_queue = ForecastWriteQueue(
+            get_forecast_database(),
+            max_pending=settings.write_queue_max_pending,
+            batch_size=settings.write_batch_size,
+            flush_interval=settings.write_flush_interval,
+            enqueue_timeout=settings.write_enqueue_timeout,
+        )
+        WRITE_QUEUE_DEPTH.set_function(lambda: _write_queue.pending if _write_queue else 0)
+    return _write_queue
+
+
+async def close_write_queue() -> None:
+    """Flush and discard the shared queue, if it was created."""
+    global _write_queue
+    if _write_queue is not None:
+        await _write_queue.stop()
+        _write_queue = None
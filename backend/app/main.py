@@ -4,13 +4,17 @@ from contextlib import asynccontextmanager
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import Response
 from fastapi.staticfiles import StaticFiles
 from loguru import logger
 from pathlib import Path
 
 from app.api.routes import router
 from app.core.config import get_settings
+from app.core.metrics import CONTENT_TYPE, REGISTRY
+from app.core.metrics_middleware import MetricsMiddleware
 from app.core.rate_limit import RateLimitMiddleware
+from app.services.container import ServiceContainer
 
 settings = get_settings()
 
@@ -20,8 +24,12 @@ async def lifespan(app: FastAPI):
     """Application lifespan manager."""
     logger.info("Starting Is It Rain API")
     logger.info(f"Allowed origins: {settings.allowed_origins}")
+    services = ServiceContainer(settings)
+    services.start()
+    app.state.services = services
     yield
     logger.info("Shutting down Is It Rain API")
+    await services.close()
 
 
 app = FastAPI(
@@ -38,8 +46,13 @@ app.add_middleware(
     RateLimitMiddleware,
     requests_per_minute=settings.rate_limit_per_minute,
     requests_per_hour=settings.rate_limit_per_hour,
+    backend=settings.rate_limit_backend,
+    path=settings.rate_limit_path,
 )
 
+# Record request latency (wraps rate limiting, so 429s are counted too)
+app.add_middleware(MetricsMiddleware)
+
 # Add CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -49,6 +62,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.get("/metrics", include_in_schema=False)
+def metrics() -> Response:
+    """Prometheus scrape endpoint."""
+    return Response(REGISTRY.render(), media_type=CONTENT_TYPE)
+
+
 # Serve static frontend files in production
 static_dir = Path(__file__).parent / "static"
 if static_dir.exists():
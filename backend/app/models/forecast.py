@@ -1,6 +1,9 @@
 from datetime import date, datetime
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
+
+# Longest event window accepted by the ensemble endpoint
+MAX_EVENT_DAYS = 31
 
 
 class Location(BaseModel):
@@ -10,13 +13,41 @@ class Location(BaseModel):
 
 
 class ForecastRequest(BaseModel):
-    event_date: date
+    event_date: date | None = None
+    event_start: date | None = Field(
+        default=None,
+        description="First day of a multi-day event. Defaults to event_date.",
+    )
+    event_end: date | None = Field(
+        default=None,
+        description=f"Last day (inclusive) of a multi-day event, at most {MAX_EVENT_DAYS} days.",
+    )
     location: Location | None = None
     query: str | None = Field(
         default=None,
         description="Free-form location string to be geocoded if latitude/longitude are not provided.",
     )
 
+    @model_validator(mode="after")
+    def resolve_event_window(self) -> "ForecastRequest":
+        """Fill event_date/event_start/event_end from whichever were given."""
+        start = self.event_start or self.event_date or self.event_end
+        if start is None:
+            raise ValueError("event_date or event_start must be provided")
+        end = self.event_end or start
+        if end < start:
+            raise ValueError("event_end must not be before event_start")
+        if (end - start).days + 1 > MAX_EVENT_DAYS:
+            raise ValueError(f"Event windows are limited to {MAX_EVENT_DAYS} days")
+        self.event_date = start
+        self.event_start = start
+        self.event_end = end
+        return self
+
+    @property
+    def is_multi_day(self) -> bool:
+        return self.event_end != self.event_start
+
     model_config = {
         "json_schema_extra": {
             "examples": [
@@ -29,6 +60,20 @@ class ForecastRequest(BaseModel):
     }
 
 
+class DailyRisk(BaseModel):
+    event_date: date
+    precipitation_probability: float = Field(..., ge=0, le=1)
+    precipitation_intensity_mm: float = Field(..., ge=0)
+
+
+class EventWindowForecast(BaseModel):
+    event_start: date
+    event_end: date
+    probability_any_rain: float = Field(..., ge=0, le=1)
+    expected_total_mm: float = Field(..., ge=0)
+    days: list[DailyRisk]
+
+
 class ForecastResponse(BaseModel):
     location: Location
     event_date: date
@@ -37,8 +82,23 @@ class ForecastResponse(BaseModel):
     summary: str
     nasa_dataset: str
     issued_at: datetime
+    event_window: EventWindowForecast | None = None
 
 
 class HealthResponse(BaseModel):
     status: str = "ok"
     timestamp: datetime
+
+
+class BatchForecastRequest(BaseModel):
+    items: list[ForecastRequest] = Field(..., min_length=1, max_length=500)
+
+
+class BatchForecastItem(BaseModel):
+    index: int
+    forecast: ForecastResponse | None = None
+    error: str | None = None
+
+
+class BatchForecastResponse(BaseModel):
+    results: list[BatchForecastItem]
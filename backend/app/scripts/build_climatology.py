@@ -0,0 +1,203 @@
+"""
+Climatology Builder
+
+Precomputes per-grid-cell, per-calendar-day precipitation statistics from
+NASA POWER so future-date and historical-average queries can be answered
+without any network I/O (see app.services.climatology).
+
+Usage:
+    python -m app.scripts.build_climatology --bounds 24,50,-125,-66 --years 10
+    python -m app.scripts.build_climatology --years 20 --window 7 --output data/climatology
+
+Each grid cell costs one NASA POWER range request covering all years. The
+table is written through a memory map, so building a global lattice does not
+need the whole table in RAM, but it still takes rows x cols x 366 x 4 float32
+on disk: about 880 MB for the default -60..70 latitude band, and about 30 MB for
+the contiguous US bounds in the first example (see table_nbytes).
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import uuid
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+import numpy as np
+from loguru import logger
+
+from app.models.forecast import Location
+from app.services.climatology import (
+    DAYS,
+    FIELDS,
+    META_FILE,
+    TABLE_FILE,
+    WET_DAY_MM,
+    calendar_index,
+    daily_climatology,
+    lattice_origin,
+    table_file,
+)
+from app.services.grid import GRID_LAT_STEP, GRID_LON_STEP, GridCell, iter_lattice, lattice_shape
+from app.services.nasa_power import NasaPowerClient
+
+
+def by_calendar_day(series: np.ndarray, start: date, years: int) -> np.ndarray:
+    """Reshape a daily series starting on Jan 1 into (years, 366) with NaN gaps."""
+    days = [start + timedelta(days=i) for i in range(len(series))]
+    rows = np.array([d.year - start.year for d in days])
+    cols = np.array([calendar_index(d) for d in days])
+    grid = np.full((years, DAYS), np.nan)
+    grid[rows, cols] = series
+    return grid
+
+
+def table_nbytes(n_rows: int, n_cols: int) -> int:
+    """Size of a climatology table of n_rows x n_cols cells, in bytes."""
+    return n_rows * n_cols * DAYS * len(FIELDS) * np.dtype(np.float32).itemsize
+
+
+def remove_stale_tables(output: Path, keep: str) -> None:
+    """Delete tables of earlier (or crashed) builds; open memory maps stay valid."""
+    for path in (output / TABLE_FILE, *output.glob(table_file("*"))):
+        if path.name == keep or not path.exists():
+            continue
+        try:
+            path.unlink()
+        except OSError as e:
+            logger.warning(f"⚠️  Could not remove old climatology table {path}: {e}")
+
+
+async def build_climatology(
+    output: Path,
+    bounds: tuple[float, float, float, float],
+    years: int = 10,
+    window_days: int = 7,
+    lat_step: float = GRID_LAT_STEP,
+    lon_step: float = GRID_LON_STEP,
+    concurrency: int = 4,
+) -> dict:
+    """
+    Build the climatology table for every cell inside ``bounds``.
+
+    Args:
+        output: Directory to write the table and its metadata to
+        bounds: (lat_min, lat_max, lon_min, lon_max)
+        years: Number of complete calendar years to summarize
+        window_days: Half-width of the calendar-day smoothing window
+        lat_step: Lattice latitude spacing
+        lon_step: Lattice longitude spacing
+        concurrency: Workers fetching cells from NASA POWER in parallel
+
+    Returns:
+        Metadata written next to the table
+    """
+    lat_min, lat_max, lon_min, lon_max = bounds
+    # NASA POWER lags by about a week, so the last complete year is last year
+    end_year = date.today().year - 1
+    start = date(end_year - years + 1, 1, 1)
+    end = date(end_year, 12, 31)
+
+    row0, col0 = lattice_origin(lat_min, lon_min, lat_step, lon_step)
+    cells = list(iter_lattice(lat_min, lat_max, lon_min, lon_max, lat_step, lon_step))
+    n_rows, n_cols = lattice_shape(lat_min, lat_max, lon_min, lon_max, lat_step, lon_step)
+
+    output.mkdir(parents=True, exist_ok=True)
+    # A fresh table name per build: nothing reads it until the sidecar does
+    build_id = uuid.uuid4().hex[:12]
+    table_path = output / table_file(build_id)
+    table = np.lib.format.open_memmap(
+        table_path, mode="w+", dtype=np.float32, shape=(n_rows, n_cols, DAYS, len(FIELDS))
+    )
+    table[:] = np.nan
+
+    client = NasaPowerClient()
+    pending = iter(cells)
+    built = 0
+
+    async def build_cell(cell: GridCell) -> None:
+        nonlocal built
+        try:
+            series = await client.daily_series(
+                Location(latitude=cell.latitude, longitude=cell.longitude), start, end
+            )
+        except Exception as e:
+            logger.warning(f"⚠️  Skipping cell {cell.key}: {e}")
+            return
+        row = round(cell.latitude / lat_step) - row0
+        col = round(cell.longitude / lon_step) - col0
+        table[row, col] = daily_climatology(by_calendar_day(series, start, years), window_days)
+        built += 1
+        if built % 100 == 0:
+            logger.info(f"✅ Built {built}/{len(cells)} cells")
+
+    async def worker() -> None:
+        # Workers share one iterator, so only `concurrency` cells are in flight
+        # and no per-cell coroutine exists before its turn
+        for cell in pending:
+            await build_cell(cell)
+
+    logger.info(
+        f"🌐 Building climatology for {len(cells)} cells, {start.year}-{end_year}, ±{window_days} days "
+        f"({table_nbytes(n_rows, n_cols) / 1e6:.0f} MB table)"
+    )
+    await asyncio.gather(*(worker() for _ in range(max(1, concurrency))))
+    table.flush()
+    del table
+
+    meta = {
+        "table": table_path.name,
+        "build_id": build_id,
+        "fields": list(FIELDS),
+        "lat_step": lat_step,
+        "lon_step": lon_step,
+        "row0": row0,
+        "col0": col0,
+        "rows": n_rows,
+        "cols": n_cols,
+        "bounds": [lat_min, lat_max, lon_min, lon_max],
+        "years": years,
+        "start_year": start.year,
+        "end_year": end_year,
+        "window_days": window_days,
+        "wet_day_mm": WET_DAY_MM,
+        "cells_built": built,
+        "built_at": datetime.now().isoformat(timespec="seconds"),
+    }
+    # Swapping the sidecar publishes table and metadata together
+    tmp_meta = output / (META_FILE + ".tmp")
+    tmp_meta.write_text(json.dumps(meta, indent=2))
+    tmp_meta.replace(output / META_FILE)
+    remove_stale_tables(output, keep=table_path.name)
+    logger.info(f"💾 Climatology with {built} cells written to {output}")
+    return meta
+
+
+async def main():
+    """Main build script."""
+    parser = argparse.ArgumentParser(description="Build the day-of-year climatology table")
+    parser.add_argument(
+        "--bounds",
+        type=str,
+        default="-60,70,-180,180",
+        help=(
+            "Lattice bounds as lat_min,lat_max,lon_min,lon_max (default: -60,70,-180,180, "
+            "about 150k cells and an 880 MB table; pass a region to build a smaller one)"
+        ),
+    )
+    parser.add_argument("--years", type=int, default=10, help="Years of history (default: 10)")
+    parser.add_argument("--window", type=int, default=7, help="Smoothing half-width in days (default: 7)")
+    parser.add_argument("--output", type=Path, default=Path("data/climatology"), help="Output directory")
+    parser.add_argument("--concurrency", type=int, default=4, help="Parallel NASA requests (default: 4)")
+    args = parser.parse_args()
+
+    bounds = tuple(float(v) for v in args.bounds.split(","))
+    await build_climatology(
+        args.output, bounds, years=args.years, window_days=args.window, concurrency=args.concurrency
+    )
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
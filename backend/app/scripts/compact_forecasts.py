@@ -0,0 +1,55 @@
+"""
+Forecast Compaction
+
+Moves whole months older than the retention window out of the forecasts
+table into compressed columnar archive files (see app.core.archive).
+Compaction deletes rows, so the database is opened for writing and its
+schema brought up to date first; a --db that does not exist is an error
+rather than a new, empty database.
+
+Usage:
+    python -m app.scripts.compact_forecasts
+    python -m app.scripts.compact_forecasts --retention-days 30 --archive data/archive
+"""
+
+from __future__ import annotations
+
+import argparse
+from pathlib import Path
+
+from loguru import logger
+
+from app.core.archive import compact_forecasts
+from app.core.config import get_settings
+from app.core.database import ForecastDatabase
+
+
+def main() -> None:
+    """Main compaction script."""
+    settings = get_settings()
+    parser = argparse.ArgumentParser(description="Archive forecasts older than the retention window")
+    parser.add_argument("--db", type=str, default=settings.database_path, help="Forecasts database")
+    parser.add_argument(
+        "--archive", type=str, default=settings.archive_path, help="Archive directory"
+    )
+    parser.add_argument(
+        "--retention-days",
+        type=int,
+        default=settings.database_retention_days,
+        help=f"Days kept in the hot table (default: {settings.database_retention_days})"
+    )
+    args = parser.parse_args()
+
+    if not Path(args.db).is_file():
+        parser.error(f"No forecasts database at {args.db}")
+    db = ForecastDatabase(args.db)
+    try:
+        results = compact_forecasts(db, args.archive, args.retention_days)
+    finally:
+        db.close()
+    total = sum(r["rows"] for r in results)
+    logger.info(f"Compacted {total} forecasts from {len(results)} month(s)")
+
+
+if __name__ == "__main__":
+    main()
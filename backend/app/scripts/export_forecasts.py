@@ -0,0 +1,57 @@
+"""
+Forecast Export
+
+Streams the forecasts table to a file or stdout as NDJSON or CSV. The
+database is opened read-only, so exporting never changes it (the schema
+is not created or migrated either).
+
+Usage:
+    python -m app.scripts.export_forecasts --format csv --output forecasts.csv
+    python -m app.scripts.export_forecasts --start 2025-06-01 --end 2025-08-31 --bbox 24,-125,50,-66
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+
+from loguru import logger
+
+from app.core.config import get_settings
+from app.core.database import ForecastDatabase
+from app.core.export import EXPORT_FORMATS, iter_export
+
+
+def main() -> None:
+    """Main export script."""
+    parser = argparse.ArgumentParser(description="Export stored forecasts")
+    parser.add_argument("--db", type=str, default=get_settings().database_path, help="Forecasts database")
+    parser.add_argument("--format", choices=tuple(EXPORT_FORMATS), default="ndjson", help="Output format")
+    parser.add_argument("--start", type=str, default=None, help="First event date (YYYY-MM-DD)")
+    parser.add_argument("--end", type=str, default=None, help="Last event date (YYYY-MM-DD)")
+    parser.add_argument(
+        "--bbox", type=str, default=None, help="min_lat,min_lon,max_lat,max_lon"
+    )
+    parser.add_argument("--output", type=str, default="-", help="Output file (default: stdout)")
+    args = parser.parse_args()
+
+    bbox = tuple(float(v) for v in args.bbox.split(",")) if args.bbox else None
+    try:
+        db = ForecastDatabase(args.db, read_only=True)
+    except FileNotFoundError as exc:
+        parser.error(str(exc))
+    out = sys.stdout if args.output == "-" else open(args.output, "w", newline="")
+    try:
+        for chunk in iter_export(
+            db, args.format, start_date=args.start, end_date=args.end, bbox=bbox
+        ):
+            out.write(chunk)
+    finally:
+        if out is not sys.stdout:
+            out.close()
+            logger.info(f"Exported forecasts to {args.output}")
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
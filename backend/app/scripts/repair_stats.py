@@ -0,0 +1,62 @@
+"""
+Statistics Repair
+
+Rebuilds the running aggregates behind /api/stats (forecast_stats and
+forecast_locations) from the forecasts table. Run it after bulk loads or
+manual edits that bypassed the insert trigger.
+
+The current aggregates are read through a read-only connection first, so
+they are reported exactly as found. Only then is the database opened for
+writing, which also brings its schema up to date. A --db that does not
+exist is an error rather than a new, empty database.
+
+Usage:
+    python -m app.scripts.repair_stats
+    python -m app.scripts.repair_stats --db data/forecasts.db
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sqlite3
+
+from loguru import logger
+
+from app.core.config import get_settings
+from app.core.database import ForecastDatabase
+
+
+def main() -> None:
+    """Main repair script."""
+    parser = argparse.ArgumentParser(description="Rebuild forecast statistics aggregates")
+    parser.add_argument(
+        "--db",
+        type=str,
+        default=get_settings().database_path,
+        help="Path to the forecasts database (default: DATABASE_PATH setting)"
+    )
+    args = parser.parse_args()
+
+    try:
+        reader = ForecastDatabase(args.db, read_only=True)
+    except FileNotFoundError as exc:
+        parser.error(str(exc))
+    try:
+        before = reader.get_statistics()
+    except sqlite3.OperationalError:
+        before = None  # Aggregates not created yet
+    finally:
+        reader.close()
+
+    db = ForecastDatabase(args.db)
+    try:
+        after = db.rebuild_statistics()
+    finally:
+        db.close()
+    logger.info(f"Before: {json.dumps(before)}")
+    logger.info(f"After:  {json.dumps(after)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,6 +5,7 @@ Collects historical NASA POWER data and trains RandomForest model.
 
 Usage:
     python -m app.scripts.train_model --years 3 --samples-per-location 50
+    python -m app.scripts.train_model --lattice --bounds 30,50,-10,40 --chunk-size 250000
 
 This will:
 1. Sample global locat        # OOB score (if available)
@@ -36,7 +37,8 @@ import asyncio
 from datetime import date, datetime, timedelta
 from pathlib import Path
 import random
-from typing import Any
+import sys
+from typing import Any, AsyncIterator
 
 import numpy as np
 from loguru import logger
@@ -46,9 +48,21 @@ from sklearn.preprocessing import StandardScaler
 from sklearn.metrics import mean_absolute_error, mean_squared_error, r2_score
 
 from app.models.forecast import Location
+from app.services.grid import GRID_LAT_STEP, GRID_LON_STEP, GridCell, iter_lattice
 from app.services.ml_predictor import MLPredictor
+from app.services.model_backends import (
+    DEFAULT_BACKEND,
+    MODEL_BACKENDS,
+    RANDOM_FOREST,
+    build_model,
+)
 from app.services.nasa_power import NasaPowerClient
 
+try:  # ru_maxrss is only available on Unix
+    import resource
+except ImportError:  # pragma: no cover - Windows
+    resource = None  # type: ignore[assignment]
+
 
 # Sample locations covering diverse climates
 SAMPLE_LOCATIONS = [
@@ -92,18 +106,28 @@ SAMPLE_LOCATIONS = [
 class ModelTrainer:
     """Trains precipitation prediction model using historical NASA data."""
     
-    def __init__(self, years: int = 3, samples_per_location: int = 50):
+    def __init__(
+        self,
+        years: int = 3,
+        samples_per_location: int = 50,
+        backend: str = DEFAULT_BACKEND,
+        dataset_path: Path | None = None,
+    ):
         """
         Initialize trainer.
         
         Args:
             years: Number of years of historical data to collect
             samples_per_location: Number of random dates per location
+            backend: Model backend to train (see MODEL_BACKENDS)
+            dataset_path: Optional .npz file to save the collected dataset to
         """
         self.years = years
         self.samples_per_location = samples_per_location
+        self.backend = backend
+        self.dataset_path = dataset_path
         self.nasa_client = NasaPowerClient()
-        self.ml_predictor = MLPredictor()
+        self.ml_predictor = MLPredictor(backend=backend)
         
         self.X_train: np.ndarray | None = None
         self.X_test: np.ndarray | None = None
@@ -194,12 +218,12 @@ class ModelTrainer:
         min_samples_leaf: int = 2
     ) -> dict[str, Any]:
         """
-        Train Random Forest model with hyperparameter tuning.
+        Train the selected backend with hyperparameter tuning.
         
         Args:
             X: Feature matrix
             y: Target vector
-            n_estimators: Number of trees
+            n_estimators: Number of trees (boosting iterations are 2x this)
             max_depth: Maximum tree depth
             min_samples_split: Minimum samples to split node
             min_samples_leaf: Minimum samples in leaf node
@@ -207,7 +231,7 @@ class ModelTrainer:
         Returns:
             Training metrics
         """
-        logger.info("🤖 Training Random Forest model...")
+        logger.info(f"🤖 Training {self.backend} model...")
         
         # Split data
         self.X_train, self.X_test, self.y_train, self.y_test = train_test_split(
@@ -222,18 +246,12 @@ class ModelTrainer:
         self.X_test_scaled = self.scaler.transform(self.X_test)
         
         # Train model with better hyperparameters for weather data
-        model = RandomForestRegressor(
+        model = build_model(
+            self.backend,
             n_estimators=n_estimators,
             max_depth=max_depth,
             min_samples_split=min_samples_split,
             min_samples_leaf=min_samples_leaf,
-            max_features='sqrt',  # Use sqrt(n_features) per split
-            min_impurity_decrease=0.0,  # Allow all splits
-            bootstrap=True,  # Bootstrap sampling
-            oob_score=True,  # Out-of-bag score for validation
-            random_state=42,
-            n_jobs=-1,  # Use all CPU cores
-            verbose=0  # Reduce verbosity
         )
         
         model.fit(self.X_train_scaled, self.y_train)
@@ -270,7 +288,8 @@ class ModelTrainer:
             "n_samples_train": len(self.X_train),
             "n_samples_test": len(self.X_test),
             "n_estimators": n_estimators,
-            "max_depth": max_depth
+            "max_depth": max_depth,
+            "backend": self.backend,
         }
         
         logger.info("✅ Model training complete!")
@@ -305,7 +324,10 @@ class ModelTrainer:
             'day_sin', 'day_cos'
         ]
         
-        importances = self.ml_predictor.model.feature_importances_
+        importances = getattr(self.ml_predictor.model, "feature_importances_", None)
+        if importances is None:
+            logger.info(f"📊 {self.backend} does not expose feature importances")
+            return {}
         
         # Sort by importance
         indices = np.argsort(importances)[::-1]
@@ -341,6 +363,11 @@ class ModelTrainer:
         if len(X) < 100:
             raise ValueError(f"Insufficient training data: {len(X)} samples")
         
+        if self.dataset_path:
+            self.dataset_path.parent.mkdir(parents=True, exist_ok=True)
+            np.savez_compressed(self.dataset_path, X=X, y=y)
+            logger.info(f"💾 Dataset saved to {self.dataset_path}")
+        
         # Train model
         metrics = self.train_model(X, y)
         
@@ -361,6 +388,288 @@ class ModelTrainer:
         return results
 
 
+def peak_rss_mb() -> float | None:
+    """Process memory high-water mark in MB (None where unsupported)."""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux and the BSDs report KiB
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return round(peak / divisor, 1)
+
+
+class LatticeTrainer:
+    """
+    Memory-bounded trainer over a lattice of POWER grid cells.
+
+    Samples are streamed as fixed-size float32 chunks: each grid cell costs
+    one range request to NASA POWER covering all years, and its rows are
+    copied into a preallocated buffer that is handed to the model once full.
+    Every chunk fits a few bootstrap-subsampled trees; a reservoir of at most
+    ``max_trees`` trees is kept across chunks and merged into a single
+    RandomForestRegressor at the end (sub-sampled bagging). Peak memory is
+    therefore bounded by one chunk, the holdout set and the tree reservoir,
+    independent of the number of rows streamed.
+    """
+
+    def __init__(
+        self,
+        years: int = 3,
+        bounds: tuple[float, float, float, float] = (-60.0, 70.0, -180.0, 180.0),
+        lat_step: float = GRID_LAT_STEP,
+        lon_step: float = GRID_LON_STEP,
+        max_cells: int | None = None,
+        chunk_size: int = 250_000,
+        trees_per_chunk: int = 4,
+        max_trees: int = 100,
+        max_samples: int = 50_000,
+        max_depth: int = 15,
+        holdout_rows: int = 50_000,
+        concurrency: int = 4,
+        seed: int = 42,
+    ):
+        """
+        Initialize lattice trainer.
+
+        Args:
+            years: Years of daily history per grid cell
+            bounds: (lat_min, lat_max, lon_min, lon_max) of the lattice
+            lat_step: Lattice spacing in latitude (degrees)
+            lon_step: Lattice spacing in longitude (degrees)
+            max_cells: Optional random subset of cells to train on
+            chunk_size: Rows per streamed chunk
+            trees_per_chunk: Trees fitted on every chunk
+            max_trees: Size of the tree reservoir (final forest size)
+            max_samples: Bootstrap rows drawn per tree
+            max_depth: Maximum tree depth
+            holdout_rows: Rows held out for evaluation
+            concurrency: Grid cells fetched in parallel
+            seed: Random seed for cell order, holdout and trees
+        """
+        self.years = years
+        self.bounds = bounds
+        self.lat_step = lat_step
+        self.lon_step = lon_step
+        self.max_cells = max_cells
+        self.chunk_size = chunk_size
+        self.trees_per_chunk = trees_per_chunk
+        self.max_trees = max_trees
+        self.max_samples = max_samples
+        self.max_depth = max_depth
+        self.holdout_rows = holdout_rows
+        self.concurrency = concurrency
+        self.rng = np.random.default_rng(seed)
+        self.seed = seed
+
+        self.nasa_client = NasaPowerClient()
+        self.ml_predictor = MLPredictor()
+        self.scaler = StandardScaler()
+        self.memory_high_water: list[dict[str, Any]] = []
+
+    def lattice_cells(self) -> list[GridCell]:
+        """Lattice cells in shuffled order so every chunk spans many climates."""
+        lat_min, lat_max, lon_min, lon_max = self.bounds
+        cells = list(iter_lattice(lat_min, lat_max, lon_min, lon_max, self.lat_step, self.lon_step))
+        order = self.rng.permutation(len(cells))
+        if self.max_cells is not None:
+            order = order[: self.max_cells]
+        return [cells[i] for i in order]
+
+    async def iter_chunks(self) -> AsyncIterator[tuple[np.ndarray, np.ndarray]]:
+        """
+        Stream (features, targets) chunks of exactly ``chunk_size`` rows.
+
+        The final chunk may be shorter. Yielded arrays are views into a
+        reused buffer and are only valid until the next iteration.
+        """
+        end_date = date.today() - timedelta(days=7)  # NASA has ~1 week lag
+        start_date = end_date - timedelta(days=365 * self.years)
+        days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+        day_of_year = np.array([d.timetuple().tm_yday for d in days])
+        month = np.array([d.month for d in days])
+
+        X_buf = np.empty((self.chunk_size, 9), dtype=np.float32)
+        y_buf = np.empty(self.chunk_size, dtype=np.float32)
+        filled = 0
+
+        cells = self.lattice_cells()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def fetch(cell: GridCell) -> np.ndarray | None:
+            async with semaphore:
+                try:
+                    return await self.nasa_client.daily_series(
+                        Location(latitude=cell.latitude, longitude=cell.longitude),
+                        start_date, end_date,
+                    )
+                except Exception as e:
+                    logger.warning(f"⚠️  Failed to fetch cell {cell.key}: {e}")
+                    return None
+
+        # Fetch a bounded window of cells at a time so pending series never
+        # exceed `concurrency` arrays in memory
+        for window_start in range(0, len(cells), self.concurrency):
+            window = cells[window_start:window_start + self.concurrency]
+            series_list = await asyncio.gather(*(fetch(cell) for cell in window))
+
+            for cell, series in zip(window, series_list):
+                if series is None:
+                    continue
+                valid = ~np.isnan(series)
+                n_rows = int(valid.sum())
+                if n_rows == 0:
+                    continue
+                cell_X = self.ml_predictor.extract_features_batch(
+                    np.full(n_rows, cell.latitude),
+                    np.full(n_rows, cell.longitude),
+                    day_of_year[valid],
+                    month[valid],
+                    dtype=np.float32,
+                )
+                cell_y = series[valid]
+
+                offset = 0
+                while offset < n_rows:
+                    take = min(self.chunk_size - filled, n_rows - offset)
+                    X_buf[filled:filled + take] = cell_X[offset:offset + take]
+                    y_buf[filled:filled + take] = cell_y[offset:offset + take]
+                    filled += take
+                    offset += take
+                    if filled == self.chunk_size:
+                        yield X_buf, y_buf
+                        filled = 0
+
+        if filled:
+            yield X_buf[:filled], y_buf[:filled]
+
+    async def run(self) -> dict[str, Any]:
+        """
+        Stream the lattice, fit the bagged forest and save it.
+
+        Returns:
+            Training results, metrics and memory high-water marks
+        """
+        lat_min, lat_max, lon_min, lon_max = self.bounds
+        logger.info(
+            f"🌐 Lattice training: lat {lat_min}..{lat_max}, lon {lon_min}..{lon_max}, "
+            f"{self.years} years, chunks of {self.chunk_size} rows"
+        )
+
+        trees: list[Any] = []
+        trees_seen = 0
+        template: RandomForestRegressor | None = None
+        holdout_X: list[np.ndarray] = []
+        holdout_y: list[np.ndarray] = []
+        holdout_count = 0
+        rows_trained = 0
+        chunk_index = 0
+
+        async for X_chunk, y_chunk in self.iter_chunks():
+            # Trees are scale invariant, so fitting the scaler on the first
+            # (spatially shuffled) chunk only has to stay consistent with
+            # what MLPredictor applies at inference time
+            if chunk_index == 0:
+                self.scaler.fit(X_chunk)
+            X_scaled = self.scaler.transform(X_chunk)
+
+            if holdout_count < self.holdout_rows:
+                take = min(self.holdout_rows - holdout_count, len(X_scaled) // 10)
+                idx = self.rng.choice(len(X_scaled), size=take, replace=False)
+                keep = np.ones(len(X_scaled), dtype=bool)
+                keep[idx] = False
+                holdout_X.append(X_scaled[idx])
+                holdout_y.append(y_chunk[idx].copy())
+                holdout_count += take
+                X_scaled, y_fit = X_scaled[keep], y_chunk[keep]
+            else:
+                y_fit = y_chunk
+
+            forest = RandomForestRegressor(
+                n_estimators=self.trees_per_chunk,
+                max_depth=self.max_depth,
+                min_samples_split=5,
+                min_samples_leaf=2,
+                max_features='sqrt',
+                bootstrap=True,
+                max_samples=min(self.max_samples, len(X_scaled)),
+                random_state=self.seed + chunk_index,
+                n_jobs=-1,
+            )
+            forest.fit(X_scaled, y_fit)
+            template = template or forest
+
+            # Reservoir sampling keeps a uniform sample of all trees fitted
+            for tree in forest.estimators_:
+                trees_seen += 1
+                if len(trees) < self.max_trees:
+                    trees.append(tree)
+                else:
+                    slot = int(self.rng.integers(0, trees_seen))
+                    if slot < self.max_trees:
+                        trees[slot] = tree
+
+            rows_trained += len(X_scaled)
+            chunk_index += 1
+            mark = {"chunk": chunk_index, "rows": rows_trained, "peak_rss_mb": peak_rss_mb()}
+            self.memory_high_water.append(mark)
+            logger.info(
+                f"✅ Chunk {chunk_index}: {rows_trained} rows, {len(trees)} trees kept, "
+                f"peak RSS {mark['peak_rss_mb']} MB"
+            )
+
+        if template is None or holdout_count == 0:
+            raise ValueError("Insufficient training data: no lattice samples collected")
+
+        model = merge_forests(template, trees)
+        X_test = np.concatenate(holdout_X)
+        y_test = np.concatenate(holdout_y)
+        y_pred = model.predict(X_test)
+
+        mae = mean_absolute_error(y_test, y_pred)
+        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+        r2 = r2_score(y_test, y_pred)
+        accuracy = (np.abs(y_pred - y_test) <= 2.0).sum() / len(y_test)
+
+        metrics = {
+            "mae": round(float(mae), 3),
+            "rmse": round(float(rmse), 3),
+            "r2_score": round(float(r2), 3),
+            "accuracy_2mm": round(float(accuracy), 3),
+            "n_samples_train": rows_trained,
+            "n_samples_test": len(y_test),
+            "n_estimators": len(trees),
+            "max_depth": self.max_depth,
+            "chunks": chunk_index,
+            "peak_rss_mb": peak_rss_mb(),
+        }
+        logger.info(f"📊 MAE: {mae:.3f}mm, RMSE: {rmse:.3f}mm, R²: {r2:.3f}")
+        logger.info(f"📊 Peak RSS: {metrics['peak_rss_mb']} MB over {chunk_index} chunks")
+
+        self.ml_predictor.model = model
+        self.ml_predictor.scaler = self.scaler
+        self.ml_predictor.is_trained = True
+        self.ml_predictor.save_model()
+
+        return {
+            "status": "success",
+            "metrics": metrics,
+            "memory_high_water": self.memory_high_water,
+            "training_date": datetime.now().isoformat(),
+            "training_samples": rows_trained,
+        }
+
+
+def merge_forests(template: RandomForestRegressor, trees: list[Any]) -> RandomForestRegressor:
+    """Combine trees fitted on separate chunks into one forest."""
+    model = RandomForestRegressor(**template.get_params())
+    model.set_params(n_estimators=len(trees), max_samples=None)
+    model.estimators_ = list(trees)
+    model.estimator_ = template.estimator_
+    model.n_features_in_ = template.n_features_in_
+    model.n_outputs_ = template.n_outputs_
+    return model
+
+
 async def main():
     """Main training script."""
     parser = argparse.ArgumentParser(
@@ -390,8 +699,91 @@ async def main():
         default=15,
         help="Maximum tree depth (default: 15)"
     )
+    parser.add_argument(
+        "--backend",
+        choices=MODEL_BACKENDS,
+        default=DEFAULT_BACKEND,
+        help=f"Model backend to train (default: {DEFAULT_BACKEND})"
+    )
+    parser.add_argument(
+        "--save-dataset",
+        type=Path,
+        default=None,
+        help="Save the collected dataset as .npz (for app.benchmarks.models)"
+    )
+    parser.add_argument(
+        "--lattice",
+        action="store_true",
+        help="Stream samples from a lattice of grid cells instead of SAMPLE_LOCATIONS"
+    )
+    parser.add_argument(
+        "--bounds",
+        type=str,
+        default="-60,70,-180,180",
+        help="Lattice bounds as lat_min,lat_max,lon_min,lon_max (default: -60,70,-180,180)"
+    )
+    parser.add_argument(
+        "--lat-step",
+        type=float,
+        default=GRID_LAT_STEP,
+        help=f"Lattice latitude spacing in degrees (default: {GRID_LAT_STEP})"
+    )
+    parser.add_argument(
+        "--lon-step",
+        type=float,
+        default=GRID_LON_STEP,
+        help=f"Lattice longitude spacing in degrees (default: {GRID_LON_STEP})"
+    )
+    parser.add_argument(
+        "--max-cells",
+        type=int,
+        default=None,
+        help="Train on a random subset of lattice cells (default: all)"
+    )
+    parser.add_argument(
+        "--chunk-size",
+        type=int,
+        default=250_000,
+        help="Rows per streamed training chunk (default: 250000)"
+    )
+    parser.add_argument(
+        "--trees-per-chunk",
+        type=int,
+        default=4,
+        help="Trees fitted on each chunk (default: 4)"
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=4,
+        help="Grid cells fetched from NASA POWER in parallel (default: 4)"
+    )
     
     args = parser.parse_args()
+
+    if args.lattice:
+        if args.backend != RANDOM_FOREST:
+            parser.error("--lattice trains a bagged random forest; use --backend random_forest")
+        lat_min, lat_max, lon_min, lon_max = (float(v) for v in args.bounds.split(","))
+        logger.info("🚀 Starting lattice training pipeline")
+        trainer = LatticeTrainer(
+            years=args.years,
+            bounds=(lat_min, lat_max, lon_min, lon_max),
+            lat_step=args.lat_step,
+            lon_step=args.lon_step,
+            max_cells=args.max_cells,
+            chunk_size=args.chunk_size,
+            trees_per_chunk=args.trees_per_chunk,
+            max_trees=args.estimators,
+            max_depth=args.max_depth,
+            concurrency=args.concurrency,
+        )
+        results = await trainer.run()
+        logger.info(f"✅ Model saved to: {trainer.ml_predictor.model_path}")
+        logger.info(f"✅ Trained on {results['training_samples']} rows")
+        logger.info(f"✅ R² Score: {results['metrics']['r2_score']:.3f}")
+        logger.info(f"✅ Peak RSS: {results['metrics']['peak_rss_mb']} MB")
+        return results
     
     logger.info("🚀 Starting model training pipeline")
     logger.info(f"⚙️  Configuration:")
@@ -399,10 +791,16 @@ async def main():
     logger.info(f"   - Samples per location: {args.samples}")
     logger.info(f"   - Locations: {len(SAMPLE_LOCATIONS)}")
     logger.info(f"   - Total expected samples: {len(SAMPLE_LOCATIONS) * args.samples}")
-    logger.info(f"   - Random Forest trees: {args.estimators}")
+    logger.info(f"   - Backend: {args.backend}")
+    logger.info(f"   - Trees: {args.estimators}")
     logger.info(f"   - Max tree depth: {args.max_depth}")
     
-    trainer = ModelTrainer(years=args.years, samples_per_location=args.samples)
+    trainer = ModelTrainer(
+        years=args.years,
+        samples_per_location=args.samples,
+        backend=args.backend,
+        dataset_path=args.save_dataset,
+    )
     
     try:
         results = await trainer.run_full_training()
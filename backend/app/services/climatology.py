@@ -0,0 +1,167 @@
+"""
+Day-of-year precipitation climatology.
+
+An offline builder (app.scripts.build_climatology) condenses N years of
+NASA POWER daily data into one table per grid cell and calendar day:
+
+- mean_mm: mean daily precipitation
+- wet_day_frequency: share of days with at least WET_DAY_MM
+- p50_mm / p90_mm: median and 90th percentile
+
+Each calendar day pools the values within ±window_days of it, across all
+years, to smooth out single-year noise. The table is a float32 array of
+shape (rows, cols, 366, fields) saved as .npy next to a JSON sidecar and is
+opened memory-mapped, so a lookup is an index calculation plus one read.
+
+Every build writes its table under a new name (table_file) and then swaps
+in the sidecar naming it, so the sidecar is the single commit point: a
+reader always gets a table together with the lattice origin it was built
+with, and a crashed rebuild leaves the previous pair in place.
+"""
+
+from __future__ import annotations
+
+import json
+import math
+from datetime import date
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, NamedTuple
+
+import numpy as np
+from loguru import logger
+
+from app.core.config import get_settings
+from app.services.grid import snap_to_grid
+
+FIELDS = ("mean_mm", "wet_day_frequency", "p50_mm", "p90_mm")
+WET_DAY_MM = 1.0
+DAYS = 366
+TABLE_FILE = "climatology.npy"  # tables built before sidecars named theirs
+META_FILE = "climatology.json"
+
+
+def table_file(build_id: str) -> str:
+    """File name of the table written by one build."""
+    return f"climatology.{build_id}.npy"
+
+
+class ClimatologyEntry(NamedTuple):
+    """Climatology of one grid cell on one calendar day."""
+
+    mean_mm: float
+    wet_day_frequency: float
+    p50_mm: float
+    p90_mm: float
+    years: int
+    window_days: int
+
+
+def calendar_index(day: date) -> int:
+    """Position of a date in a 366-day (leap year) calendar, 0-based."""
+    return date(2000, day.month, day.day).timetuple().tm_yday - 1
+
+
+def daily_climatology(
+    by_calendar_day: np.ndarray, window_days: int, wet_day_mm: float = WET_DAY_MM
+) -> np.ndarray:
+    """
+    Smoothed statistics for every calendar day.
+
+    Args:
+        by_calendar_day: (n_years, 366) daily values, NaN where missing
+            (including Feb 29 in non-leap years)
+        window_days: Half-width of the pooling window
+        wet_day_mm: Threshold for a wet day
+
+    Returns:
+        (366, len(FIELDS)) float32 array, NaN where no data was available
+    """
+    # Pool the ±window_days neighbours of every calendar day (wrapping
+    # around the year end) into one sample axis
+    pooled = np.concatenate([
+        np.roll(by_calendar_day, -shift, axis=1)
+        for shift in range(-window_days, window_days + 1)
+    ])
+    valid = ~np.isnan(pooled)
+    counts = valid.sum(axis=0)
+
+    table = np.full((DAYS, len(FIELDS)), np.nan, dtype=np.float32)
+    has_data = counts > 0
+    if not has_data.any():
+        return table
+
+    sample = pooled[:, has_data]
+    table[has_data, 0] = np.nanmean(sample, axis=0)
+    table[has_data, 1] = (np.where(valid[:, has_data], sample, 0.0) >= wet_day_mm).sum(axis=0) / counts[has_data]
+    table[has_data, 2], table[has_data, 3] = np.nanpercentile(sample, [50, 90], axis=0)
+    return table
+
+
+class Climatology:
+    """Memory-mapped climatology table with O(1) lookups."""
+
+    def __init__(self, table: np.ndarray, meta: dict[str, Any]) -> None:
+        self.table = table
+        self.meta = meta
+        self.lat_step = float(meta["lat_step"])
+        self.lon_step = float(meta["lon_step"])
+        self.row0 = int(meta["row0"])
+        self.col0 = int(meta["col0"])
+        self.years = int(meta["years"])
+        self.window_days = int(meta["window_days"])
+
+    @property
+    def version(self) -> str:
+        """Identifies the build, changes whenever the table is rebuilt."""
+        return str(self.meta.get("build_id", self.meta.get("built_at", "unknown")))
+
+    @classmethod
+    def load(cls, path: Path | str) -> Climatology | None:
+        """Open a table built by app.scripts.build_climatology, if present."""
+        path = Path(path)
+        meta_path = path / META_FILE
+        if not meta_path.exists():
+            return None
+        try:
+            # The sidecar names its table, so both always come from one build
+            meta = json.loads(meta_path.read_text())
+            table = np.load(path / meta.get("table", TABLE_FILE), mmap_mode="r")
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"⚠️  Could not load climatology from {path}: {e}")
+            return None
+        if table.shape[:2] != (meta.get("rows", table.shape[0]), meta.get("cols", table.shape[1])):
+            logger.warning(f"⚠️  Climatology table in {path} does not match its metadata, ignoring it")
+            return None
+        logger.info(
+            f"✅ Climatology loaded from {path} "
+            f"({table.shape[0]}x{table.shape[1]} cells, {meta['years']} years)"
+        )
+        return cls(table, meta)
+
+    def lookup(self, latitude: float, longitude: float, target_date: date) -> ClimatologyEntry | None:
+        """Climatology for the grid cell containing a point, None if not covered."""
+        cell = snap_to_grid(latitude, longitude, self.lat_step, self.lon_step)
+        row = round(cell.latitude / self.lat_step) - self.row0
+        col = round(cell.longitude / self.lon_step) - self.col0
+        if not (0 <= row < self.table.shape[0] and 0 <= col < self.table.shape[1]):
+            return None
+        values = self.table[row, col, calendar_index(target_date)]
+        if np.isnan(values[0]):
+            return None
+        return ClimatologyEntry(
+            *(float(v) for v in values), years=self.years, window_days=self.window_days
+        )
+
+
+def lattice_origin(lat_min: float, lon_min: float, lat_step: float, lon_step: float) -> tuple[int, int]:
+    """Row/column index of the first lattice cell (matches iter_lattice)."""
+    return math.ceil(lat_min / lat_step), math.ceil(lon_min / lon_step)
+
+
+@lru_cache
+def get_climatology() -> Climatology | None:
+    """Climatology table configured by CLIMATOLOGY_PATH, loaded once."""
+    return Climatology.load(get_settings().climatology_path)
@@ -0,0 +1,81 @@
+"""Application-lifetime service instances."""
+
+from __future__ import annotations
+
+import asyncio
+
+import httpx
+from loguru import logger
+
+from app.core.config import Settings, get_settings
+from app.core.database import ForecastDatabase, close_forecast_database, get_forecast_database
+from app.core.write_behind import ForecastWriteQueue, close_write_queue, get_write_queue
+from app.services.ensemble_forecaster import EnsembleForecaster
+from app.services.geocoding import Geocoder
+from app.services.ml_predictor import MLPredictor, get_ml_predictor
+from app.services.nasa_power import NasaPowerClient
+
+
+class ServiceContainer:
+    """
+    One instance of every service the API uses.
+
+    Built in the app lifespan and kept on ``app.state.services``; the route
+    dependencies return its members. POWER and Nominatim calls go through
+    two long-lived httpx clients, so connections are pooled and reused
+    across requests, and the ensemble forecaster shares the routes' NASA
+    client. The database pool and write-behind queue are the module
+    singletons, so scripts and the API see the same instances.
+
+    The ML model (and with it sklearn) is loaded by a background warm-up
+    started in ``start``, so the app serves /health while it loads; routes
+    that need the model wait for it through ``ml_ready``.
+    """
+
+    def __init__(self, settings: Settings | None = None) -> None:
+        self.settings = settings or get_settings()
+        self.nasa_http = httpx.AsyncClient(**NasaPowerClient.http_client_kwargs(self.settings))
+        self.geocoding_http = httpx.AsyncClient(**Geocoder.http_client_kwargs())
+        self.geocoder = Geocoder(http_client=self.geocoding_http)
+        self.nasa_client = NasaPowerClient(http_client=self.nasa_http, geocoder=self.geocoder)
+        self.ml_predictor: MLPredictor = get_ml_predictor()
+        self.ensemble = EnsembleForecaster(
+            nasa_client=self.nasa_client, ml_predictor=self.ml_predictor
+        )
+        self.database: ForecastDatabase | None = None
+        self.write_queue: ForecastWriteQueue | None = None
+        if self.settings.database_enabled:
+            # Open the pool and create the schema once, before the first request
+            self.database = get_forecast_database()
+            self.write_queue = get_write_queue()
+        self._ml_warmup: asyncio.Task | None = None
+
+    def start(self) -> None:
+        """Start background work; call from within the running event loop."""
+        if self.write_queue is not None:
+            self.write_queue.start()
+        self._warm_up_ml()
+
+    def _warm_up_ml(self) -> asyncio.Task:
+        if self._ml_warmup is None:
+            self._ml_warmup = asyncio.create_task(
+                asyncio.to_thread(self.ml_predictor.ensure_loaded)
+            )
+        return self._ml_warmup
+
+    async def ml_ready(self) -> MLPredictor:
+        """The ML predictor, once its model load has finished."""
+        await asyncio.shield(self._warm_up_ml())
+        return self.ml_predictor
+
+    async def close(self) -> None:
+        """Flush buffered forecasts, then release the DB pool and HTTP connections."""
+        if self._ml_warmup is not None:
+            await self._ml_warmup
+        if self.database is not None:
+            await close_write_queue()
+            close_forecast_database()
+            self.write_queue = self.database = None
+        await self.nasa_http.aclose()
+        await self.geocoding_http.aclose()
+        logger.info("Services closed")
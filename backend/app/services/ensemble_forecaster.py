@@ -4,25 +4,37 @@ Ensemble Forecasting System
 Combines multiple data sources and prediction methods:
 - NASA POWER API (historical satellite observations)
 - ML predictor (trained on patterns)
-- Statistical analysis (scipy-based)
+- Statistical analysis (closed-form trend regression)
 
 Target Accuracy: 70-80% through weighted ensemble
 """
 
 from __future__ import annotations
 
+import asyncio
 from datetime import date, datetime, timedelta, timezone
-from typing import Any
+from typing import Any, AsyncIterator
 
 import numpy as np
 from loguru import logger
-from scipy import stats
 
-from app.models.forecast import ForecastResponse, Location
-from app.services.ml_predictor import get_ml_predictor
+from app.core.cache import ResultCache, cache_key, get_ensemble_cache
+from app.core.metrics import ENSEMBLE_STAGE_SECONDS
+from app.models.forecast import (
+    DailyRisk,
+    EventWindowForecast,
+    ForecastResponse,
+    Location,
+)
+from app.services.climatology import ClimatologyEntry, get_climatology
+from app.services.grid import GridCell, snap_to_grid
+from app.services.ml_predictor import MLPredictor, get_ml_predictor
 from app.services.nasa_power import NasaPowerClient
+from app.services.trend import trend_estimates
 
 NASA_DATASET = "NASA POWER + ML Ensemble"
+# Grid-cell series fetched in parallel by the batch path
+BATCH_FETCH_CONCURRENCY = 8
 
 
 class EnsembleForecaster:
@@ -38,17 +50,63 @@ class EnsembleForecaster:
     - Data recency (newer = higher weight)
     - Confidence scores
     - Historical accuracy
+    
+    Finished forecasts are cached per (grid cell, date, model version,
+    weights), so repeat requests for a cell skip the upstream fetches.
     """
     
-    def __init__(self):
+    def __init__(
+        self,
+        result_cache: ResultCache | None = None,
+        nasa_client: NasaPowerClient | None = None,
+        ml_predictor: MLPredictor | None = None,
+    ):
         """Initialize ensemble forecaster with all components."""
-        self.nasa_client = NasaPowerClient()
-        self.ml_predictor = get_ml_predictor()
+        self.nasa_client = nasa_client or NasaPowerClient()
+        self.ml_predictor = ml_predictor or get_ml_predictor()
+        self.result_cache = result_cache or get_ensemble_cache()
+        self._cached_model_version = self.ml_predictor.model_version
         
         # Default weights (can be adjusted based on validation)
         self.nasa_weight = 0.50
         self.ml_weight = 0.30
         self.stats_weight = 0.20
+
+    def set_weights(self, nasa: float, ml: float, stats: float) -> None:
+        """Change the base ensemble weights and drop results blended with the old ones."""
+        self.nasa_weight, self.ml_weight, self.stats_weight = nasa, ml, stats
+        self.result_cache.invalidate()
+
+    @property
+    def weights_key(self) -> str:
+        """The base weights as a string, for cache keys and ETags."""
+        return f"{self.nasa_weight:g}/{self.ml_weight:g}/{self.stats_weight:g}"
+
+    def _result_key(self, location: Location, event_date: date) -> str:
+        """
+        Cache key for a finished forecast.
+        
+        Points in the same NASA POWER grid cell share a key: their NASA and
+        statistical components are identical, and the ML component varies
+        only below the resolution of its training data.
+        """
+        cell = snap_to_grid(location.latitude, location.longitude)
+        return cache_key(
+            "ensemble", cell.key, event_date.isoformat(),
+            self.ml_predictor.model_version, self.weights_key,
+        )
+
+    def _cached_result(self, location: Location, event_date: date) -> ForecastResponse | None:
+        """Cached forecast for this cell/date, relabelled with the requested location."""
+        if self.ml_predictor.model_version != self._cached_model_version:
+            # Model was reloaded: nothing cached can be hit again
+            self._cached_model_version = self.ml_predictor.model_version
+            self.result_cache.invalidate()
+            return None
+        cached = self.result_cache.get(self._result_key(location, event_date))
+        if cached is None:
+            return None
+        return cached.model_copy(update={"location": location})
     
     async def get_ensemble_forecast(
         self,
@@ -77,43 +135,482 @@ class EnsembleForecaster:
             f"on {event_date}"
         )
         
+        cached = self._cached_result(location, event_date)
+        if cached is not None:
+            logger.debug(f"Ensemble cache hit for {event_date}")
+            return cached
+        
         # 1. Get NASA POWER baseline (ground truth)
-        nasa_forecast = await self.nasa_client.precipitation_forecast(
-            location, event_date
-        )
+        with ENSEMBLE_STAGE_SECONDS.time(stage="nasa_baseline"):
+            nasa_forecast = await self.nasa_client.precipitation_forecast(
+                location, event_date
+            )
         nasa_precip = nasa_forecast.precipitation_intensity_mm
         nasa_prob = nasa_forecast.precipitation_probability
         
         # 2. Get historical average for ML features
-        historical_avg = await self._get_historical_average(location, event_date)
+        with ENSEMBLE_STAGE_SECONDS.time(stage="historical"):
+            historical_avg = await self._get_historical_average(location, event_date)
         
         # 3. Get ML prediction
-        ml_result = self.ml_predictor.predict(
-            location, event_date, historical_avg
-        )
-        ml_precip = ml_result["predicted_mm"]
-        ml_confidence = ml_result["confidence"]
+        with ENSEMBLE_STAGE_SECONDS.time(stage="ml"):
+            ml_result = self.ml_predictor.predict(
+                location, event_date, historical_avg
+            )
         
         # 4. Calculate statistical estimate
-        stats_result = await self._calculate_statistical_estimate(
-            location, event_date, historical_avg
+        with ENSEMBLE_STAGE_SECONDS.time(stage="stats"):
+            stats_result = await self._calculate_statistical_estimate(
+                location, event_date, historical_avg
+            )
+        
+        # 5-10. Weight, combine and summarize
+        with ENSEMBLE_STAGE_SECONDS.time(stage="blend"):
+            result = self._blend(
+                location, event_date, nasa_precip, nasa_prob, ml_result, stats_result
+            )
+        self.result_cache.set(self._result_key(location, event_date), result)
+        return result
+
+    async def stream_ensemble_forecast(
+        self,
+        location: Location,
+        event_date: date
+    ) -> AsyncIterator[tuple[str, Any]]:
+        """
+        Ensemble forecast that reports each component as soon as it is ready.
+        
+        The NASA baseline, ML prediction and statistical trend run
+        concurrently. The ML and statistical stages both wait for the
+        historical average, so the statistical stage's first three years
+        come from the NASA client cache instead of a second fetch.
+        
+        Yields:
+            (event, payload) pairs: "nasa_baseline", "ml_prediction" and
+            "statistical_trend" with dict payloads in completion order, then
+            "forecast" with the blended ForecastResponse (identical to
+            get_ensemble_forecast). A cached result yields only "forecast".
+        """
+        cached = self._cached_result(location, event_date)
+        if cached is not None:
+            yield "forecast", cached
+            return
+        
+        async def historical_stage() -> float:
+            with ENSEMBLE_STAGE_SECONDS.time(stage="historical"):
+                return await self._get_historical_average(location, event_date)
+        
+        historical = asyncio.create_task(historical_stage())
+        
+        # Stages overlap here, so each is timed without its wait for the
+        # historical average; the sum is not the request latency
+        async def nasa_stage() -> tuple[str, dict[str, Any]]:
+            with ENSEMBLE_STAGE_SECONDS.time(stage="nasa_baseline"):
+                forecast = await self.nasa_client.precipitation_forecast(location, event_date)
+            return "nasa_baseline", {
+                "precipitation_mm": forecast.precipitation_intensity_mm,
+                "probability": forecast.precipitation_probability,
+            }
+        
+        async def ml_stage() -> tuple[str, dict[str, Any]]:
+            historical_avg = await historical
+            with ENSEMBLE_STAGE_SECONDS.time(stage="ml"):
+                return "ml_prediction", self.ml_predictor.predict(
+                    location, event_date, historical_avg
+                )
+        
+        async def stats_stage() -> tuple[str, dict[str, Any]]:
+            historical_avg = await historical
+            with ENSEMBLE_STAGE_SECONDS.time(stage="stats"):
+                return "statistical_trend", await self._calculate_statistical_estimate(
+                    location, event_date, historical_avg
+                )
+        
+        pending = {asyncio.create_task(stage()) for stage in (nasa_stage, ml_stage, stats_stage)}
+        components: dict[str, dict[str, Any]] = {}
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    event, payload = task.result()
+                    components[event] = payload
+                    yield event, payload
+        finally:
+            # Client went away or a stage failed: stop the remaining lookups
+            for task in (*pending, historical):
+                task.cancel()
+        
+        nasa = components["nasa_baseline"]
+        with ENSEMBLE_STAGE_SECONDS.time(stage="blend"):
+            result = self._blend(
+                location,
+                event_date,
+                nasa["precipitation_mm"],
+                nasa["probability"],
+                components["ml_prediction"],
+                components["statistical_trend"],
+            )
+        self.result_cache.set(self._result_key(location, event_date), result)
+        yield "forecast", result
+
+    async def get_batch_ensemble_forecast(
+        self,
+        items: list[tuple[Location, date]],
+    ) -> list[ForecastResponse | Exception]:
+        """
+        Ensemble forecasts for many (location, date) pairs at once.
+
+        Process:
+        1. Serve cached items, group the rest by NASA POWER grid cell
+        2. Fetch one daily series per cell covering every date it needs
+        3. Read baseline and 5 prior years for each item from the series;
+           the climatology table, where it covers the cell, supplies the
+           historical average and the baseline of future dates
+        4. Run the ML model once over all items
+        5. Fit all trend regressions in one vectorized pass
+        6. Blend each item exactly like get_ensemble_forecast
+
+        Steps 2-6 are timed as the nasa_baseline, historical, ml, stats
+        and blend stages, once per batch rather than per item.
+
+        Args:
+            items: (location, event_date) pairs
+
+        Returns:
+            One entry per item in input order: the forecast, or the
+            exception that prevented it
+        """
+        logger.info(f"🎯 Generating batch ensemble forecast for {len(items)} items")
+        results: list[ForecastResponse | Exception | None] = [None] * len(items)
+        today = datetime.now().date()
+        climatology = get_climatology()
+
+        def source(day: date | None, entry: ClimatologyEntry | None) -> date | float | None:
+            """
+            Where NasaPowerClient.precipitation_forecast gets a day's value:
+            the day to read from the series, the climatology mean (future
+            days in a covered cell) or the same day last year (other future
+            days). None if the day does not exist.
+            """
+            if day is None or day <= today:
+                return day
+            if entry is not None:
+                # Same rounding as NasaPowerClient._climatology_forecast
+                return round(max(entry.mean_mm, 0.0), 2)
+            return _shift_year(day, 1)
+
+        # 1. Dates each item needs: baseline plus the same day in prior years
+        plans: list[
+            tuple[int, GridCell, date | float, list[date | float | None], ClimatologyEntry | None]
+        ] = []
+        cell_ranges: dict[GridCell, tuple[date, date]] = {}
+        for index, (location, event_date) in enumerate(items):
+            cached = self._cached_result(location, event_date)
+            if cached is not None:
+                results[index] = cached
+                continue
+            entry = (
+                climatology.lookup(location.latitude, location.longitude, event_date)
+                if climatology else None
+            )
+            baseline_source = source(event_date, entry)
+            if baseline_source is None:
+                results[index] = ValueError(f"No baseline date available for {event_date}")
+                continue
+            history_sources = [
+                source(_shift_year(event_date, offset), entry) for offset in range(1, 6)
+            ]
+            cell = snap_to_grid(location.latitude, location.longitude)
+            needed = [d for d in (baseline_source, *history_sources) if isinstance(d, date)]
+            if needed:
+                low, high = cell_ranges.get(cell, (min(needed), max(needed)))
+                cell_ranges[cell] = (min(low, *needed), max(high, *needed))
+            plans.append((index, cell, baseline_source, history_sources, entry))
+
+        # 2. One upstream call per grid cell
+        semaphore = asyncio.Semaphore(BATCH_FETCH_CONCURRENCY)
+
+        async def fetch(cell: GridCell) -> np.ndarray | Exception:
+            start, end = cell_ranges[cell]
+            async with semaphore:
+                try:
+                    return await self.nasa_client.daily_series(
+                        Location(latitude=cell.latitude, longitude=cell.longitude),
+                        start, end,
+                    )
+                except Exception as exc:
+                    logger.warning(f"NASA POWER series failed for cell {cell.key}: {exc}")
+                    return exc
+
+        cells = list(cell_ranges)
+        with ENSEMBLE_STAGE_SECONDS.time(stage="nasa_baseline"):
+            series_by_cell = dict(zip(cells, await asyncio.gather(*(fetch(c) for c in cells))))
+
+        # 3. Baseline and history values per item
+        with ENSEMBLE_STAGE_SECONDS.time(stage="historical"):
+            ready: list[int] = []
+            baselines: list[tuple[float, float]] = []
+            history_rows: list[list[float]] = []
+            climate_avgs: list[float] = []
+            for index, cell, baseline_source, history_sources, entry in plans:
+                series = series_by_cell.get(cell)
+                if isinstance(series, Exception):
+                    results[index] = series
+                    continue
+                start = cell_ranges[cell][0] if cell in cell_ranges else today
+
+                def value(day: date | float | None) -> float:
+                    if isinstance(day, date):
+                        return float(series[(day - start).days])
+                    return np.nan if day is None else day
+
+                mm = value(baseline_source)
+                if np.isnan(mm):
+                    results[index] = ValueError(
+                        f"NASA POWER has no data for {baseline_source} yet"
+                    )
+                    continue
+                if isinstance(baseline_source, date):
+                    probability = NasaPowerClient._precipitation_probability(mm)
+                else:
+                    probability = round(min(max(entry.wet_day_frequency, 0.0), 1.0), 3)
+                ready.append(index)
+                baselines.append((mm, probability))
+                history_rows.append([value(day) for day in history_sources])
+                climate_avgs.append(entry.mean_mm if entry is not None else np.nan)
+
+            if ready:
+                history = np.array(history_rows)
+                recent = history[:, :3]
+                recent_counts = (~np.isnan(recent)).sum(axis=1)
+                historical_avgs = np.where(
+                    recent_counts > 0,
+                    np.nansum(recent, axis=1) / np.maximum(recent_counts, 1),
+                    0.0,
+                )
+                # The climatology mean replaces the 3-year mean where available
+                climate = np.array(climate_avgs)
+                historical_avgs = np.where(np.isnan(climate), historical_avgs, climate)
+
+        if ready:
+            # 4. ML model over all items at once
+            with ENSEMBLE_STAGE_SECONDS.time(stage="ml"):
+                ml_results = self.ml_predictor.predict_batch(
+                    np.array([items[i][0].latitude for i in ready]),
+                    np.array([items[i][0].longitude for i in ready]),
+                    [items[i][1] for i in ready],
+                    historical_avgs,
+                )
+
+            # 5. Trend regressions in one pass
+            with ENSEMBLE_STAGE_SECONDS.time(stage="stats"):
+                stats_results = trend_estimates(history, historical_avgs)
+
+            # 6. Blend per item
+            with ENSEMBLE_STAGE_SECONDS.time(stage="blend"):
+                for row, index in enumerate(ready):
+                    location, event_date = items[index]
+                    baseline, probability = baselines[row]
+                    results[index] = self._blend(
+                        location,
+                        event_date,
+                        baseline,
+                        probability,
+                        ml_results[row],
+                        stats_results[row],
+                    )
+                    self.result_cache.set(self._result_key(location, event_date), results[index])
+
+        logger.info(
+            f"✅ Batch ensemble: {len(ready)}/{len(items)} items from "
+            f"{len(cells)} grid cells"
+        )
+        return results  # type: ignore[return-value]
+
+    async def get_window_forecast(
+        self,
+        location: Location,
+        event_start: date,
+        event_end: date
+    ) -> ForecastResponse:
+        """
+        Ensemble forecast for a multi-day event.
+
+        Every day of the window runs through the batch path, so the whole
+        event costs one multi-year range pull for the location's grid cell
+        plus one vectorized ML and trend pass. That batch records the stage
+        timings, once per stage for the whole window.
+
+        Aggregates assume days are independent:
+        - probability_any_rain = 1 - prod(1 - p_day)
+        - expected_total_mm = sum of daily ensemble intensities
+
+        Args:
+            location: Location to forecast for
+            event_start: First day of the event
+            event_end: Last day of the event (inclusive)
+
+        Returns:
+            Forecast whose top-level probability/intensity are the window
+            aggregates, with per-day risk in event_window
+        """
+        days = [
+            event_start + timedelta(days=offset)
+            for offset in range((event_end - event_start).days + 1)
+        ]
+        logger.info(
+            f"🎯 Generating {len(days)}-day event forecast for "
+            f"{location.name or 'unknown'} from {event_start} to {event_end}"
+        )
+
+        daily = await self.get_batch_ensemble_forecast([(location, day) for day in days])
+        for result in daily:
+            if isinstance(result, Exception):
+                raise result
+
+        probabilities = np.array([f.precipitation_probability for f in daily])
+        intensities = np.array([f.precipitation_intensity_mm for f in daily])
+        probability_any = float(1.0 - np.prod(1.0 - probabilities))
+        expected_total = float(intensities.sum())
+        wettest = daily[int(np.argmax(probabilities))]
+
+        summary = (
+            NasaPowerClient._summarize(probability_any, expected_total)
+            + f" Expected {expected_total:.1f}mm over {len(days)} days; highest risk on "
+            f"{wettest.event_date:%b %d} ({wettest.precipitation_probability:.0%})."
+            + " (Combined NASA satellite data, ML predictions, and statistical analysis)"
+        )
+
+        return ForecastResponse(
+            location=location,
+            event_date=event_start,
+            precipitation_probability=round(min(max(probability_any, 0.0), 1.0), 3),
+            precipitation_intensity_mm=round(expected_total, 2),
+            summary=summary,
+            nasa_dataset=NASA_DATASET,
+            issued_at=datetime.now(timezone.utc),
+            event_window=EventWindowForecast(
+                event_start=event_start,
+                event_end=event_end,
+                probability_any_rain=round(min(max(probability_any, 0.0), 1.0), 3),
+                expected_total_mm=round(expected_total, 2),
+                days=[
+                    DailyRisk(
+                        event_date=f.event_date,
+                        precipitation_probability=f.precipitation_probability,
+                        precipitation_intensity_mm=f.precipitation_intensity_mm,
+                    )
+                    for f in daily
+                ],
+            ),
         )
+
+    async def _get_historical_average(
+        self, location: Location, target_date: date
+    ) -> float:
+        """
+        Get historical average precipitation for this location/date.
+        
+        Uses the precomputed climatology when it covers this location,
+        otherwise queries same day from last 3 years and calculates average.
+        """
+        climatology = get_climatology()
+        if climatology is not None:
+            entry = climatology.lookup(location.latitude, location.longitude, target_date)
+            if entry is not None:
+                return entry.mean_mm
+        
+        try:
+            historical_values = []
+            for year_offset in range(1, 4):
+                try:
+                    historical_date = target_date.replace(
+                        year=target_date.year - year_offset
+                    )
+                    forecast = await self.nasa_client.precipitation_forecast(
+                        location, historical_date
+                    )
+                    historical_values.append(forecast.precipitation_intensity_mm)
+                except (ValueError, Exception):
+                    continue
+            
+            if historical_values:
+                return float(np.mean(historical_values))
+            return 0.0
+            
+        except Exception as e:
+            logger.warning(f"Could not get historical average: {e}")
+            return 0.0
+    
+    async def _calculate_statistical_estimate(
+        self, location: Location, target_date: date, historical_avg: float
+    ) -> dict[str, Any]:
+        """
+        Calculate statistical estimate using historical patterns and trends.
+        
+        Uses a closed-form least-squares fit over the same day in the last
+        5 years to detect trends. Years that could not be fetched are
+        treated as missing.
+        """
+        try:
+            # Get last 5 years of data for trend analysis
+            historical_data = []
+            
+            for year_offset in range(1, 6):
+                try:
+                    historical_date = target_date.replace(
+                        year=target_date.year - year_offset
+                    )
+                    forecast = await self.nasa_client.precipitation_forecast(
+                        location, historical_date
+                    )
+                    historical_data.append(forecast.precipitation_intensity_mm)
+                except (ValueError, Exception):
+                    historical_data.append(np.nan)
+            
+            return trend_estimates(np.array([historical_data]), [historical_avg])[0]
+            
+        except Exception as e:
+            logger.warning(f"Statistical estimation failed: {e}")
+            return {
+                "estimated_mm": historical_avg,
+                "confidence": 0.4,
+                "trend": "error"
+            }
+    
+    def _blend(
+        self,
+        location: Location,
+        event_date: date,
+        nasa_precip: float,
+        nasa_prob: float,
+        ml_result: dict[str, Any],
+        stats_result: dict[str, Any],
+    ) -> ForecastResponse:
+        """
+        Combine the component estimates into the final ensemble forecast.
+        
+        Shared by the single, batch and streaming paths so they blend
+        identically.
+        """
+        ml_precip = ml_result["predicted_mm"]
+        ml_confidence = ml_result["confidence"]
         stats_precip = stats_result["estimated_mm"]
         stats_confidence = stats_result["confidence"]
         
-        # 5. Adjust weights based on confidence scores
+        # 1. Adjust weights based on confidence scores
         adjusted_weights = self._adjust_weights(
             ml_confidence, stats_confidence
         )
         
-        # 6. Combine predictions with weighted average
+        # 2. Combine predictions with weighted average
         ensemble_precip = (
             adjusted_weights["nasa"] * nasa_precip +
             adjusted_weights["ml"] * ml_precip +
             adjusted_weights["stats"] * stats_precip
         )
         
-        # 7. Calculate ensemble probability
+        # 3. Calculate ensemble probability
         ensemble_prob = self._calculate_ensemble_probability(
             nasa_prob,
             ensemble_precip,
@@ -121,13 +618,13 @@ class EnsembleForecaster:
             stats_confidence
         )
         
-        # 8. Calculate confidence interval
+        # 4. Calculate confidence interval
         confidence_interval = self._calculate_confidence_interval(
             [nasa_precip, ml_precip, stats_precip],
             [adjusted_weights["nasa"], adjusted_weights["ml"], adjusted_weights["stats"]]
         )
         
-        # 9. Generate intelligent summary
+        # 5. Generate intelligent summary
         summary = self._generate_ensemble_summary(
             ensemble_prob,
             ensemble_precip,
@@ -135,7 +632,7 @@ class EnsembleForecaster:
             stats_result
         )
         
-        # 10. Prepare metadata
+        # 6. Prepare metadata
         ensemble_metadata = {
             "ensemble_type": "weighted_average",
             "nasa_power": {
@@ -181,106 +678,6 @@ class EnsembleForecaster:
             # Note: This requires adding ensemble_metadata field to ForecastResponse model
         )
     
-    async def _get_historical_average(
-        self, location: Location, target_date: date
-    ) -> float:
-        """
-        Get historical average precipitation for this location/date.
-        
-        Queries same day from last 3 years and calculates average.
-        """
-        try:
-            historical_values = []
-            for year_offset in range(1, 4):
-                try:
-                    historical_date = target_date.replace(
-                        year=target_date.year - year_offset
-                    )
-                    forecast = await self.nasa_client.precipitation_forecast(
-                        location, historical_date
-                    )
-                    historical_values.append(forecast.precipitation_intensity_mm)
-                except (ValueError, Exception):
-                    continue
-            
-            if historical_values:
-                return float(np.mean(historical_values))
-            return 0.0
-            
-        except Exception as e:
-            logger.warning(f"Could not get historical average: {e}")
-            return 0.0
-    
-    async def _calculate_statistical_estimate(
-        self, location: Location, target_date: date, historical_avg: float
-    ) -> dict[str, Any]:
-        """
-        Calculate statistical estimate using historical patterns and trends.
-        
-        Uses linear regression on historical data to detect trends.
-        """
-        try:
-            # Get last 5 years of data for trend analysis
-            historical_data = []
-            dates = []
-            
-            for year_offset in range(1, 6):
-                try:
-                    historical_date = target_date.replace(
-                        year=target_date.year - year_offset
-                    )
-                    forecast = await self.nasa_client.precipitation_forecast(
-                        location, historical_date
-                    )
-                    historical_data.append(forecast.precipitation_intensity_mm)
-                    dates.append(historical_date)
-                except (ValueError, Exception):
-                    continue
-            
-            if len(historical_data) < 2:
-                return {
-                    "estimated_mm": historical_avg,
-                    "confidence": 0.5,
-                    "trend": "insufficient_data"
-                }
-            
-            # Linear regression to detect trend
-            x = np.arange(len(historical_data))
-            y = np.array(historical_data)
-            
-            slope, intercept, r_value, p_value, std_err = stats.linregress(x, y)
-            
-            # Predict for "next year" (year 0)
-            trend_prediction = intercept
-            
-            # Determine trend
-            if abs(slope) < 0.1:
-                trend = "stable"
-            elif slope > 0:
-                trend = "increasing"
-            else:
-                trend = "decreasing"
-            
-            # Confidence based on R² and sample size
-            r_squared = r_value ** 2
-            confidence = min(0.9, max(0.3, r_squared * (len(historical_data) / 5)))
-            
-            return {
-                "estimated_mm": max(0.0, trend_prediction),
-                "confidence": confidence,
-                "trend": trend,
-                "slope": slope,
-                "r_squared": r_squared
-            }
-            
-        except Exception as e:
-            logger.warning(f"Statistical estimation failed: {e}")
-            return {
-                "estimated_mm": historical_avg,
-                "confidence": 0.4,
-                "trend": "error"
-            }
-    
     def _adjust_weights(
         self, ml_confidence: float, stats_confidence: float
     ) -> dict[str, float]:
@@ -452,13 +849,9 @@ class EnsembleForecaster:
         return base
 
 
-# Singleton instance
-_ensemble_forecaster: EnsembleForecaster | None = None
-
-
-def get_ensemble_forecaster() -> EnsembleForecaster:
-    """Get or create ensemble forecaster singleton."""
-    global _ensemble_forecaster
-    if _ensemble_forecaster is None:
-        _ensemble_forecaster = EnsembleForecaster()
-    return _ensemble_forecaster
+def _shift_year(target_date: date, years_back: int) -> date | None:
+    """Same calendar day `years_back` years earlier (None for Feb 29 misses)."""
+    try:
+        return target_date.replace(year=target_date.year - years_back)
+    except ValueError:
+        return None
@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-from typing import Any
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator
 
 import httpx
 
+from app.core.config import get_settings
+from app.core.metrics import upstream_event_hooks
 from app.models.forecast import Location
 
 
@@ -12,14 +15,36 @@ class GeocodingError(RuntimeError):
 
 
 class Geocoder:
-    def __init__(self, user_agent: str = "is-it-rain-app") -> None:
+    def __init__(
+        self,
+        user_agent: str = "is-it-rain-app",
+        base_url: str | None = None,
+        http_client: httpx.AsyncClient | None = None,
+    ) -> None:
         self._headers = {"User-Agent": user_agent}
+        self.base_url = base_url or get_settings().nominatim_url
+        self._http = http_client
+
+    @staticmethod
+    def http_client_kwargs() -> dict[str, Any]:
+        """Arguments for an httpx.AsyncClient suited to Nominatim calls."""
+        return {"timeout": 10, "event_hooks": upstream_event_hooks()}
+
+    @asynccontextmanager
+    async def _client(self) -> AsyncIterator[httpx.AsyncClient]:
+        """The shared client if one was given, else a client for this call only."""
+        if self._http is not None:
+            yield self._http
+        else:
+            async with httpx.AsyncClient(**self.http_client_kwargs()) as client:
+                yield client
 
     async def geocode(self, query: str) -> Location:
-        async with httpx.AsyncClient(timeout=10, headers=self._headers) as client:
+        async with self._client() as client:
             response = await client.get(
-                "https://nominatim.openstreetmap.org/search",
+                f"{self.base_url}/search",
                 params={"format": "json", "limit": 1, "q": query},
+                headers=self._headers,
             )
             response.raise_for_status()
             results: list[dict[str, Any]] = response.json()
@@ -33,18 +58,22 @@ class Geocoder:
             )
 
 
+    async def reverse(self, latitude: float, longitude: float) -> str | None:
+        async with self._client() as client:
+            response = await client.get(
+                f"{self.base_url}/reverse",
+                params={
+                    "format": "json",
+                    "lat": latitude,
+                    "lon": longitude,
+                    "zoom": 14,
+                },
+                headers=self._headers,
+            )
+            response.raise_for_status()
+            data: dict[str, Any] = response.json()
+            return data.get("display_name")
+
+
 async def reverse_geocode(latitude: float, longitude: float) -> str | None:
-    async with httpx.AsyncClient(timeout=10) as client:
-        response = await client.get(
-            "https://nominatim.openstreetmap.org/reverse",
-            params={
-                "format": "json",
-                "lat": latitude,
-                "lon": longitude,
-                "zoom": 14,
-            },
-            headers={"User-Agent": "is-it-rain-app"},
-        )
-        response.raise_for_status()
-        data: dict[str, Any] = response.json()
-        return data.get("display_name")
+    return await Geocoder().reverse(latitude, longitude)
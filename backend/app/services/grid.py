@@ -0,0 +1,82 @@
+"""
+NASA POWER grid helpers.
+
+POWER precipitation (PRECTOTCORR) comes from MERRA-2, which is published on a
+0.5° latitude x 0.625° longitude grid. Every point inside a cell returns the
+same daily series, so requests can be snapped to the cell centre and shared.
+"""
+
+from __future__ import annotations
+
+import math
+from typing import Iterator, NamedTuple
+
+GRID_LAT_STEP = 0.5
+GRID_LON_STEP = 0.625
+
+
+class GridCell(NamedTuple):
+    """Centre of a POWER grid cell."""
+
+    latitude: float
+    longitude: float
+
+    @property
+    def key(self) -> str:
+        return f"{self.latitude:.3f},{self.longitude:.3f}"
+
+
+def snap_to_grid(
+    latitude: float,
+    longitude: float,
+    lat_step: float = GRID_LAT_STEP,
+    lon_step: float = GRID_LON_STEP,
+) -> GridCell:
+    """Return the grid cell containing the given coordinates."""
+    lat = round(latitude / lat_step) * lat_step
+    lon = round(longitude / lon_step) * lon_step
+    lat = min(max(lat, -90.0), 90.0)
+    if lon >= 180.0:
+        lon -= 360.0
+    return GridCell(round(lat, 6), round(lon, 6))
+
+
+def iter_lattice(
+    lat_min: float = -60.0,
+    lat_max: float = 70.0,
+    lon_min: float = -180.0,
+    lon_max: float = 180.0,
+    lat_step: float = GRID_LAT_STEP,
+    lon_step: float = GRID_LON_STEP,
+) -> Iterator[GridCell]:
+    """
+    Iterate over grid cell centres inside a bounding box.
+
+    The default box skips the polar caps, where POWER precipitation is sparse.
+    Cells are yielded row by row without materialising the lattice.
+    """
+    first_row = math.ceil(lat_min / lat_step)
+    last_row = math.floor(lat_max / lat_step)
+    first_col = math.ceil(lon_min / lon_step)
+    last_col = math.floor(lon_max / lon_step)
+    for row in range(first_row, last_row + 1):
+        for col in range(first_col, last_col + 1):
+            lon = col * lon_step
+            if lon >= 180.0:
+                continue
+            yield GridCell(round(row * lat_step, 6), round(lon, 6))
+
+
+def lattice_shape(
+    lat_min: float = -60.0,
+    lat_max: float = 70.0,
+    lon_min: float = -180.0,
+    lon_max: float = 180.0,
+    lat_step: float = GRID_LAT_STEP,
+    lon_step: float = GRID_LON_STEP,
+) -> tuple[int, int]:
+    """(rows, columns) of the lattice :func:`iter_lattice` yields for the same bounds."""
+    rows = math.floor(lat_max / lat_step) - math.ceil(lat_min / lat_step) + 1
+    first_col = math.ceil(lon_min / lon_step)
+    last_col = min(math.floor(lon_max / lon_step), math.ceil(180.0 / lon_step) - 1)
+    return max(rows, 0), max(last_col - first_col + 1, 0)
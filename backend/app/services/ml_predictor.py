@@ -1,51 +1,94 @@
 """
 Machine Learning Predictor for Precipitation Forecasting
 
-Uses sklearn RandomForestRegressor trained on historical NASA POWER data
-to predict precipitation probability and intensity.
+Uses a sklearn regressor trained on historical NASA POWER data to predict
+precipitation probability and intensity. The regressor is pluggable (see
+app.services.model_backends): RandomForestRegressor (default) or
+HistGradientBoostingRegressor with quantile loss for the uncertainty.
 
 Target Accuracy: 70-75% for historical patterns
-Model: Random Forest with 100 estimators
+Model: Random Forest with 100 estimators (default backend)
 Features: latitude, longitude, day_of_year, month, season, historical_avg
+
+joblib and sklearn are imported when the model is loaded, so importing this
+module (and the API) stays fast; see MLPredictor.ensure_loaded.
 """
 
 from __future__ import annotations
 
+import hashlib
 import os
+import threading
 from datetime import date, datetime
 from pathlib import Path
 from typing import Any
 
-import joblib
 import numpy as np
 from loguru import logger
-from sklearn.ensemble import RandomForestRegressor
 
+from app.core.config import get_settings
 from app.models.forecast import Location
+from app.services.model_backends import (
+    backend_of,
+    model_filename,
+    predict_with_spread,
+    scaler_filename,
+)
 
 
 class MLPredictor:
     """Machine Learning predictor for precipitation forecasting."""
     
-    MODEL_PATH = Path("data/ml_models/precipitation_model.joblib")
-    SCALER_PATH = Path("data/ml_models/feature_scaler.joblib")
+    MODEL_DIR = Path("data/ml_models")
+    MODEL_PATH = MODEL_DIR / "precipitation_model.joblib"
+    SCALER_PATH = MODEL_DIR / "feature_scaler.joblib"
     
-    def __init__(self, model_path: Path | None = None):
+    def __init__(
+        self, model_path: Path | None = None, backend: str | None = None, load: bool = True
+    ):
         """
         Initialize ML predictor.
         
         Args:
             model_path: Optional custom path to model file
+            backend: Model backend (defaults to the ML_BACKEND setting)
+            load: Load the model now; otherwise it is loaded on first use
         """
-        self.model_path = model_path or self.MODEL_PATH
-        self.scaler_path = self.SCALER_PATH
-        self.model: RandomForestRegressor | None = None
+        self.backend = backend or get_settings().ml_backend
+        self.model_path = model_path or self.MODEL_DIR / model_filename(self.backend)
+        # Re-derived from the model's own backend on load and save
+        self.scaler_path = self.model_path.parent / scaler_filename(self.backend)
+        self.model: Any | None = None
         self.scaler: Any | None = None
         self.is_trained = False
+        # Bumped on every (re)load so cached results can be invalidated
+        self.model_version = 0
+        # Content hash of the model files; identifies the model across
+        # restarts and hosts (used in HTTP ETags)
+        self.model_hash: str | None = None
+        self._load_lock = threading.Lock()
+        self._load_attempted = False
         
-        # Try to load existing model
-        if self.model_path.exists():
-            self.load_model()
+        if load:
+            self.ensure_loaded()
+    
+    def ensure_loaded(self) -> bool:
+        """
+        Load the model from disk unless that has already been tried.
+        
+        Thread-safe, so a background warm-up and the first prediction can
+        race; later calls return immediately.
+        
+        Returns:
+            True if a trained model is available
+        """
+        if not self._load_attempted:
+            with self._load_lock:
+                if not self._load_attempted:
+                    if self.model_path.exists():
+                        self.load_model()
+                    self._load_attempted = True
+        return self.is_trained
     
     def load_model(self) -> bool:
         """
@@ -55,11 +98,27 @@ class MLPredictor:
             True if model loaded successfully, False otherwise
         """
         try:
-            self.model = joblib.load(self.model_path)
-            if self.scaler_path.exists():
-                self.scaler = joblib.load(self.scaler_path)
+            import joblib
+
+            model = joblib.load(self.model_path)
+            backend = backend_of(model)
+            if backend != self.backend:
+                logger.warning(
+                    f"⚠️  {self.model_path} holds a {backend} model, not {self.backend}; "
+                    f"serving it with the {backend} scaler"
+                )
+            # The scaler belongs to the model actually loaded, not to the
+            # configured backend
+            scaler_path = self.model_path.parent / scaler_filename(backend)
+            scaler = joblib.load(scaler_path) if scaler_path.exists() else None
+            self._check_scaler(model, backend, scaler, scaler_path)
+            self.model, self.scaler = model, scaler
+            self.backend, self.scaler_path = backend, scaler_path
+            self.model_hash = self._artifact_hash()
             self.is_trained = True
-            logger.info(f"✅ ML model loaded from {self.model_path}")
+            self._load_attempted = True
+            self.model_version += 1
+            logger.info(f"✅ ML model ({self.backend}) loaded from {self.model_path}")
             return True
         except Exception as e:
             logger.warning(f"⚠️  Could not load ML model: {e}")
@@ -71,16 +130,52 @@ class MLPredictor:
         if self.model is None:
             raise ValueError("No model to save. Train model first.")
         
+        import joblib
+        
         # Create directory if it doesn't exist
         self.model_path.parent.mkdir(parents=True, exist_ok=True)
         
-        # Save model and scaler
+        # Save model and scaler; the scaler is named after and tagged with
+        # the model's backend so load_model can pair them
+        self.backend = backend_of(self.model)
+        self.scaler_path = self.model_path.parent / scaler_filename(self.backend)
         joblib.dump(self.model, self.model_path)
         if self.scaler:
+            self.scaler.model_backend = self.backend
             joblib.dump(self.scaler, self.scaler_path)
+        self.model_hash = self._artifact_hash()
         
         logger.info(f"💾 ML model saved to {self.model_path}")
     
+    @staticmethod
+    def _check_scaler(model: Any, backend: str, scaler: Any | None, scaler_path: Path) -> None:
+        """Raise if a scaler was saved for another model than the one loaded."""
+        if scaler is None:
+            logger.warning(f"⚠️  No feature scaler at {scaler_path}; features will not be scaled")
+            return
+        scaler_backend = getattr(scaler, "model_backend", backend)
+        if scaler_backend != backend:
+            raise ValueError(
+                f"Feature scaler {scaler_path} was saved for a {scaler_backend} model, "
+                f"but the model is {backend}"
+            )
+        expected = getattr(model, "n_features_in_", None)
+        actual = getattr(scaler, "n_features_in_", None)
+        if expected is not None and actual is not None and expected != actual:
+            raise ValueError(
+                f"Feature scaler {scaler_path} expects {actual} features, the model {expected}"
+            )
+    
+    def _artifact_hash(self) -> str:
+        """sha256 (first 16 hex digits) over the model and scaler files."""
+        digest = hashlib.sha256()
+        for path in (self.model_path, self.scaler_path):
+            if path.exists():
+                with open(path, "rb") as handle:
+                    for chunk in iter(lambda: handle.read(1 << 20), b""):
+                        digest.update(chunk)
+        return digest.hexdigest()[:16]
+    
     def extract_features(
         self, 
         location: Location, 
@@ -142,7 +237,46 @@ class MLPredictor:
         ]).reshape(1, -1)
         
         return features
-    
+
+    @staticmethod
+    def extract_features_batch(
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        day_of_year: np.ndarray,
+        month: np.ndarray,
+        dtype: Any = np.float64,
+    ) -> np.ndarray:
+        """
+        Vectorized version of :meth:`extract_features` for many rows.
+
+        Args:
+            latitudes: Latitude per row
+            longitudes: Longitude per row
+            day_of_year: Day of year (1-366) per row
+            month: Month (1-12) per row
+            dtype: Output dtype (float32 halves memory for large training chunks)
+
+        Returns:
+            Feature array of shape (n_rows, n_features), column order
+            identical to :meth:`extract_features`
+        """
+        latitudes = np.asarray(latitudes, dtype=np.float64)
+        day_of_year = np.asarray(day_of_year, dtype=np.float64)
+        month = np.asarray(month)
+        angle = 2 * np.pi * day_of_year / 365.25
+
+        features = np.empty((len(latitudes), 9), dtype=dtype)
+        features[:, 0] = latitudes
+        features[:, 1] = (np.asarray(longitudes, dtype=np.float64) + 180) / 360.0
+        features[:, 2] = day_of_year
+        features[:, 3] = month
+        features[:, 4] = (month % 12) // 3
+        features[:, 5] = np.abs(latitudes)
+        features[:, 6] = np.abs(latitudes) < 23.5
+        features[:, 7] = np.sin(angle)
+        features[:, 8] = np.cos(angle)
+        return features
+
     def predict(
         self,
         location: Location,
@@ -163,6 +297,7 @@ class MLPredictor:
             - confidence: Model confidence (0-1)
             - feature_importance: Dictionary of feature contributions
         """
+        self.ensure_loaded()
         if not self.is_trained or self.model is None:
             logger.warning("⚠️  ML model not trained. Using fallback.")
             return {
@@ -180,22 +315,17 @@ class MLPredictor:
             if self.scaler:
                 features = self.scaler.transform(features)
             
-            # Predict
-            prediction = self.model.predict(features)[0]
-            prediction = max(0.0, prediction)  # No negative precipitation
+            # Predict with the backend's uncertainty estimate (tree spread
+            # for random forests, quantile interval for gradient boosting)
+            predictions, spreads = predict_with_spread(self.model, features)
+            prediction = max(0.0, float(predictions[0]))  # No negative precipitation
+            std_dev = float(spreads[0])
             
-            # Estimate confidence based on feature values and model uncertainty
-            # Use standard deviation from ensemble trees
-            if hasattr(self.model, 'estimators_'):
-                tree_predictions = np.array([
-                    tree.predict(features)[0] 
-                    for tree in self.model.estimators_
-                ])
-                std_dev = np.std(tree_predictions)
+            if np.isnan(std_dev):
+                confidence = 0.7  # Default confidence
+            else:
                 # Lower std dev = higher confidence
                 confidence = max(0.3, min(0.95, 1.0 - (std_dev / (prediction + 1))))
-            else:
-                confidence = 0.7  # Default confidence
             
             # Feature importance (if available)
             feature_names = [
@@ -230,6 +360,77 @@ class MLPredictor:
                 "model_available": False
             }
     
+    def predict_batch(
+        self,
+        latitudes: np.ndarray,
+        longitudes: np.ndarray,
+        target_dates: list[date],
+        historical_avgs: np.ndarray | None = None,
+    ) -> list[dict[str, Any]]:
+        """
+        Predict precipitation for many rows with one model invocation.
+
+        Args:
+            latitudes: Latitude per row
+            longitudes: Longitude per row
+            target_dates: Date per row
+            historical_avgs: Fallback value per row when no model is loaded
+
+        Returns:
+            One result per row, with the same keys as :meth:`predict`
+            (feature importance is omitted)
+        """
+        n_rows = len(target_dates)
+        if historical_avgs is None:
+            historical_avgs = np.zeros(n_rows)
+
+        self.ensure_loaded()
+        fallback = [
+            {
+                "predicted_mm": float(avg),
+                "confidence": 0.3,
+                "feature_importance": {},
+                "model_available": False,
+            }
+            for avg in historical_avgs
+        ]
+        if not self.is_trained or self.model is None:
+            logger.warning("⚠️  ML model not trained. Using fallback.")
+            return fallback
+        if n_rows == 0:
+            return []
+
+        try:
+            features = self.extract_features_batch(
+                latitudes,
+                longitudes,
+                np.array([d.timetuple().tm_yday for d in target_dates]),
+                np.array([d.month for d in target_dates]),
+            )
+            if self.scaler:
+                features = self.scaler.transform(features)
+
+            predictions, spreads = predict_with_spread(self.model, features)
+            predictions = np.maximum(predictions, 0.0)
+            confidences = np.where(
+                np.isnan(spreads),
+                0.7,
+                np.clip(1.0 - np.nan_to_num(spreads) / (predictions + 1), 0.3, 0.95),
+            )
+        except Exception as e:
+            logger.error(f"❌ Batch ML prediction failed: {e}", exc_info=True)
+            return fallback
+
+        return [
+            {
+                "predicted_mm": float(prediction),
+                "confidence": float(confidence),
+                "feature_importance": {},
+                "model_available": True,
+            }
+            for prediction, confidence in zip(predictions, confidences)
+        ]
+
     def get_model_info(self) -> dict[str, Any]:
         """
         Get information about the loaded model.
@@ -237,6 +438,7 @@ class MLPredictor:
         Returns:
             Model metadata including version, features, performance metrics
         """
+        self.ensure_loaded()
         if not self.is_trained or self.model is None:
             return {
                 "model_available": False,
@@ -245,9 +447,12 @@ class MLPredictor:
         
         info = {
             "model_available": True,
-            "model_type": "RandomForestRegressor",
+            "model_type": type(self.model).__name__,
+            "backend": self.backend,
+            "model_version": self.model_version,
+            "model_hash": self.model_hash,
             "model_path": str(self.model_path),
-            "n_estimators": getattr(self.model, 'n_estimators', None),
+            "n_estimators": getattr(self.model, 'n_estimators', getattr(self.model, 'max_iter', None)),
             "max_depth": getattr(self.model, 'max_depth', None),
             "n_features": getattr(self.model, 'n_features_in_', None),
         }
@@ -266,8 +471,8 @@ _ml_predictor: MLPredictor | None = None
 
 
 def get_ml_predictor() -> MLPredictor:
-    """Get or create ML predictor singleton."""
+    """Get or create ML predictor singleton (the model loads on first use)."""
     global _ml_predictor
     if _ml_predictor is None:
-        _ml_predictor = MLPredictor()
+        _ml_predictor = MLPredictor(load=False)
     return _ml_predictor
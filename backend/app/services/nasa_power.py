@@ -1,32 +1,80 @@
 from __future__ import annotations
 
+from contextlib import asynccontextmanager
 from datetime import date, datetime, timezone
-from typing import Any
+from typing import Any, AsyncIterator
 
 import httpx
+import numpy as np
 from loguru import logger
 
-from app.core.cache import cache_key, get_cache
-from app.core.config import get_settings
+from app.core.cache import cache_key, get_cache, get_rendered_cache, get_series_cache
+from app.core.config import Settings, get_settings
+from app.core.metrics import record_cache_lookup, upstream_event_hooks
 from app.models.forecast import ForecastResponse, Location
-from app.services.geocoding import reverse_geocode
+from app.services.climatology import ClimatologyEntry, get_climatology
+from app.services.geocoding import Geocoder, reverse_geocode
 
 NASA_DATASET = "NASA POWER (GPM IMERG derived)"
+# POWER marks missing days with -999
+FILL_VALUE = -999.0
 
 
 class NasaPowerClient:
-    BASE_URL = "https://power.larc.nasa.gov/api/temporal/daily/point"
-
-    def __init__(self) -> None:
+    def __init__(
+        self, http_client: httpx.AsyncClient | None = None, geocoder: Geocoder | None = None
+    ) -> None:
+        """
+        Args:
+            http_client: Shared client for POWER calls; without one each
+                call opens (and closes) its own
+            geocoder: Geocoder used to name unnamed locations
+        """
         self._settings = get_settings()
+        self.base_url = self._settings.nasa_power_url
+        self._http = http_client
+        self._geocoder = geocoder
+
+    @staticmethod
+    def _forecast_key(location: Location, event_date: date) -> str:
+        # Use full precision coordinates for unique cache keys per location
+        return cache_key("nasa", str(location.latitude), str(location.longitude), event_date.isoformat())
+
+    @staticmethod
+    def _store(key: str, forecast: ForecastResponse) -> None:
+        """Cache a forecast; its JSON body is rendered when a route first serves it."""
+        get_cache()[key] = forecast
+        get_rendered_cache().pop(key, None)
+
+    def cached_response(
+        self, location: Location, event_date: date
+    ) -> tuple[ForecastResponse, bytes] | None:
+        """
+        Cached forecast and its pre-rendered JSON body, if the forecast is cached.
+        
+        The body is what FastAPI would produce for the forecast, so routes
+        can return it as-is and skip validation and encoding on hits. It is
+        rendered on the first hit, so forecasts only fetched internally
+        (e.g. the ensemble's prior years) never take space in the body cache.
+        """
+        key = self._forecast_key(location, event_date)
+        forecast = get_cache().get(key)
+        if forecast is None:
+            return None
+        record_cache_lookup("nasa", True)
+        rendered = get_rendered_cache()
+        body = rendered.get(key)
+        if body is None:
+            body = rendered[key] = forecast.model_dump_json().encode()
+        return forecast, body
 
     async def precipitation_forecast(self, location: Location, event_date: date) -> ForecastResponse:
         # Note: NASA POWER provides historical data, not forecasts
         # For future dates, we estimate based on historical averages
         cache = get_cache()
-        # Use full precision coordinates for unique cache keys per location
-        key = cache_key("nasa", str(location.latitude), str(location.longitude), event_date.isoformat())
+        key = self._forecast_key(location, event_date)
         cached = cache.get(key)
+        record_cache_lookup("nasa", bool(cached))
         if cached:
             logger.info(f"Returning cached forecast for {location.name} on {event_date}")
             return cached
@@ -37,6 +85,16 @@ class NasaPowerClient:
         from datetime import datetime
         today = datetime.now().date()
         if event_date > today:
+            # Serve from the precomputed climatology when it covers this cell
+            climatology = get_climatology()
+            entry = (
+                climatology.lookup(location.latitude, location.longitude, event_date)
+                if climatology else None
+            )
+            if entry is not None:
+                forecast = self._climatology_forecast(location, event_date, entry)
+                self._store(key, forecast)
+                return forecast
             logger.warning(f"Requested future date {event_date}, will use historical average")
             # For future dates, use the same day from previous year as a proxy
             proxy_date = event_date.replace(year=event_date.year - 1)
@@ -51,17 +109,8 @@ class NasaPowerClient:
             "end": event_date.strftime("%Y%m%d"),
             "format": "JSON",
         }
-        proxies: dict[str, str] = {}
-        if self._settings.http_proxy:
-            proxies["http://"] = self._settings.http_proxy
-        if self._settings.https_proxy:
-            proxies["https://"] = self._settings.https_proxy
-        client_kwargs: dict[str, Any] = {"timeout": self._settings.nasa_timeout}
-        if proxies:
-            client_kwargs["proxies"] = proxies
-
-        async with httpx.AsyncClient(**client_kwargs) as client:
-            response = await client.get(self.BASE_URL, params=params)
+        async with self._client() as client:
+            response = await client.get(self.base_url, params=params)
             response.raise_for_status()
             payload: dict[str, Any] = response.json()
 
@@ -74,7 +123,7 @@ class NasaPowerClient:
             raise
 
         probability = self._precipitation_probability(mm_value)
-        location_name = location.name or await reverse_geocode(location.latitude, location.longitude)
+        location_name = location.name or await self._reverse_geocode(location)
 
         forecast = ForecastResponse(
             location=Location(latitude=location.latitude, longitude=location.longitude, name=location_name),
@@ -85,9 +134,86 @@ class NasaPowerClient:
             nasa_dataset=NASA_DATASET,
             issued_at=datetime.now(timezone.utc),
         )
-        cache[key] = forecast
+        self._store(key, forecast)
         return forecast
 
+    async def daily_series(self, location: Location, start: date, end: date) -> np.ndarray:
+        """
+        Fetch daily precipitation for a date range in a single upstream call.
+
+        Returns a float array with one value per day from ``start`` to ``end``
+        inclusive. Days POWER has no data for (fill value or not yet
+        published) are NaN.
+        """
+        cache = get_series_cache()
+        key = cache_key(
+            "nasa_series", str(location.latitude), str(location.longitude),
+            start.isoformat(), end.isoformat(),
+        )
+        cached = cache.get(key)
+        record_cache_lookup("nasa_series", cached is not None)
+        if cached is not None:
+            return cached
+
+        params = {
+            "parameters": "PRECTOTCORR",
+            "community": "RE",
+            "longitude": location.longitude,
+            "latitude": location.latitude,
+            "start": start.strftime("%Y%m%d"),
+            "end": end.strftime("%Y%m%d"),
+            "format": "JSON",
+        }
+        async with self._client() as client:
+            response = await client.get(self.base_url, params=params)
+            response.raise_for_status()
+            payload: dict[str, Any] = response.json()
+
+        try:
+            daily_data: dict[str, float] = payload["properties"]["parameter"]["PRECTOTCORR"]
+        except KeyError as exc:  # pragma: no cover - depends on upstream API
+            logger.exception("NASA POWER response missing precipitation data", exc_info=exc)
+            raise
+
+        series = np.full((end - start).days + 1, np.nan)
+        for day, value in daily_data.items():
+            offset = (datetime.strptime(day, "%Y%m%d").date() - start).days
+            if 0 <= offset < len(series) and value is not None and float(value) > FILL_VALUE:
+                series[offset] = max(float(value), 0.0)
+
+        cache[key] = series
+        return series
+
+    @staticmethod
+    def http_client_kwargs(settings: Settings) -> dict[str, Any]:
+        """Arguments for an httpx.AsyncClient suited to POWER calls."""
+        proxies: dict[str, str] = {}
+        if settings.http_proxy:
+            proxies["http://"] = settings.http_proxy
+        if settings.https_proxy:
+            proxies["https://"] = settings.https_proxy
+        client_kwargs: dict[str, Any] = {
+            "timeout": settings.nasa_timeout,
+            "event_hooks": upstream_event_hooks(),
+        }
+        if proxies:
+            client_kwargs["proxies"] = proxies
+        return client_kwargs
+
+    @asynccontextmanager
+    async def _client(self) -> AsyncIterator[httpx.AsyncClient]:
+        """The shared client if one was given, else a client for this call only."""
+        if self._http is not None:
+            yield self._http
+        else:
+            async with httpx.AsyncClient(**self.http_client_kwargs(self._settings)) as client:
+                yield client
+
+    async def _reverse_geocode(self, location: Location) -> str | None:
+        if self._geocoder is not None:
+            return await self._geocoder.reverse(location.latitude, location.longitude)
+        return await reverse_geocode(location.latitude, location.longitude)
+
     @staticmethod
     def _precipitation_probability(mm_value: float) -> float:
         if mm_value <= 0.2:
@@ -100,6 +226,22 @@ class NasaPowerClient:
             return 0.8
         return 0.95
 
+    def _climatology_forecast(
+        self, location: Location, event_date: date, entry: ClimatologyEntry
+    ) -> ForecastResponse:
+        """Forecast from the climatology table; no network I/O."""
+        probability = round(min(max(entry.wet_day_frequency, 0.0), 1.0), 3)
+        mm_value = round(max(entry.mean_mm, 0.0), 2)
+        return ForecastResponse(
+            location=location,
+            event_date=event_date,
+            precipitation_probability=probability,
+            precipitation_intensity_mm=mm_value,
+            summary=self._summarize(probability, mm_value) + f" (Based on {entry.years}-year climatology)",
+            nasa_dataset=NASA_DATASET + " (Climatology)",
+            issued_at=datetime.now(timezone.utc),
+        )
+
     async def _fetch_historical_proxy(
         self, location: Location, event_date: date, proxy_date: date
     ) -> ForecastResponse:
@@ -113,17 +255,8 @@ class NasaPowerClient:
             "end": proxy_date.strftime("%Y%m%d"),
             "format": "JSON",
         }
-        proxies: dict[str, str] = {}
-        if self._settings.http_proxy:
-            proxies["http://"] = self._settings.http_proxy
-        if self._settings.https_proxy:
-            proxies["https://"] = self._settings.https_proxy
-        client_kwargs: dict[str, Any] = {"timeout": self._settings.nasa_timeout}
-        if proxies:
-            client_kwargs["proxies"] = proxies
-
-        async with httpx.AsyncClient(**client_kwargs) as client:
-            response = await client.get(self.BASE_URL, params=params)
+        async with self._client() as client:
+            response = await client.get(self.base_url, params=params)
             response.raise_for_status()
             payload: dict[str, Any] = response.json()
 
@@ -136,7 +269,7 @@ class NasaPowerClient:
             raise
 
         probability = self._precipitation_probability(mm_value)
-        location_name = location.name or await reverse_geocode(location.latitude, location.longitude)
+        location_name = location.name or await self._reverse_geocode(location)
 
         forecast = ForecastResponse(
             location=Location(latitude=location.latitude, longitude=location.longitude, name=location_name),
@@ -148,10 +281,7 @@ class NasaPowerClient:
             issued_at=datetime.now(timezone.utc),
         )
         
-        cache = get_cache()
-        # Use full precision coordinates for cache key
-        key = cache_key("nasa", str(location.latitude), str(location.longitude), event_date.isoformat())
-        cache[key] = forecast
+        self._store(self._forecast_key(location, event_date), forecast)
         logger.info(f"Cached forecast for {location.name} on {event_date} (using {proxy_date.year} historical data)")
         return forecast
 
@@ -0,0 +1,61 @@
+"""
+Gradient boosting regressor with a quantile-based uncertainty estimate.
+
+Backs the ``hist_gradient_boosting`` model backend (see
+app.services.model_backends). Kept apart from the backend registry because
+defining it imports sklearn.
+"""
+
+from __future__ import annotations
+
+from typing import Any
+
+import numpy as np
+from sklearn.base import BaseEstimator, RegressorMixin
+from sklearn.ensemble import HistGradientBoostingRegressor
+
+
+class QuantileGradientBoosting(BaseEstimator, RegressorMixin):
+    """HistGradientBoosting point model with quantile models for uncertainty."""
+
+    def __init__(
+        self,
+        max_iter: int = 200,
+        max_depth: int | None = None,
+        learning_rate: float = 0.1,
+        min_samples_leaf: int = 20,
+        lower_quantile: float = 0.1,
+        upper_quantile: float = 0.9,
+        random_state: int | None = 42,
+    ) -> None:
+        self.max_iter = max_iter
+        self.max_depth = max_depth
+        self.learning_rate = learning_rate
+        self.min_samples_leaf = min_samples_leaf
+        self.lower_quantile = lower_quantile
+        self.upper_quantile = upper_quantile
+        self.random_state = random_state
+
+    def _regressor(self, **loss: Any) -> HistGradientBoostingRegressor:
+        return HistGradientBoostingRegressor(
+            max_iter=self.max_iter,
+            max_depth=self.max_depth,
+            learning_rate=self.learning_rate,
+            min_samples_leaf=self.min_samples_leaf,
+            random_state=self.random_state,
+            **loss,
+        )
+
+    def fit(self, X: np.ndarray, y: np.ndarray) -> QuantileGradientBoosting:
+        self.point_ = self._regressor(loss="squared_error").fit(X, y)
+        self.lower_ = self._regressor(loss="quantile", quantile=self.lower_quantile).fit(X, y)
+        self.upper_ = self._regressor(loss="quantile", quantile=self.upper_quantile).fit(X, y)
+        self.n_features_in_ = self.point_.n_features_in_
+        return self
+
+    def predict(self, X: np.ndarray) -> np.ndarray:
+        return self.point_.predict(X)
+
+    def predict_interval(self, X: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Lower and upper quantile predictions."""
+        return self.lower_.predict(X), self.upper_.predict(X)
@@ -0,0 +1,6 @@
+import os
+import tempfile
+
+# Keep tests away from the tracked data/forecasts.db; must run before the app
+# (and its cached settings) is imported
+os.environ.setdefault("DATABASE_PATH", os.path.join(tempfile.mkdtemp(), "forecasts.db"))
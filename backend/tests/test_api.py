@@ -4,13 +4,17 @@ from unittest.mock import AsyncMock
 import pytest
 from fastapi.testclient import TestClient
 
+from app.core.cache import get_rendered_cache
 from app.main import app
 from app.models.forecast import ForecastResponse, Location
+from app.services.nasa_power import NasaPowerClient
 
 
 @pytest.fixture
 def client():
-    return TestClient(app)
+    # Entering the client runs the lifespan, which builds app.state.services
+    with TestClient(app) as client:
+        yield client
 
 
 def test_health_endpoint(client):
@@ -52,3 +56,107 @@ def test_forecast_success(monkeypatch, client):
     body = response.json()
     assert body["summary"] == "Mock summary"
     assert body["location"]["name"] == "Mock City"
+
+
+def test_ensemble_batch_reports_per_item_errors(monkeypatch, client):
+    location = Location(latitude=40.0, longitude=-74.0, name="Mock City")
+    forecast = ForecastResponse(
+        location=location,
+        event_date=date(2025, 10, 4),
+        precipitation_probability=0.4,
+        precipitation_intensity_mm=1.2,
+        summary="Mock summary",
+        nasa_dataset="mock",
+        issued_at=datetime.now(timezone.utc),
+    )
+    batch = AsyncMock(return_value=[forecast, ValueError("no data")])
+    monkeypatch.setattr("app.api.routes.EnsembleForecaster.get_batch_ensemble_forecast", batch)
+
+    response = client.post(
+        "/api/forecast/ensemble/batch",
+        json={
+            "items": [
+                {"event_date": "2025-10-04", "location": {"latitude": 40.0, "longitude": -74.0}},
+                {"event_date": "2025-10-05"},
+                {"event_date": "2025-10-06", "location": {"latitude": 10.0, "longitude": 10.0}},
+            ]
+        },
+    )
+
+    assert response.status_code == 200
+    results = response.json()["results"]
+    assert [r["index"] for r in results] == [0, 1, 2]
+    assert results[0]["forecast"]["summary"] == "Mock summary"
+    assert "location" in results[1]["error"]
+    assert results[2]["error"] == "no data"
+
+
+def test_forecast_request_resolves_event_window():
+    from app.models.forecast import ForecastRequest
+
+    request = ForecastRequest(event_start="2025-07-01", event_end="2025-07-03", query="Austin")
+
+    assert request.event_date == date(2025, 7, 1)
+    assert request.is_multi_day
+    assert not ForecastRequest(event_date="2025-07-01", query="Austin").is_multi_day
+
+
+def test_ensemble_rejects_inverted_event_window(client):
+    response = client.post(
+        "/api/forecast/ensemble",
+        json={"event_start": "2025-07-03", "event_end": "2025-07-01", "query": "Austin"},
+    )
+    assert response.status_code == 422
+
+
+def test_forecast_get_supports_conditional_requests(monkeypatch, client):
+    location = Location(latitude=40.0, longitude=-74.0, name="Mock City")
+    nasa = AsyncMock(
+        return_value=ForecastResponse(
+            location=location,
+            event_date=date(2020, 10, 4),
+            precipitation_probability=0.8,
+            precipitation_intensity_mm=4.2,
+            summary="Mock summary",
+            nasa_dataset="mock",
+            issued_at=datetime.now(timezone.utc),
+        )
+    )
+    monkeypatch.setattr("app.api.routes.NasaPowerClient.precipitation_forecast", nasa)
+    params = {"latitude": 40.0, "longitude": -74.0, "event_date": "2020-10-04", "name": "Mock City"}
+
+    first = client.get("/api/forecast", params=params)
+    assert first.status_code == 200
+    assert first.json()["summary"] == "Mock summary"
+    assert first.headers["cache-control"].endswith("immutable")
+
+    repeat = client.get("/api/forecast", params=params, headers={"If-None-Match": first.headers["etag"]})
+    assert repeat.status_code == 304
+    assert repeat.headers["etag"] == first.headers["etag"]
+    assert nasa.await_count == 1
+
+
+def test_cached_forecast_is_served_pre_rendered(client):
+    location = Location(latitude=12.3456, longitude=65.4321, name="Cached City")
+    forecast = ForecastResponse(
+        location=location,
+        event_date=date(2021, 3, 1),
+        precipitation_probability=0.35,
+        precipitation_intensity_mm=0.8,
+        summary="Light rain possible",
+        nasa_dataset="mock",
+        issued_at=datetime(2021, 2, 28, 12, 0, tzinfo=timezone.utc),
+    )
+    key = NasaPowerClient._forecast_key(location, forecast.event_date)
+    payload = {"location": location.model_dump(), "event_date": "2021-03-01"}
+
+    NasaPowerClient._store(key, forecast)
+    assert key not in get_rendered_cache()
+    first = client.post("/api/forecast", json=payload)
+    rendered = client.post("/api/forecast", json=payload)
+
+    assert rendered.status_code == 200
+    assert rendered.headers["content-type"] == "application/json"
+    assert rendered.content == first.content == get_rendered_cache()[key]
+    # Same document FastAPI would encode through response_model
+    assert rendered.json() == forecast.model_dump(mode="json")
@@ -0,0 +1,71 @@
+from datetime import datetime, timezone
+
+import numpy as np
+import pytest
+
+from app.core.archive import compact_forecasts, iter_archives
+from app.core.database import ForecastDatabase
+from tests.test_database import make_forecast
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = ForecastDatabase(str(tmp_path / "forecasts.db"))
+    yield database
+    database.close()
+
+
+def test_compaction_archives_cold_months_and_keeps_stats(db, tmp_path):
+    db.save_forecasts([make_forecast(mm=float(i)) for i in range(5)])
+    db.save_forecast(make_forecast(latitude=10.0, longitude=10.0, mm=9.0))
+    with db.connection() as conn, conn:
+        conn.execute("UPDATE forecasts SET created_at = '2025-01-15 12:00:00' WHERE id <= 3")
+        conn.execute("UPDATE forecasts SET created_at = '2025-02-03 08:00:00' WHERE id = 4")
+        conn.execute("UPDATE forecasts SET created_at = '2025-06-01 00:00:00' WHERE id >= 5")
+    before = db.get_statistics()
+
+    results = compact_forecasts(
+        db, tmp_path / "archive", retention_days=30,
+        now=datetime(2025, 6, 10, tzinfo=timezone.utc),
+    )
+
+    assert [(r["month"], r["rows"]) for r in results] == [("2025-01", 3), ("2025-02", 1)]
+    with db.connection() as conn:
+        assert conn.execute("SELECT COUNT(*) FROM forecasts").fetchone()[0] == 2
+        assert conn.execute("SELECT COUNT(*) FROM forecast_rtree").fetchone()[0] == 2
+    assert db.get_statistics() == before
+    assert db.rebuild_statistics() == before
+
+    archived = dict(iter_archives(db))
+    np.testing.assert_array_equal(archived["2025-01"]["precipitation_intensity_mm"], [0.0, 1.0, 2.0])
+    assert archived["2025-02"]["created_at"][0] == "2025-02-03 08:00:00"
+
+
+def test_months_compact_in_pages_and_append_parts(db, tmp_path):
+    archive = tmp_path / "archive"
+    db.save_forecasts([make_forecast(mm=float(i)) for i in range(5)])
+    with db.connection() as conn, conn:
+        conn.execute("UPDATE forecasts SET created_at = '2025-01-15 12:00:00'")
+    now = datetime(2025, 6, 10, tzinfo=timezone.utc)
+
+    [result] = compact_forecasts(db, archive, retention_days=30, now=now, page_rows=2)
+    assert result["rows"] == 5
+    first = archive / "forecasts-2025-01.npz"
+    written = first.stat().st_mtime_ns
+
+    db.save_forecast(make_forecast(mm=5.0))
+    with db.connection() as conn, conn:
+        conn.execute("UPDATE forecasts SET created_at = '2025-01-20 00:00:00'")
+    compact_forecasts(db, archive, retention_days=30, now=now, page_rows=2)
+
+    # Three pages, then one more part; existing parts are not rewritten
+    assert sorted(p.name for p in archive.iterdir()) == [
+        "forecasts-2025-01.1.npz", "forecasts-2025-01.2.npz",
+        "forecasts-2025-01.3.npz", "forecasts-2025-01.npz",
+    ]
+    assert first.stat().st_mtime_ns == written
+    archived = dict(iter_archives(db))
+    np.testing.assert_array_equal(
+        archived["2025-01"]["precipitation_intensity_mm"], [0.0, 1.0, 2.0, 3.0, 4.0, 5.0]
+    )
+    assert db.archived_through() == "2025-01"
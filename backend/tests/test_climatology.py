@@ -0,0 +1,108 @@
+import asyncio
+from datetime import date, timedelta
+from pathlib import Path
+
+import numpy as np
+import pytest
+
+from app.models.forecast import Location
+from app.scripts.build_climatology import build_climatology
+from app.services.climatology import META_FILE, Climatology, calendar_index, daily_climatology
+from app.services.nasa_power import NasaPowerClient
+
+
+def test_daily_climatology_pools_neighbouring_days():
+    values = np.zeros((2, 366))
+    values[:, 100] = 10.0
+
+    table = daily_climatology(values, window_days=1)
+
+    # Days 99-101 see the wet day in their ±1 window (2 of 6 samples)
+    assert table[100, 0] == pytest.approx(10.0 / 3)
+    assert table[99, 1] == pytest.approx(1 / 3)
+    assert table[98, 1] == 0.0
+
+
+@pytest.mark.asyncio
+async def test_built_table_serves_future_dates_offline(monkeypatch, tmp_path):
+    async def fake_series(self, location, start, end):
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        return np.array([4.0 if d.month == 7 else 0.0 for d in days])
+
+    monkeypatch.setattr("app.services.nasa_power.NasaPowerClient.daily_series", fake_series)
+    await build_climatology(tmp_path, bounds=(40.0, 41.0, -75.0, -73.0), years=3, window_days=3)
+
+    climatology = Climatology.load(tmp_path)
+    july = climatology.lookup(40.7, -74.0, date(2031, 7, 15))
+    assert july.mean_mm == pytest.approx(4.0)
+    assert july.wet_day_frequency == pytest.approx(1.0)
+    assert climatology.lookup(10.0, 10.0, date(2031, 7, 15)) is None
+    assert calendar_index(date(2031, 3, 1)) == calendar_index(date(2032, 3, 1))
+
+    async def no_network(*args, **kwargs):
+        raise AssertionError("climatology path must not hit the network")
+
+    monkeypatch.setattr("app.services.nasa_power.get_climatology", lambda: climatology)
+    monkeypatch.setattr("httpx.AsyncClient.get", no_network)
+    forecast = await NasaPowerClient().precipitation_forecast(
+        Location(latitude=40.7, longitude=-74.0, name="NYC"), date(2031, 7, 15)
+    )
+    assert forecast.precipitation_probability == 1.0
+    assert forecast.nasa_dataset.endswith("(Climatology)")
+
+
+@pytest.mark.asyncio
+async def test_build_fetches_at_most_concurrency_cells_at_once(monkeypatch, tmp_path):
+    in_flight = peak = calls = 0
+
+    async def slow_series(self, location, start, end):
+        nonlocal in_flight, peak, calls
+        in_flight += 1
+        calls += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.001)
+        in_flight -= 1
+        return np.zeros((end - start).days + 1)
+
+    monkeypatch.setattr("app.services.nasa_power.NasaPowerClient.daily_series", slow_series)
+    meta = await build_climatology(
+        tmp_path, bounds=(40.0, 43.0, -76.0, -73.0), years=2, window_days=1, concurrency=3
+    )
+
+    assert calls == meta["cells_built"] == meta["rows"] * meta["cols"] > 3
+    assert peak == 3
+
+
+@pytest.mark.asyncio
+async def test_rebuild_swaps_table_and_metadata_together(monkeypatch, tmp_path):
+    wet_mm = 4.0
+
+    async def fake_series(self, location, start, end):
+        return np.full((end - start).days + 1, wet_mm)
+
+    monkeypatch.setattr("app.services.nasa_power.NasaPowerClient.daily_series", fake_series)
+    first = await build_climatology(tmp_path, bounds=(40.0, 41.0, -75.0, -73.0), years=2, window_days=1)
+
+    # A rebuild over a shifted region that dies before publishing its metadata
+    wet_mm = 9.0
+    real_replace = Path.replace
+
+    def crash_on_sidecar(self, target):
+        if Path(target).name == META_FILE:
+            raise OSError("disk full")
+        return real_replace(self, target)
+
+    monkeypatch.setattr(Path, "replace", crash_on_sidecar)
+    with pytest.raises(OSError):
+        await build_climatology(tmp_path, bounds=(39.0, 41.0, -76.0, -73.0), years=2, window_days=1)
+    monkeypatch.setattr(Path, "replace", real_replace)
+
+    survivor = Climatology.load(tmp_path)
+    assert survivor.version == first["build_id"]
+    assert survivor.lookup(40.7, -74.0, date(2031, 7, 15)).mean_mm == pytest.approx(4.0)
+
+    second = await build_climatology(tmp_path, bounds=(39.0, 41.0, -76.0, -73.0), years=2, window_days=1)
+    rebuilt = Climatology.load(tmp_path)
+    assert rebuilt.version == second["build_id"] != first["build_id"]
+    assert rebuilt.lookup(40.7, -74.0, date(2031, 7, 15)).mean_mm == pytest.approx(9.0)
+    assert sorted(p.name for p in tmp_path.glob("*.npy")) == [second["table"]]
@@ -0,0 +1,142 @@
+import asyncio
+import sqlite3
+from datetime import date, datetime, timezone
+
+import pytest
+
+from app.core.database import ForecastDatabase
+from app.models.forecast import ForecastResponse, Location
+
+
+def make_forecast(latitude=40.0, longitude=-74.0, probability=0.5, mm=1.0):
+    return ForecastResponse(
+        location=Location(latitude=latitude, longitude=longitude, name="Test"),
+        event_date=date(2025, 10, 4),
+        precipitation_probability=probability,
+        precipitation_intensity_mm=mm,
+        summary="Test summary",
+        nasa_dataset="test",
+        issued_at=datetime.now(timezone.utc),
+    )
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = ForecastDatabase(str(tmp_path / "forecasts.db"), pool_size=2)
+    yield database
+    database.close()
+
+
+def test_connections_use_wal_and_are_reused(db):
+    with db.connection() as first:
+        assert first.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        assert first.execute("PRAGMA synchronous").fetchone()[0] == 1  # NORMAL
+    with db.connection() as second:
+        assert second is first
+
+
+@pytest.mark.asyncio
+async def test_async_operations_share_bounded_pool(db):
+    await asyncio.gather(*(db.save_forecast_async(make_forecast(mm=i)) for i in range(20)))
+
+    history = await db.get_forecast_history_async(40.0, -74.0, limit=50)
+    stats = await db.get_statistics_async()
+
+    assert len(history) == 20
+    assert stats["total_forecasts"] == 20
+    assert db._opened <= db.pool_size
+
+
+def test_statistics_maintained_on_insert_and_rebuilt(db):
+    db.save_forecast(make_forecast(probability=0.2, mm=1.0))
+    db.save_forecasts([
+        make_forecast(probability=0.6, mm=3.0),
+        make_forecast(latitude=51.5, longitude=-0.1, probability=0.4, mm=2.0),
+    ])
+
+    expected = {
+        "total_forecasts": 3,
+        "avg_rain_probability": 0.4,
+        "avg_precipitation_mm": 2.0,
+        "unique_locations": 2,
+    }
+    assert db.get_statistics() == expected
+
+    with db.connection() as conn, conn:
+        conn.execute("UPDATE forecast_stats SET total_forecasts = 0, unique_locations = 9")
+    assert db.rebuild_statistics() == expected
+
+
+def test_history_radius_and_bbox_queries(db):
+    db.save_forecasts([
+        make_forecast(latitude=40.7128, longitude=-74.0060, mm=1.0),  # Manhattan
+        make_forecast(latitude=40.6782, longitude=-73.9442, mm=2.0),  # Brooklyn, ~6 km
+        make_forecast(latitude=39.9526, longitude=-75.1652, mm=3.0),  # Philadelphia, ~130 km
+        make_forecast(latitude=-16.5, longitude=179.9, mm=4.0),  # Fiji, east of the antimeridian
+    ])
+
+    nearby = db.get_forecast_history(40.7128, -74.0060, radius_km=20, order="distance")
+    assert [row["precipitation_intensity_mm"] for row in nearby] == [1.0, 2.0]
+    assert nearby[1]["distance_km"] == pytest.approx(6.3, abs=0.5)
+
+    wide = db.get_forecast_history(40.7128, -74.0060, radius_km=200, order="distance")
+    assert [row["precipitation_intensity_mm"] for row in wide] == [1.0, 2.0, 3.0]
+
+    across = db.get_forecast_history(bbox=(-20.0, 179.0, -10.0, -179.0))
+    assert [row["precipitation_intensity_mm"] for row in across] == [4.0]
+
+    exact = db.get_forecast_history(39.9526, -75.1652)
+    assert len(exact) == 1
+
+    with pytest.raises(ValueError):
+        db.get_forecast_history(radius_km=10)
+
+
+def test_export_pages_by_id_with_filters(db):
+    from app.core.export import iter_export
+
+    db.save_forecasts([make_forecast(mm=float(i)) for i in range(7)])
+    db.save_forecast(make_forecast(latitude=-33.9, longitude=151.2, mm=99.0))
+
+    chunks = list(iter_export(db, "csv", page_size=3, bbox=(30.0, -80.0, 50.0, -70.0)))
+
+    assert len(chunks) == 3
+    lines = "".join(chunks).splitlines()
+    assert lines[0].startswith("id,latitude,longitude")
+    assert [line.split(",")[0] for line in lines[1:]] == [str(i) for i in range(1, 8)]
+
+
+def test_read_only_export_leaves_database_untouched(tmp_path):
+    from app.core.export import iter_export
+
+    path = tmp_path / "copy.db"
+    with sqlite3.connect(path) as conn:
+        # A pre-migration copy: no indexes, aggregates or archive catalog
+        conn.execute(
+            """
+            CREATE TABLE forecasts (
+                id INTEGER PRIMARY KEY AUTOINCREMENT, latitude REAL, longitude REAL,
+                location_name TEXT, event_date TEXT, precipitation_probability REAL,
+                precipitation_intensity_mm REAL, summary TEXT, nasa_dataset TEXT,
+                issued_at TEXT, created_at TEXT DEFAULT CURRENT_TIMESTAMP
+            )
+        """
+        )
+        conn.execute(
+            "INSERT INTO forecasts (latitude, longitude, event_date, precipitation_probability,"
+            " precipitation_intensity_mm, summary, nasa_dataset, issued_at)"
+            " VALUES (40.0, -74.0, '2025-10-04', 0.5, 1.0, 's', 'test', '2025-10-01')"
+        )
+    conn.close()
+    before = path.read_bytes()
+
+    db = ForecastDatabase(str(path), read_only=True)
+    try:
+        lines = "".join(iter_export(db, "ndjson")).splitlines()
+    finally:
+        db.close()
+
+    assert len(lines) == 1
+    assert path.read_bytes() == before
+    with pytest.raises(FileNotFoundError):
+        ForecastDatabase(str(tmp_path / "missing.db"), read_only=True)
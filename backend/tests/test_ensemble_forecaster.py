@@ -0,0 +1,228 @@
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from app.core.cache import ResultCache, get_ensemble_cache
+from app.core.metrics import ENSEMBLE_STAGE_SECONDS
+from app.models.forecast import Location
+from app.scripts.build_climatology import build_climatology
+from app.services.climatology import Climatology
+from app.services.ensemble_forecaster import EnsembleForecaster
+from app.services.nasa_power import NasaPowerClient
+
+
+@pytest.fixture(autouse=True)
+def empty_result_cache():
+    get_ensemble_cache().invalidate()
+
+
+@pytest.fixture
+def series_calls(monkeypatch):
+    calls = []
+
+    async def fake_series(self, location, start, end):
+        calls.append((location.latitude, location.longitude, start, end))
+        days = (end - start).days + 1
+        return np.array([float((start + timedelta(days=i)).year % 7) for i in range(days)])
+
+    monkeypatch.setattr("app.services.nasa_power.NasaPowerClient.daily_series", fake_series)
+    return calls
+
+
+@pytest.mark.asyncio
+async def test_batch_fetches_each_grid_cell_once(series_calls):
+    ensemble = EnsembleForecaster()
+    items = [
+        (Location(latitude=40.71, longitude=-74.01, name="NYC"), date(2023, 7, 4)),
+        (Location(latitude=40.65, longitude=-73.9, name="Brooklyn"), date(2022, 12, 25)),
+        (Location(latitude=51.51, longitude=-0.13, name="London"), date(2023, 7, 4)),
+    ]
+
+    results = await ensemble.get_batch_ensemble_forecast(items)
+
+    assert len(series_calls) == 2
+    assert [r.location.name for r in results] == ["NYC", "Brooklyn", "London"]
+    assert [r.event_date for r in results] == [d for _, d in items]
+
+
+@pytest.mark.asyncio
+async def test_batch_matches_single_request_blend(series_calls, monkeypatch):
+    ensemble = EnsembleForecaster()
+    location = Location(latitude=40.75, longitude=-73.75, name="Queens")
+    event_date = date(2023, 7, 4)
+
+    async def fake_forecast(self, loc, day):
+        series = await self.daily_series(loc, day, day)
+        return type("Forecast", (), {
+            "precipitation_intensity_mm": float(series[0]),
+            "precipitation_probability": self._precipitation_probability(float(series[0])),
+        })()
+
+    monkeypatch.setattr(
+        "app.services.nasa_power.NasaPowerClient.precipitation_forecast", fake_forecast
+    )
+
+    single = await ensemble.get_ensemble_forecast(location, event_date)
+    ensemble.result_cache.invalidate()
+    [batched] = await ensemble.get_batch_ensemble_forecast([(location, event_date)])
+
+    assert batched.precipitation_probability == single.precipitation_probability
+    assert batched.precipitation_intensity_mm == pytest.approx(single.precipitation_intensity_mm)
+    assert batched.summary == single.summary
+
+
+@pytest.mark.asyncio
+async def test_batch_matches_single_request_with_climatology(monkeypatch, tmp_path):
+    async def wet_july(self, location, start, end):
+        days = [start + timedelta(days=i) for i in range((end - start).days + 1)]
+        return np.array([9.0 if d.month == 7 else 0.5 for d in days])
+
+    monkeypatch.setattr("app.services.nasa_power.NasaPowerClient.daily_series", wet_july)
+    await build_climatology(tmp_path, bounds=(40.0, 41.0, -75.0, -73.0), years=3, window_days=3)
+    climatology = Climatology.load(tmp_path)
+    monkeypatch.setattr("app.services.nasa_power.get_climatology", lambda: climatology)
+    monkeypatch.setattr("app.services.ensemble_forecaster.get_climatology", lambda: climatology)
+
+    async def by_year(self, location, start, end):
+        days = (end - start).days + 1
+        return np.array([float((start + timedelta(days=i)).year % 7) for i in range(days)])
+
+    monkeypatch.setattr("app.services.nasa_power.NasaPowerClient.daily_series", by_year)
+    climatology_forecast = NasaPowerClient.precipitation_forecast
+
+    async def fake_forecast(self, loc, day):
+        if day > date.today():
+            return await climatology_forecast(self, loc, day)
+        series = await self.daily_series(loc, day, day)
+        return type("Forecast", (), {
+            "precipitation_intensity_mm": float(series[0]),
+            "precipitation_probability": self._precipitation_probability(float(series[0])),
+        })()
+
+    monkeypatch.setattr(
+        "app.services.nasa_power.NasaPowerClient.precipitation_forecast", fake_forecast
+    )
+
+    ensemble = EnsembleForecaster()
+    location = Location(latitude=40.7, longitude=-74.0, name="NYC")
+    for event_date in (date(date.today().year + 2, 7, 15), date(2023, 7, 15)):
+        single = await ensemble.get_ensemble_forecast(location, event_date)
+        ensemble.result_cache.invalidate()
+        [batched] = await ensemble.get_batch_ensemble_forecast([(location, event_date)])
+        ensemble.result_cache.invalidate()
+
+        assert batched.precipitation_probability == single.precipitation_probability
+        assert batched.precipitation_intensity_mm == pytest.approx(single.precipitation_intensity_mm)
+        assert batched.summary == single.summary
+
+
+@pytest.mark.asyncio
+async def test_event_window_uses_one_series_fetch(series_calls):
+    ensemble = EnsembleForecaster()
+    location = Location(latitude=48.85, longitude=2.35, name="Paris")
+
+    forecast = await ensemble.get_window_forecast(location, date(2023, 6, 1), date(2023, 6, 7))
+
+    assert len(series_calls) == 1
+    window = forecast.event_window
+    assert [d.event_date for d in window.days] == [date(2023, 6, d) for d in range(1, 8)]
+    expected_any = 1 - np.prod([1 - d.precipitation_probability for d in window.days])
+    assert window.probability_any_rain == pytest.approx(expected_any, abs=1e-3)
+    assert window.expected_total_mm == pytest.approx(
+        sum(d.precipitation_intensity_mm for d in window.days), abs=0.01
+    )
+    assert forecast.precipitation_probability == window.probability_any_rain
+
+
+@pytest.mark.asyncio
+async def test_result_cache_invalidated_by_weights_and_model_reload(series_calls):
+    ensemble = EnsembleForecaster(result_cache=ResultCache(maxsize=16, ttl=60))
+    items = [(Location(latitude=35.68, longitude=139.69, name="Tokyo"), date(2023, 3, 1))]
+
+    await ensemble.get_batch_ensemble_forecast(items)
+    [cached] = await ensemble.get_batch_ensemble_forecast(
+        [(Location(latitude=35.7, longitude=139.7, name="Shinjuku"), date(2023, 3, 1))]
+    )
+    assert len(series_calls) == 1
+    assert cached.location.name == "Shinjuku"
+
+    ensemble.set_weights(0.6, 0.2, 0.2)
+    await ensemble.get_batch_ensemble_forecast(items)
+    assert len(series_calls) == 2
+
+    ensemble.ml_predictor.model_version += 1
+    try:
+        await ensemble.get_batch_ensemble_forecast(items)
+    finally:
+        ensemble.ml_predictor.model_version -= 1
+    assert len(series_calls) == 3
+
+    stats = ensemble.result_cache.stats()
+    assert stats["hits"] == 1
+    assert stats["invalidations"] == 2
+
+
+@pytest.mark.asyncio
+async def test_stream_emits_components_then_same_forecast(series_calls, monkeypatch):
+    ensemble = EnsembleForecaster()
+    location = Location(latitude=-33.87, longitude=151.21, name="Sydney")
+    event_date = date(2023, 1, 26)
+
+    async def fake_forecast(self, loc, day):
+        series = await self.daily_series(loc, day, day)
+        return type("Forecast", (), {
+            "precipitation_intensity_mm": float(series[0]),
+            "precipitation_probability": self._precipitation_probability(float(series[0])),
+        })()
+
+    monkeypatch.setattr(
+        "app.services.nasa_power.NasaPowerClient.precipitation_forecast", fake_forecast
+    )
+
+    events = [e async for e in ensemble.stream_ensemble_forecast(location, event_date)]
+    ensemble.result_cache.invalidate()
+    single = await ensemble.get_ensemble_forecast(location, event_date)
+
+    names = [name for name, _ in events]
+    assert sorted(names[:3]) == ["ml_prediction", "nasa_baseline", "statistical_trend"]
+    assert names[3:] == ["forecast"]
+    streamed = events[-1][1]
+    assert streamed.precipitation_probability == single.precipitation_probability
+    assert streamed.summary == single.summary
+
+
+@pytest.mark.asyncio
+async def test_every_path_records_each_stage(series_calls, monkeypatch):
+    ensemble = EnsembleForecaster()
+    location = Location(latitude=52.52, longitude=13.4, name="Berlin")
+    stages = ("nasa_baseline", "historical", "ml", "stats", "blend")
+
+    async def fake_forecast(self, loc, day):
+        series = await self.daily_series(loc, day, day)
+        return type("Forecast", (), {
+            "precipitation_intensity_mm": float(series[0]),
+            "precipitation_probability": self._precipitation_probability(float(series[0])),
+        })()
+
+    monkeypatch.setattr(
+        "app.services.nasa_power.NasaPowerClient.precipitation_forecast", fake_forecast
+    )
+
+    def counts():
+        return [ENSEMBLE_STAGE_SECONDS.count(stage=stage) for stage in stages]
+
+    paths = [
+        lambda: ensemble.get_ensemble_forecast(location, date(2023, 5, 1)),
+        lambda: _drain(ensemble.stream_ensemble_forecast(location, date(2023, 5, 2))),
+        lambda: ensemble.get_batch_ensemble_forecast([(location, date(2023, 5, 3))]),
+        lambda: ensemble.get_window_forecast(location, date(2023, 5, 4), date(2023, 5, 6)),
+    ]
+    for path in paths:
+        before = counts()
+        await path()
+        assert [after - b for after, b in zip(counts(), before)] == [1] * len(stages)
+
+
+async def _drain(stream):
+    return [event async for event in stream]
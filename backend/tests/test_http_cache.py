@@ -0,0 +1,46 @@
+from datetime import date
+
+import joblib
+
+from app.core.http_cache import cache_control, etag_matches, forecast_etag
+from app.models.forecast import Location
+from app.services.ml_predictor import MLPredictor
+
+
+def test_cache_control_follows_event_date():
+    today = date(2025, 10, 20)
+
+    assert cache_control(date(2025, 1, 1), today) == "public, max-age=31536000, immutable"
+    assert cache_control(date(2025, 1, 1), today, model_dependent=True) == "public, max-age=86400"
+    assert cache_control(date(2025, 10, 18), today) == "public, max-age=3600"
+    assert cache_control(date(2025, 12, 25), today).startswith("public, max-age=")
+
+
+def test_etag_is_shared_within_a_grid_cell_and_tracks_versions():
+    day = date(2025, 7, 4)
+    etag = forecast_etag("ensemble", Location(latitude=40.71, longitude=-74.01), day, "v1", "a1")
+
+    assert etag == forecast_etag("ensemble", Location(latitude=40.69, longitude=-73.99), day, "v1", "a1")
+    assert etag != forecast_etag("ensemble", Location(latitude=40.71, longitude=-74.01), day, "v1", "b2")
+    assert etag_matches(f'"other", {etag.removeprefix("W/")}', etag)
+    assert etag_matches("*", etag)
+    assert not etag_matches(None, etag)
+
+
+def test_ensemble_etag_follows_model_file_and_weights(tmp_path):
+    location, day = Location(latitude=40.71, longitude=-74.01), date(2025, 7, 4)
+    deploys = iter(range(100))
+
+    def etag(model: object, weights: str = "0.5/0.3/0.2") -> str:
+        # A fresh directory and predictor per call, as after a redeploy
+        path = tmp_path / str(next(deploys)) / "model.joblib"
+        path.parent.mkdir()
+        joblib.dump(model, path)
+        predictor = MLPredictor(model_path=path)
+        assert predictor.model_version == 1
+        return forecast_etag("ensemble", location, day, "v1", predictor.model_hash, weights)
+
+    first = {"trees": 1}
+    assert etag(first) == etag({"trees": 1})
+    assert etag(first) != etag({"trees": 2})
+    assert etag(first) != etag(first, weights="0.6/0.2/0.2")
@@ -0,0 +1,49 @@
+from fastapi.testclient import TestClient
+
+from app.core.metrics import MetricsRegistry
+from app.main import app
+
+
+def test_histogram_renders_cumulative_buckets():
+    registry = MetricsRegistry()
+    latency = registry.histogram("op_seconds", "Op latency.", ("op",), buckets=(0.1, 1.0))
+    latency.observe(0.05, op="read")
+    latency.observe(0.5, op="read")
+    latency.observe(5.0, op="read")
+
+    text = registry.render()
+
+    assert "# TYPE op_seconds histogram" in text
+    assert 'op_seconds_bucket{op="read",le="0.1"} 1' in text
+    assert 'op_seconds_bucket{op="read",le="1.0"} 2' in text
+    assert 'op_seconds_bucket{op="read",le="+Inf"} 3' in text
+    assert 'op_seconds_count{op="read"} 3' in text
+
+
+def test_counter_and_gauge_callbacks():
+    registry = MetricsRegistry()
+    hits = registry.counter("hits_total", "Hits.", ("cache",))
+    hits.inc(cache="a")
+    hits.inc(2, cache="a")
+    size = registry.gauge("size", "Size.")
+    size.set_function(lambda: 7)
+
+    text = registry.render()
+
+    assert 'hits_total{cache="a"} 3.0' in text
+    assert "size 7" in text
+
+
+def test_metrics_endpoint_exposes_request_latency():
+    with TestClient(app) as client:
+        client.get("/api/cache/stats")
+        client.get("/api/health")
+
+        response = client.get("/metrics")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert 'isitrain_http_request_duration_seconds_count{method="GET",route="/api/cache/stats",status="200"}' in response.text
+    # Health checks are exempt from timing
+    assert 'route="/api/health"' not in response.text
+    assert "isitrain_cache_hit_ratio" in response.text
@@ -0,0 +1,32 @@
+import asyncio
+
+from app.benchmarks.micro import BENCHMARKS, compare, time_call
+
+
+def test_compare_flags_only_slowdowns_past_tolerance():
+    rows = compare({"a": 130.0, "b": 120.0, "new": 5.0}, {"a": 100.0, "b": 100.0}, tolerance=0.25)
+
+    assert [row["regressed"] for row in rows] == [True, False, False]
+    assert rows[2]["baseline_ns"] is None
+
+
+def test_cpu_benchmarks_run():
+    for name in ("ensemble.adjust_weights", "cache.key_set_get"):
+        with BENCHMARKS[name]() as function:
+            assert time_call(function, repeat=1, min_time=0.001) > 0
+
+
+def test_benchmarks_clean_up_their_fixtures(monkeypatch, tmp_path):
+    monkeypatch.setattr("tempfile.tempdir", str(tmp_path))
+
+    with BENCHMARKS["database.save_forecast"]() as save:
+        save()
+        assert len(list(tmp_path.iterdir())) == 1
+    assert list(tmp_path.iterdir()) == []
+
+    loops = []
+    new_event_loop = asyncio.new_event_loop
+    monkeypatch.setattr("asyncio.new_event_loop", lambda: loops.append(new_event_loop()) or loops[-1])
+    with BENCHMARKS["ensemble.statistical_estimate"]() as estimate:
+        estimate()
+    assert [loop.is_closed() for loop in loops] == [True]
@@ -0,0 +1,69 @@
+from datetime import date
+
+import numpy as np
+
+from app.benchmarks.models import synthetic_dataset
+from app.models.forecast import Location
+from app.services.ml_predictor import MLPredictor
+from app.services.model_backends import (
+    HIST_GRADIENT_BOOSTING,
+    RANDOM_FOREST,
+    backend_of,
+    build_model,
+    predict_with_spread,
+    scaler_filename,
+)
+
+
+def test_hist_gradient_boosting_backend_serves_predictions(tmp_path):
+    X, y = synthetic_dataset(2000)
+    model = build_model(HIST_GRADIENT_BOOSTING, n_estimators=20, max_depth=4).fit(X, y)
+
+    predictions, spreads = predict_with_spread(model, X[:5])
+    assert predictions.shape == spreads.shape == (5,)
+    assert np.all(spreads >= 0)
+
+    predictor = MLPredictor(model_path=tmp_path / "model.joblib", backend=HIST_GRADIENT_BOOSTING)
+    predictor.model = model
+    predictor.is_trained = True
+    predictor.save_model()
+
+    reloaded = MLPredictor(model_path=tmp_path / "model.joblib")
+    assert reloaded.backend == HIST_GRADIENT_BOOSTING
+    result = reloaded.predict(Location(latitude=5.0, longitude=100.0), date(2024, 11, 2))
+    assert result["model_available"] is True
+    assert 0.3 <= result["confidence"] <= 0.95
+    assert reloaded.get_model_info()["model_type"] == "QuantileGradientBoosting"
+
+
+def test_random_forest_spread_matches_forest_prediction():
+    X, y = synthetic_dataset(500)
+    model = build_model(RANDOM_FOREST, n_estimators=5, max_depth=4).fit(X, y)
+
+    predictions, _ = predict_with_spread(model, X[:10])
+
+    assert backend_of(model) == RANDOM_FOREST
+    np.testing.assert_allclose(predictions, model.predict(X[:10]))
+
+
+def test_scaler_follows_loaded_model_backend(tmp_path):
+    import joblib
+    from sklearn.preprocessing import StandardScaler
+
+    X, y = synthetic_dataset(500)
+    predictor = MLPredictor(model_path=tmp_path / "model.joblib", backend=RANDOM_FOREST)
+    predictor.model = build_model(HIST_GRADIENT_BOOSTING, n_estimators=5, max_depth=3).fit(X, y)
+    predictor.scaler = StandardScaler().fit(X)
+    predictor.save_model()
+
+    # Configured for random forest, but the file holds the quantile model
+    reloaded = MLPredictor(model_path=tmp_path / "model.joblib", backend=RANDOM_FOREST)
+    assert reloaded.is_trained and reloaded.backend == HIST_GRADIENT_BOOSTING
+    assert reloaded.scaler_path == tmp_path / scaler_filename(HIST_GRADIENT_BOOSTING)
+    np.testing.assert_allclose(reloaded.scaler.mean_, predictor.scaler.mean_)
+
+    # A scaler saved for the other backend is refused rather than applied
+    other = StandardScaler().fit(X)
+    other.model_backend = RANDOM_FOREST
+    joblib.dump(other, reloaded.scaler_path)
+    assert MLPredictor(model_path=tmp_path / "model.joblib").is_trained is False
@@ -1,9 +1,12 @@
-from datetime import date
+from datetime import date, timedelta
 from unittest.mock import AsyncMock, patch
 
+import httpx
 import pytest
 
+from app.core.cache import get_cache, get_rendered_cache, get_series_cache
 from app.models.forecast import Location
+from app.services.ensemble_forecaster import EnsembleForecaster
 from app.services.nasa_power import NasaPowerClient
 
 
@@ -36,3 +39,65 @@ async def test_precipitation_probability_conversion(monkeypatch):
     assert forecast.precipitation_probability == pytest.approx(0.8)
     assert forecast.summary.startswith("High chance")
     assert forecast.location.name == "NYC"
+
+
+@pytest.mark.asyncio
+async def test_ensemble_fetches_leave_rendered_cache_empty():
+    location = Location(latitude=-12.3456, longitude=45.6789, name="Render Test")
+    event_date = date(2023, 8, 9)
+
+    async def mock_get(self, url, params):
+        class MockResponse:
+            def raise_for_status(self):
+                return None
+
+            def json(self):
+                return {"properties": {"parameter": {"PRECTOTCORR": {params["start"]: 2.0}}}}
+
+        return MockResponse()
+
+    ensemble = EnsembleForecaster(nasa_client=NasaPowerClient())
+    with patch("httpx.AsyncClient.get", new=mock_get):
+        await ensemble.get_ensemble_forecast(location, event_date)
+
+    keys = [
+        NasaPowerClient._forecast_key(location, event_date.replace(year=event_date.year - offset))
+        for offset in range(6)
+    ]
+    assert all(key in get_cache() for key in keys)
+    assert not any(key in get_rendered_cache() for key in keys)
+
+    forecast, body = ensemble.nasa_client.cached_response(location, event_date)
+    assert body == forecast.model_dump_json().encode()
+    assert [key in get_rendered_cache() for key in keys] == [True] + [False] * 5
+
+
+@pytest.mark.asyncio
+async def test_series_sweep_does_not_evict_cached_forecasts():
+    location = Location(latitude=33.3333, longitude=-44.4444, name="Hot Spot")
+    forecast_key = NasaPowerClient._forecast_key(location, date(2023, 8, 9))
+    get_cache()[forecast_key] = "cached forecast"
+
+    async def mock_get(self, url, params):
+        class MockResponse:
+            def raise_for_status(self):
+                return None
+
+            def json(self):
+                return {"properties": {"parameter": {"PRECTOTCORR": {params["start"]: 1.0}}}}
+
+        return MockResponse()
+
+    series_cache = get_series_cache()
+    start = date(2020, 1, 1)
+    async with httpx.AsyncClient() as http:
+        client = NasaPowerClient(http_client=http)
+        with patch("httpx.AsyncClient.get", new=mock_get):
+            for cell in range(get_cache().maxsize + 1):
+                await client.daily_series(
+                    Location(latitude=-60.0 + cell * 0.5, longitude=10.0), start, start + timedelta(days=1)
+                )
+
+    assert get_cache()[forecast_key] == "cached forecast"
+    assert len(series_cache) > 0
+    assert not any(key.startswith("nasa_series") for key in get_cache())
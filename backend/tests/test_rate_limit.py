@@ -0,0 +1,104 @@
+import asyncio
+import multiprocessing
+import sqlite3
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.core.rate_limit import SQLiteRateLimiter, SlidingWindowLimiter, create_rate_limiter
+from app.main import app
+
+
+def test_minute_limit_slides_across_window_boundary():
+    limiter = SlidingWindowLimiter(requests_per_minute=10, requests_per_hour=1000)
+    start = 1_000_020.0  # 0 s into a minute window
+
+    assert all(limiter.hit("a", start + i).allowed for i in range(10))
+    denied = limiter.hit("a", start + 30)
+    assert not denied.allowed and denied.exceeded == "minute"
+
+    # Halfway into the next window half of the previous 10 still count
+    assert [limiter.hit("a", start + 90).allowed for _ in range(6)] == [True] * 5 + [False]
+    assert limiter.hit("b", start + 90).allowed
+
+
+def test_idle_clients_are_evicted():
+    limiter = SlidingWindowLimiter(idle_ttl=3600, evict_interval=60)
+    for i in range(1000):
+        limiter.hit(f"10.0.{i // 256}.{i % 256}", now=0.0)
+    assert len(limiter.clients) == 1000
+
+    limiter.hit("active", now=3700.0)
+
+    assert list(limiter.clients) == ["active"]
+
+
+def _hit_shared(path, count, results):
+    limiter = SQLiteRateLimiter(path, requests_per_minute=100, requests_per_hour=1000)
+    now = 1_000_020.0
+    results.put(sum(limiter.hit("shared", now).allowed for _ in range(count)))
+
+
+def test_sqlite_limit_holds_across_processes(tmp_path):
+    path = tmp_path / "rate_limits.db"
+    SQLiteRateLimiter(path).close()
+    results = multiprocessing.Queue()
+    workers = [
+        multiprocessing.Process(target=_hit_shared, args=(path, 50, results)) for _ in range(4)
+    ]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    # 200 attempts from four "workers", exactly one limit's worth admitted
+    assert sum(results.get() for _ in workers) == 100
+
+
+def test_sqlite_backend_falls_back_to_memory(tmp_path):
+    limiter = create_rate_limiter(backend="sqlite", path=tmp_path)  # a directory, not a file
+    assert isinstance(limiter, SlidingWindowLimiter)
+
+    shared = SQLiteRateLimiter(tmp_path / "rate_limits.db", requests_per_minute=1)
+    shared._conn.close()
+    assert shared.hit("a", 1_000_020.0).allowed
+    assert not shared.hit("a", 1_000_021.0).allowed
+    assert len(shared.fallback.clients) == 1
+
+
+@pytest.mark.asyncio
+async def test_sqlite_contention_waits_off_the_event_loop(tmp_path):
+    path = tmp_path / "rate_limits.db"
+    limiter = SQLiteRateLimiter(path, busy_timeout_ms=50, busy_retries=20)
+    other_worker = sqlite3.connect(path, isolation_level=None, check_same_thread=False)
+    other_worker.execute("BEGIN IMMEDIATE")
+    threading.Timer(0.3, other_worker.execute, ["COMMIT"]).start()
+
+    ticks = 0
+
+    async def ticker() -> None:
+        nonlocal ticks
+        while True:
+            await asyncio.sleep(0.01)
+            ticks += 1
+
+    running = asyncio.create_task(ticker())
+    decision = await limiter.ahit("a")
+    running.cancel()
+
+    assert decision.allowed
+    # Busy is contention, not failure: no fallback, and the loop kept running
+    assert not limiter._degraded and not limiter.fallback.clients
+    assert ticks >= 10
+    limiter.close()
+    other_worker.close()
+
+
+def test_health_and_static_routes_skip_rate_limiting():
+    with TestClient(app) as client:
+        limited = client.get("/api/cache/stats")
+        assert "X-RateLimit-Minute-Remaining" in limited.headers
+
+        for path in ("/api/health", "/health", "/metrics"):
+            assert "X-RateLimit-Minute-Remaining" not in client.get(path).headers
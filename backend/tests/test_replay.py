@@ -0,0 +1,31 @@
+from collections import Counter
+
+from app.benchmarks.replay import cache_counts, hit_ratios, schedule
+
+
+def test_schedule_keeps_relative_timing_and_endpoint():
+    rows = [
+        {"latitude": 1.0, "longitude": 2.0, "location_name": None, "event_date": "2025-01-01",
+         "nasa_dataset": "NASA POWER (GPM IMERG derived)", "created_at": "2025-10-05 10:00:00"},
+        {"latitude": 3.0, "longitude": 4.0, "location_name": "Lahore", "event_date": "2025-01-02",
+         "nasa_dataset": "NASA POWER + ML Ensemble", "created_at": "2025-10-05 10:01:00"},
+    ]
+
+    plan = schedule(rows, speed=10)
+
+    assert [(offset, path) for offset, path, _ in plan] == [
+        (0.0, "/api/forecast"),
+        (6.0, "/api/forecast/ensemble"),
+    ]
+    assert plan[1][2]["location"]["name"] == "Lahore"
+
+
+def test_hit_ratio_covers_only_the_replay():
+    before = cache_counts('isitrain_cache_requests_total{cache="nasa",result="hit"} 5.0\n')
+    after = cache_counts(
+        'isitrain_cache_requests_total{cache="nasa",result="hit"} 8.0\n'
+        'isitrain_cache_requests_total{cache="nasa",result="miss"} 1.0\n'
+    )
+
+    assert before == Counter({("nasa", "hit"): 5.0})
+    assert hit_ratios(before, after) == {"nasa": 0.75}
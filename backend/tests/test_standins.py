@@ -0,0 +1,24 @@
+from fastapi.testclient import TestClient
+
+from app.benchmarks.standins import POWER_PATH, StandinConfig, create_standin_app
+
+
+def test_power_standin_matches_upstream_shape_and_counts_calls():
+    client = TestClient(create_standin_app(StandinConfig(latency_ms=0, jitter_ms=0)))
+    params = {"latitude": 40.7, "longitude": -74.0, "start": "20230101", "end": "20230103"}
+
+    first = client.get(POWER_PATH, params=params).json()
+    second = client.get(POWER_PATH, params=params).json()
+
+    values = first["properties"]["parameter"]["PRECTOTCORR"]
+    assert list(values) == ["20230101", "20230102", "20230103"]
+    assert first == second  # deterministic
+    assert client.get("/reverse", params={"lat": 1, "lon": 2}).json()["display_name"]
+    assert client.get("/_stats").json() == {"power": 2, "nominatim_reverse": 1}
+
+
+def test_standin_injects_errors():
+    client = TestClient(create_standin_app(StandinConfig(latency_ms=0, jitter_ms=0, error_rate=1.0)))
+
+    assert client.get("/search", params={"q": "Paris"}).status_code == 503
+    assert client.get("/_stats").json() == {"nominatim_search": 1, "nominatim_search_errors": 1}
@@ -0,0 +1,26 @@
+from datetime import date
+
+from app.benchmarks.startup import heavy_imports, import_profile, report
+from app.models.forecast import Location
+from app.services.ml_predictor import MLPredictor
+
+
+def test_app_import_does_not_load_scientific_stack():
+    rows = import_profile("app.main")
+    # Shown with `pytest -rP`, and on failure
+    print(report(rows))
+
+    assert any(row["module"] == "app.main" for row in rows)
+    assert heavy_imports(rows) == [], report(rows)
+
+
+def test_lazy_predictor_loads_model_on_first_use():
+    predictor = MLPredictor(load=False)
+    assert predictor.model is None
+
+    result = predictor.predict(Location(latitude=40.7, longitude=-74.0), date(2024, 7, 4))
+
+    assert result["model_available"] is predictor.is_trained is True
+    assert predictor.model_version == 1
+    predictor.ensure_loaded()
+    assert predictor.model_version == 1
@@ -0,0 +1,69 @@
+from datetime import date
+
+import numpy as np
+import pytest
+
+from app.models.forecast import Location
+from app.scripts.train_model import LatticeTrainer, peak_rss_mb
+from app.services.ml_predictor import MLPredictor
+
+
+def test_extract_features_batch_matches_single_row():
+    location = Location(latitude=-33.87, longitude=151.21)
+    target = date(2024, 7, 14)
+
+    single = MLPredictor.extract_features(MLPredictor.__new__(MLPredictor), location, target)
+    batch = MLPredictor.extract_features_batch(
+        np.array([location.latitude]),
+        np.array([location.longitude]),
+        np.array([target.timetuple().tm_yday]),
+        np.array([target.month]),
+    )
+
+    np.testing.assert_allclose(batch, single)
+
+
+@pytest.mark.asyncio
+async def test_lattice_trainer_streams_bounded_chunks(monkeypatch, tmp_path):
+    async def fake_series(self, location, start, end):
+        days = (end - start).days + 1
+        series = np.abs(np.sin(np.arange(days) / 30.0)) * (10 + location.latitude)
+        series[::50] = np.nan
+        return series
+
+    monkeypatch.setattr("app.services.nasa_power.NasaPowerClient.daily_series", fake_series)
+
+    trainer = LatticeTrainer(
+        years=1,
+        bounds=(0.0, 2.0, 0.0, 2.0),
+        chunk_size=1000,
+        trees_per_chunk=2,
+        max_trees=5,
+        max_samples=500,
+        max_depth=6,
+        holdout_rows=200,
+    )
+    trainer.ml_predictor.model_path = tmp_path / "model.joblib"
+
+    sizes = [len(X) async for X, _ in trainer.iter_chunks()]
+    assert all(size == 1000 for size in sizes[:-1])
+    assert sizes[-1] <= 1000
+
+    results = await trainer.run()
+
+    assert results["metrics"]["n_estimators"] == 5
+    assert results["training_samples"] + results["metrics"]["n_samples_test"] == sum(sizes)
+    assert len(results["memory_high_water"]) == len(sizes)
+    assert (tmp_path / "model.joblib").exists()
+    prediction = trainer.ml_predictor.predict(Location(latitude=1.0, longitude=1.0), date(2024, 3, 1))
+    assert prediction["model_available"] is True
+
+
+@pytest.mark.parametrize("platform, maxrss", [("linux", 512 * 1024), ("darwin", 512 * 1024 * 1024)])
+def test_peak_rss_units_follow_platform(monkeypatch, platform, maxrss):
+    resource = pytest.importorskip("resource")
+    usage = type("Usage", (), {"ru_maxrss": maxrss})()
+    monkeypatch.setattr("sys.platform", platform)
+    monkeypatch.setattr(resource, "getrusage", lambda who: usage)
+
+    assert peak_rss_mb() == 512.0
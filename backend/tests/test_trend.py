@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from scipy import stats
+
+from app.services.trend import fit_trends, trend_estimates
+
+
+def test_fit_trends_matches_linregress():
+    rng = np.random.default_rng(7)
+    values = rng.gamma(2.0, 3.0, size=(50, 5))
+
+    fit = fit_trends(values)
+
+    for i, row in enumerate(values):
+        expected = stats.linregress(np.arange(5), row)
+        assert fit.slope[i] == pytest.approx(expected.slope)
+        assert fit.intercept[i] == pytest.approx(expected.intercept)
+        assert fit.r_squared[i] == pytest.approx(expected.rvalue ** 2)
+
+
+def test_missing_years_keep_their_position():
+    fit = fit_trends(np.array([[1.0, np.nan, 3.0, np.nan, 5.0]]))
+
+    assert fit.n[0] == 3
+    assert fit.slope[0] == pytest.approx(1.0)
+    assert fit.intercept[0] == pytest.approx(1.0)
+    assert fit.r_squared[0] == pytest.approx(1.0)
+
+
+def test_trend_estimates_labels_and_fallbacks():
+    history = np.array([
+        [5.0, 5.0, 5.0, 5.0, 5.0],
+        [1.0, 2.0, 3.0, 4.0, 5.0],
+        [2.0, np.nan, np.nan, np.nan, np.nan],
+    ])
+
+    stable, increasing, sparse = trend_estimates(history, [0.0, 0.0, 7.5])
+
+    assert stable["trend"] == "stable"
+    assert stable["confidence"] == 0.3
+    assert increasing["trend"] == "increasing"
+    assert increasing["confidence"] == 0.9
+    assert sparse == {"estimated_mm": 7.5, "confidence": 0.5, "trend": "insufficient_data"}
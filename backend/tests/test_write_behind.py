@@ -0,0 +1,51 @@
+import asyncio
+
+import pytest
+
+from app.core.database import ForecastDatabase
+from app.core.write_behind import ForecastWriteQueue
+from tests.test_database import make_forecast
+
+
+@pytest.fixture
+def db(tmp_path):
+    database = ForecastDatabase(str(tmp_path / "forecasts.db"))
+    yield database
+    database.close()
+
+
+@pytest.mark.asyncio
+async def test_flushes_in_batches_and_on_stop(db, monkeypatch):
+    batches = []
+    save_many = db.save_forecasts
+    monkeypatch.setattr(db, "save_forecasts", lambda rows: batches.append(len(rows)) or save_many(rows))
+    writer = ForecastWriteQueue(db, batch_size=10, flush_interval=30)
+    writer.start()
+
+    for i in range(25):
+        assert await writer.enqueue(make_forecast(mm=i))
+    await writer.stop()
+
+    assert batches[:2] == [10, 10]
+    assert sum(batches) == 25
+    assert db.get_statistics()["total_forecasts"] == 25
+
+
+@pytest.mark.asyncio
+async def test_drops_when_queue_stays_full(db, monkeypatch):
+    release = asyncio.Event()
+
+    async def stalled(rows):
+        await release.wait()
+        return len(rows)
+
+    monkeypatch.setattr(db, "save_forecasts_async", stalled)
+    writer = ForecastWriteQueue(db, max_pending=2, batch_size=1, enqueue_timeout=0.01)
+    writer.start()
+
+    results = [await writer.enqueue(make_forecast()) for _ in range(6)]
+    release.set()
+    await writer.stop()
+
+    assert results[:3] == [True, True, True]
+    assert results[-1] is False